@@ -0,0 +1,42 @@
+"""Add blog related articles table
+
+Revision ID: 3c1e7a9b2d41
+Revises: fb5916c66020
+Create Date: 2026-10-19 09:12:04.118237
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e7a9b2d41'
+down_revision: Union[str, None] = 'fb5916c66020'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'blog_related_articles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('article_id', sa.Integer(), nullable=False),
+        sa.Column('related_article_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['article_id'], ['blog_articles.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_article_id'], ['blog_articles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_blog_related_articles_id'), 'blog_related_articles', ['id'], unique=False)
+    op.create_index('ix_blog_related_articles_article_rank', 'blog_related_articles', ['article_id', 'rank'], unique=False)
+    # Populate with: python rebuild_related_articles.py
+
+
+def downgrade() -> None:
+    op.drop_index('ix_blog_related_articles_article_rank', table_name='blog_related_articles')
+    op.drop_index(op.f('ix_blog_related_articles_id'), table_name='blog_related_articles')
+    op.drop_table('blog_related_articles')
@@ -0,0 +1,32 @@
+"""Add site settings version
+
+Revision ID: 3f8b2c6d9e17
+Revises: c7e4a9d21f60
+Create Date: 2026-10-19 22:41:08.527193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8b2c6d9e17'
+down_revision: Union[str, None] = 'c7e4a9d21f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    version_table = op.create_table('site_settings_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(version_table, [{'id': 1, 'version': 1}])
+
+
+def downgrade() -> None:
+    op.drop_table('site_settings_version')
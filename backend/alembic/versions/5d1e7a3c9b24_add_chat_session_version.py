@@ -0,0 +1,26 @@
+"""Add chat session version
+
+Revision ID: 5d1e7a3c9b24
+Revises: 3f8b2c6d9e17
+Create Date: 2026-10-20 10:12:44.301852
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1e7a3c9b24'
+down_revision: Union[str, None] = '3f8b2c6d9e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('chat_sessions', 'version')
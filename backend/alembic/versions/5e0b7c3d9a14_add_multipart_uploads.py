@@ -0,0 +1,46 @@
+"""Add multipart uploads table
+
+Revision ID: 5e0b7c3d9a14
+Revises: d4c8a1f37e95
+Create Date: 2026-10-19 18:21:36.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b7c3d9a14'
+down_revision: Union[str, None] = 'd4c8a1f37e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('multipart_uploads',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('upload_id', sa.String(length=512), nullable=False),
+    sa.Column('key', sa.String(length=500), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=False),
+    sa.Column('part_size', sa.Integer(), nullable=False),
+    sa.Column('part_count', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_multipart_uploads_id'), 'multipart_uploads', ['id'], unique=False)
+    op.create_index(op.f('ix_multipart_uploads_upload_id'), 'multipart_uploads', ['upload_id'], unique=True)
+    op.create_index(op.f('ix_multipart_uploads_status'), 'multipart_uploads', ['status'], unique=False)
+    op.create_index(op.f('ix_multipart_uploads_created_at'), 'multipart_uploads', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_multipart_uploads_created_at'), table_name='multipart_uploads')
+    op.drop_index(op.f('ix_multipart_uploads_status'), table_name='multipart_uploads')
+    op.drop_index(op.f('ix_multipart_uploads_upload_id'), table_name='multipart_uploads')
+    op.drop_index(op.f('ix_multipart_uploads_id'), table_name='multipart_uploads')
+    op.drop_table('multipart_uploads')
@@ -0,0 +1,33 @@
+"""Add rendered HTML, TOC and reading time to blog articles
+
+Revision ID: 8d2f4b6a1c93
+Revises: 3c1e7a9b2d41
+Create Date: 2026-10-19 10:03:41.552810
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4b6a1c93'
+down_revision: Union[str, None] = '3c1e7a9b2d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('blog_articles', sa.Column('content_html', sa.Text(), nullable=True))
+    op.add_column('blog_articles', sa.Column('content_toc', sa.Text(), nullable=True))
+    op.add_column('blog_articles', sa.Column('reading_minutes', sa.Integer(), nullable=True))
+    op.add_column('blog_articles', sa.Column('rendered_at', sa.DateTime(), nullable=True))
+    # Backfill with: python render_blog_content.py
+
+
+def downgrade() -> None:
+    op.drop_column('blog_articles', 'rendered_at')
+    op.drop_column('blog_articles', 'reading_minutes')
+    op.drop_column('blog_articles', 'content_toc')
+    op.drop_column('blog_articles', 'content_html')
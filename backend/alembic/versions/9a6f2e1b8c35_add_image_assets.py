@@ -0,0 +1,44 @@
+"""Add image assets table
+
+Revision ID: 9a6f2e1b8c35
+Revises: 5e0b7c3d9a14
+Create Date: 2026-10-19 19:05:12.640917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a6f2e1b8c35'
+down_revision: Union[str, None] = '5e0b7c3d9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('image_assets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source_key', sa.String(length=500), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('blurhash', sa.String(length=64), nullable=True),
+    sa.Column('variants', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('error', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_image_assets_id'), 'image_assets', ['id'], unique=False)
+    op.create_index(op.f('ix_image_assets_source_key'), 'image_assets', ['source_key'], unique=True)
+    op.create_index(op.f('ix_image_assets_status'), 'image_assets', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_image_assets_status'), table_name='image_assets')
+    op.drop_index(op.f('ix_image_assets_source_key'), table_name='image_assets')
+    op.drop_index(op.f('ix_image_assets_id'), table_name='image_assets')
+    op.drop_table('image_assets')
@@ -0,0 +1,107 @@
+"""Normalize blog tags into blog_tags / blog_article_tags
+
+Revision ID: a47c9e2f5b18
+Revises: 8d2f4b6a1c93
+Create Date: 2026-10-19 11:20:17.904512
+
+"""
+from typing import Sequence, Union
+from datetime import datetime
+import json
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a47c9e2f5b18'
+down_revision: Union[str, None] = '8d2f4b6a1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _slugify(text: str) -> str:
+    # Same rules as app.utils.slugs.generate_slug, inlined so the migration
+    # does not depend on application code
+    slug = text.lower()
+    slug = re.sub(r'[^a-z0-9\s-]', '', slug)
+    slug = re.sub(r'[\s_]+', '-', slug)
+    slug = re.sub(r'-+', '-', slug)
+    return slug.strip('-')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'blog_tags',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('slug', sa.String(length=120), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_blog_tags_id'), 'blog_tags', ['id'], unique=False)
+    op.create_index(op.f('ix_blog_tags_slug'), 'blog_tags', ['slug'], unique=True)
+    op.create_table(
+        'blog_article_tags',
+        sa.Column('article_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['article_id'], ['blog_articles.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['blog_tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('article_id', 'tag_id')
+    )
+    op.create_index('ix_blog_article_tags_tag_id', 'blog_article_tags', ['tag_id'], unique=False)
+
+    # Backfill from the JSON tags column
+    conn = op.get_bind()
+    blog_tags = sa.table(
+        'blog_tags',
+        sa.column('id', sa.Integer),
+        sa.column('name', sa.String),
+        sa.column('slug', sa.String),
+        sa.column('created_at', sa.DateTime),
+    )
+    blog_article_tags = sa.table(
+        'blog_article_tags',
+        sa.column('article_id', sa.Integer),
+        sa.column('tag_id', sa.Integer),
+    )
+
+    links = []
+    names_by_slug = {}
+    for article_id, raw_tags in conn.execute(sa.text("SELECT id, tags FROM blog_articles")):
+        try:
+            tags = json.loads(raw_tags) if raw_tags else []
+        except ValueError:
+            tags = []
+        seen = set()
+        for tag in tags:
+            name = re.sub(r'\s+', ' ', str(tag or '')).strip()
+            slug = _slugify(name)
+            if not slug or slug in seen:
+                continue
+            seen.add(slug)
+            names_by_slug.setdefault(slug, name)
+            links.append((article_id, slug))
+
+    if not names_by_slug:
+        return
+
+    now = datetime.utcnow()
+    op.bulk_insert(blog_tags, [
+        {'name': name, 'slug': slug, 'created_at': now}
+        for slug, name in names_by_slug.items()
+    ])
+    tag_ids = dict(conn.execute(sa.text("SELECT slug, id FROM blog_tags")).fetchall())
+    op.bulk_insert(blog_article_tags, [
+        {'article_id': article_id, 'tag_id': tag_ids[slug]}
+        for article_id, slug in links
+    ])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_blog_article_tags_tag_id', table_name='blog_article_tags')
+    op.drop_table('blog_article_tags')
+    op.drop_index(op.f('ix_blog_tags_slug'), table_name='blog_tags')
+    op.drop_index(op.f('ix_blog_tags_id'), table_name='blog_tags')
+    op.drop_table('blog_tags')
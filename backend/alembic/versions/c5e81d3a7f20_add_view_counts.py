@@ -0,0 +1,32 @@
+"""Add view counts to blog articles and doctors
+
+Revision ID: c5e81d3a7f20
+Revises: a47c9e2f5b18
+Create Date: 2026-10-19 12:41:55.310276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e81d3a7f20'
+down_revision: Union[str, None] = 'a47c9e2f5b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('blog_articles', sa.Column('view_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_blog_articles_view_count'), 'blog_articles', ['view_count'], unique=False)
+    op.add_column('doctors', sa.Column('view_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_doctors_view_count'), 'doctors', ['view_count'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_doctors_view_count'), table_name='doctors')
+    op.drop_column('doctors', 'view_count')
+    op.drop_index(op.f('ix_blog_articles_view_count'), table_name='blog_articles')
+    op.drop_column('blog_articles', 'view_count')
@@ -0,0 +1,42 @@
+"""Add upload blobs table
+
+Revision ID: c7e4a9d21f60
+Revises: 9a6f2e1b8c35
+Create Date: 2026-10-19 20:12:40.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e4a9d21f60'
+down_revision: Union[str, None] = '9a6f2e1b8c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('upload_blobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('key', sa.String(length=500), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_upload_blobs_id'), 'upload_blobs', ['id'], unique=False)
+    op.create_index(op.f('ix_upload_blobs_key'), 'upload_blobs', ['key'], unique=True)
+    op.create_index(op.f('ix_upload_blobs_sha256'), 'upload_blobs', ['sha256'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_upload_blobs_sha256'), table_name='upload_blobs')
+    op.drop_index(op.f('ix_upload_blobs_key'), table_name='upload_blobs')
+    op.drop_index(op.f('ix_upload_blobs_id'), table_name='upload_blobs')
+    op.drop_table('upload_blobs')
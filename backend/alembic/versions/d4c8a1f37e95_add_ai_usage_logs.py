@@ -0,0 +1,44 @@
+"""Add AI usage logs table
+
+Revision ID: d4c8a1f37e95
+Revises: b91d6e2a4c07
+Create Date: 2026-10-19 17:02:47.903316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4c8a1f37e95'
+down_revision: Union[str, None] = 'b91d6e2a4c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_usage_logs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('endpoint', sa.String(length=100), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=True),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+    sa.Column('completion_tokens', sa.Integer(), nullable=True),
+    sa.Column('total_tokens', sa.Integer(), nullable=True),
+    sa.Column('latency_ms', sa.Integer(), nullable=True),
+    sa.Column('cache_hit', sa.Boolean(), nullable=True),
+    sa.Column('success', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ai_usage_logs_id'), 'ai_usage_logs', ['id'], unique=False)
+    op.create_index(op.f('ix_ai_usage_logs_endpoint'), 'ai_usage_logs', ['endpoint'], unique=False)
+    op.create_index(op.f('ix_ai_usage_logs_created_at'), 'ai_usage_logs', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ai_usage_logs_created_at'), table_name='ai_usage_logs')
+    op.drop_index(op.f('ix_ai_usage_logs_endpoint'), table_name='ai_usage_logs')
+    op.drop_index(op.f('ix_ai_usage_logs_id'), table_name='ai_usage_logs')
+    op.drop_table('ai_usage_logs')
@@ -0,0 +1,43 @@
+"""Add AI response cache table
+
+Revision ID: e2b7d94c1f06
+Revises: c5e81d3a7f20
+Create Date: 2026-10-19 14:05:12.481930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7d94c1f06'
+down_revision: Union[str, None] = 'c5e81d3a7f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_response_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('endpoint', sa.String(length=100), nullable=False),
+    sa.Column('normalized_input', sa.Text(), nullable=False),
+    sa.Column('response', sa.Text(), nullable=False),
+    sa.Column('hit_count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('last_hit_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ai_response_cache_id'), 'ai_response_cache', ['id'], unique=False)
+    op.create_index(op.f('ix_ai_response_cache_cache_key'), 'ai_response_cache', ['cache_key'], unique=True)
+    op.create_index(op.f('ix_ai_response_cache_endpoint'), 'ai_response_cache', ['endpoint'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ai_response_cache_endpoint'), table_name='ai_response_cache')
+    op.drop_index(op.f('ix_ai_response_cache_cache_key'), table_name='ai_response_cache')
+    op.drop_index(op.f('ix_ai_response_cache_id'), table_name='ai_response_cache')
+    op.drop_table('ai_response_cache')
@@ -0,0 +1,29 @@
+"""Upload blobs per folder
+
+Revision ID: e2b9c4f7a1d8
+Revises: 5d1e7a3c9b24
+Create Date: 2026-10-20 11:03:27.640915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b9c4f7a1d8'
+down_revision: Union[str, None] = '5d1e7a3c9b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The same content may now be stored once per folder/extension; key stays unique
+    op.drop_index(op.f('ix_upload_blobs_sha256'), table_name='upload_blobs')
+    op.create_index(op.f('ix_upload_blobs_sha256'), 'upload_blobs', ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_upload_blobs_sha256'), table_name='upload_blobs')
+    op.create_index(op.f('ix_upload_blobs_sha256'), 'upload_blobs', ['sha256'], unique=True)
@@ -0,0 +1,309 @@
+"""
+Response cache for deterministic AI endpoints.
+
+Inputs are normalized (case, punctuation, whitespace) and hashed together with
+the endpoint name. Lookups go: in-memory LRU -> ai_response_cache table ->
+optional fuzzy match against recently seen inputs of the same endpoint (token
+set similarity). Numbers and negations are kept as tokens ("no fever" never
+matches "fever"), but word order is not, so only use similarity=True where a
+near-miss answer is harmless - never for clinical inputs. Only successful
+(non-None) results are cached.
+
+The normalized input is stored next to the response. For analyze_symptoms it
+is the training data of the local triage classifier (app.utils.symptom_triage);
+it carries no patient identifiers, expires with the entry and is removed by
+clear("analyze_symptoms").
+
+Usage:
+    @ai_cached("generate_blog_outline")
+    def generate_blog_outline(topic: str) -> Optional[Dict]: ...
+
+    generate_blog_outline("Knee pain", bypass_cache=True)   # force a fresh call
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from app.ai_usage import usage_tracker
+from app.config import settings
+from app.database import SessionLocal
+from app.models import AIResponseCache
+from app.utils.cache import TTLCache
+
+# Recent inputs kept per endpoint for fuzzy matching
+SIMILARITY_INDEX_SIZE = 500
+
+_STOPWORDS = frozenset(
+    "a an and are at be been for from have has i im in is it its me my of on or "
+    "since the to was with very really bit some".split()
+)
+
+# Kept as tokens and attached to the next word, so "no fever" != "fever"
+_NEGATIONS = frozenset("no not without never nor none cannot".split())
+
+_memory = TTLCache(maxsize=settings.AI_CACHE_MAX_ENTRIES, ttl=settings.AI_CACHE_TTL_SECONDS)
+_similarity_index: Dict[str, "OrderedDict[str, frozenset]"] = defaultdict(OrderedDict)
+_metrics: Dict[str, Counter] = defaultdict(Counter)
+_lock = threading.Lock()
+
+
+def normalize_text(value: Any) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = re.sub(r"[^\w\s]", " ", str(value if value is not None else "").lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _normalize_arguments(arguments: Dict[str, Any]) -> str:
+    return "|".join(f"{name}={normalize_text(value)}" for name, value in sorted(arguments.items()))
+
+
+def _make_key(endpoint: str, normalized: str) -> str:
+    return hashlib.sha256(f"{endpoint}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+def _memory_key(endpoint: str, key: str) -> str:
+    return f"{endpoint}:{key}"
+
+
+def _tokens(normalized: str) -> frozenset:
+    # Drop the "name=" prefixes and very short/common words, keeping numbers and negations
+    words = re.sub(r"\b\w+=", " ", normalized).replace("|", " ").split()
+    tokens = set()
+    negated = False
+    for word in words:
+        if word in _NEGATIONS:
+            tokens.add(word)
+            negated = True
+        elif word.isdigit() or (len(word) > 2 and word not in _STOPWORDS):
+            tokens.add(f"not_{word}" if negated else word)
+            negated = False
+    return frozenset(tokens)
+
+
+def _record(endpoint: str, metric: str):
+    with _lock:
+        _metrics[endpoint][metric] += 1
+
+
+def _remember_tokens(endpoint: str, key: str, normalized: str):
+    with _lock:
+        index = _similarity_index[endpoint]
+        index[key] = _tokens(normalized)
+        index.move_to_end(key)
+        while len(index) > SIMILARITY_INDEX_SIZE:
+            index.popitem(last=False)
+
+
+def _load_from_db(key: str) -> Optional[str]:
+    db = SessionLocal()
+    try:
+        row = db.query(AIResponseCache).filter(AIResponseCache.cache_key == key).first()
+        if not row:
+            return None
+        if row.expires_at < datetime.utcnow():
+            db.delete(row)
+            db.commit()
+            return None
+        row.hit_count = (row.hit_count or 0) + 1
+        row.last_hit_at = datetime.utcnow()
+        db.commit()
+        return row.response
+    finally:
+        db.close()
+
+
+def _find_similar(endpoint: str, normalized: str) -> Optional[str]:
+    """Key of the most similar recent input above the threshold, if any"""
+    threshold = settings.AI_CACHE_SIMILARITY_THRESHOLD
+    query = _tokens(normalized)
+    if threshold <= 0 or not query:
+        return None
+    best_key, best_score = None, 0.0
+    with _lock:
+        candidates = list(_similarity_index[endpoint].items())
+    for key, tokens in candidates:
+        if not tokens:
+            continue
+        score = len(query & tokens) / len(query | tokens)
+        if score > best_score:
+            best_key, best_score = key, score
+    return best_key if best_score >= threshold else None
+
+
+def lookup(endpoint: str, normalized: str, similarity: bool = False) -> Optional[Any]:
+    """Return a cached result for these normalized inputs, or None"""
+    key = _make_key(endpoint, normalized)
+
+    cached = _memory.get(_memory_key(endpoint, key))
+    if cached is not None:
+        _record(endpoint, "memory_hits")
+        return json.loads(cached)
+
+    try:
+        cached = _load_from_db(key)
+    except Exception as e:
+        print(f"AI cache lookup error: {e}")
+        cached = None
+    if cached is not None:
+        _memory.set(_memory_key(endpoint, key), cached)
+        _remember_tokens(endpoint, key, normalized)
+        _record(endpoint, "db_hits")
+        return json.loads(cached)
+
+    if similarity:
+        similar_key = _find_similar(endpoint, normalized)
+        if similar_key:
+            cached = _memory.get(_memory_key(endpoint, similar_key))
+            if cached is None:
+                try:
+                    cached = _load_from_db(similar_key)
+                except Exception as e:
+                    print(f"AI cache lookup error: {e}")
+            if cached is not None:
+                _record(endpoint, "similar_hits")
+                return json.loads(cached)
+
+    _record(endpoint, "misses")
+    return None
+
+
+def store(endpoint: str, normalized: str, value: Any):
+    """Cache a result in memory and in the ai_response_cache table"""
+    key = _make_key(endpoint, normalized)
+    payload = json.dumps(value)
+    _memory.set(_memory_key(endpoint, key), payload)
+    _remember_tokens(endpoint, key, normalized)
+    _record(endpoint, "stores")
+
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.AI_CACHE_TTL_SECONDS)
+    db = SessionLocal()
+    try:
+        row = db.query(AIResponseCache).filter(AIResponseCache.cache_key == key).first()
+        if row:
+            row.response = payload
+            row.expires_at = expires_at
+        else:
+            db.add(AIResponseCache(
+                cache_key=key,
+                endpoint=endpoint,
+                normalized_input=normalized,
+                response=payload,
+                expires_at=expires_at
+            ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"AI cache store error: {e}")
+    finally:
+        db.close()
+
+
+def ai_cached(endpoint: str, similarity: bool = False):
+    """
+    Cache decorator for AI functions (sync or async). Adds a keyword-only
+    `bypass_cache` argument that skips the lookup but still refreshes the cache.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def normalized_call(args, kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return _normalize_arguments(bound.arguments)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, bypass_cache: bool = False, **kwargs):
+                if not settings.AI_CACHE_ENABLED:
+                    return await func(*args, **kwargs)
+                normalized = normalized_call(args, kwargs)
+                if bypass_cache:
+                    _record(endpoint, "bypassed")
+                else:
+                    cached = await asyncio.to_thread(lookup, endpoint, normalized, similarity)
+                    if cached is not None:
+                        usage_tracker.record(endpoint, cache_hit=True)
+                        return cached
+                result = await func(*args, **kwargs)
+                if result is not None:
+                    await asyncio.to_thread(store, endpoint, normalized, result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, bypass_cache: bool = False, **kwargs):
+            if not settings.AI_CACHE_ENABLED:
+                return func(*args, **kwargs)
+            normalized = normalized_call(args, kwargs)
+            if bypass_cache:
+                _record(endpoint, "bypassed")
+            else:
+                cached = lookup(endpoint, normalized, similarity)
+                if cached is not None:
+                    usage_tracker.record(endpoint, cache_hit=True)
+                    return cached
+            result = func(*args, **kwargs)
+            if result is not None:
+                store(endpoint, normalized, result)
+            return result
+        return wrapper
+
+    return decorator
+
+
+def get_stats() -> Dict[str, Any]:
+    """Hit-rate metrics per endpoint plus storage sizes"""
+    with _lock:
+        metrics = {endpoint: dict(counts) for endpoint, counts in _metrics.items()}
+
+    endpoints = {}
+    for endpoint, counts in metrics.items():
+        hits = counts.get("memory_hits", 0) + counts.get("db_hits", 0) + counts.get("similar_hits", 0)
+        lookups = hits + counts.get("misses", 0)
+        endpoints[endpoint] = {
+            **counts,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    db = SessionLocal()
+    try:
+        stored = db.query(AIResponseCache).count()
+    finally:
+        db.close()
+
+    return {
+        "enabled": settings.AI_CACHE_ENABLED,
+        "memory_entries": _memory.stats()["entries"],
+        "stored_entries": stored,
+        "endpoints": endpoints,
+    }
+
+
+def clear(endpoint: Optional[str] = None) -> int:
+    """Drop cached responses (all, or for one endpoint). Returns stored rows deleted."""
+    if endpoint:
+        _memory.invalidate_prefix(f"{endpoint}:")
+        with _lock:
+            _similarity_index.pop(endpoint, None)
+    else:
+        _memory.clear()
+        with _lock:
+            _similarity_index.clear()
+
+    db = SessionLocal()
+    try:
+        query = db.query(AIResponseCache)
+        if endpoint:
+            query = query.filter(AIResponseCache.endpoint == endpoint)
+        deleted = query.delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    finally:
+        db.close()
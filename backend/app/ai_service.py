@@ -2,33 +2,119 @@
 AI Service module for OpenAI integration
 Provides AI-powered features throughout the application
 """
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, APIStatusError, APITimeoutError, APIConnectionError, RateLimitError
 from app.config import settings
-from typing import Optional, List, Dict
+from app.ai_cache import ai_cached
+from app.ai_usage import usage_tracker
+from typing import Optional, List, Dict, AsyncIterator
+import asyncio
 import json
+import random
+import time
 
 # Initialize OpenAI client
 client = None
+async_client = None
+_async_semaphore = None
+
+# Cap for a single backoff sleep between retries (seconds)
+MAX_RETRY_DELAY = 8.0
 
 def get_openai_client():
     global client
     if client is None and settings.OPENAI_API_KEY:
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        client = OpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=settings.OPENAI_TIMEOUT_SECONDS
+        )
     return client
 
 
+def get_async_openai_client():
+    """Async client for handlers running on the event loop (retries are done here, with jitter)"""
+    global async_client
+    if async_client is None and settings.OPENAI_API_KEY:
+        async_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=settings.OPENAI_TIMEOUT_SECONDS,
+            max_retries=0
+        )
+    return async_client
+
+
+def _get_async_semaphore() -> asyncio.Semaphore:
+    """Global limit on concurrent async OpenAI calls in this worker"""
+    global _async_semaphore
+    if _async_semaphore is None:
+        _async_semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+    return _async_semaphore
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (RateLimitError, APITimeoutError, APIConnectionError, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Full-jitter exponential backoff, honouring Retry-After when the API sends it"""
+    delay = random.uniform(0, min(MAX_RETRY_DELAY, 0.5 * (2 ** attempt)))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            delay = max(delay, min(MAX_RETRY_DELAY, float(retry_after)))
+        except ValueError:
+            pass
+    return delay
+
+
+def _record_usage(endpoint: str, usage, started: float, success: bool = True):
+    """Account one API call (usage is the response's usage object, if any)"""
+    usage_tracker.record(
+        endpoint,
+        model=settings.OPENAI_MODEL,
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        latency_ms=(time.perf_counter() - started) * 1000,
+        success=success
+    )
+
+
+def _parse_json_response(response: Optional[str]) -> Optional[Dict]:
+    """Parse a JSON completion, stripping markdown code fences if present"""
+    if not response:
+        return None
+    try:
+        if response.startswith("```"):
+            response = response.split("```")[1]
+            if response.startswith("json"):
+                response = response[4:]
+        return json.loads(response.strip())
+    except json.JSONDecodeError:
+        return None
+
+
 def generate_chat_response(
     messages: List[Dict[str, str]],
     max_tokens: Optional[int] = None,
-    temperature: Optional[float] = None
+    temperature: Optional[float] = None,
+    endpoint: str = "default"
 ) -> Optional[str]:
     """
     Generate a response using OpenAI chat completion
+    `endpoint` names the feature for usage accounting and token budgets.
     """
     openai_client = get_openai_client()
     if not openai_client:
         return None
     
+    if not usage_tracker.check_budget(endpoint):
+        return None
+    
+    started = time.perf_counter()
     try:
         response = openai_client.chat.completions.create(
             model=settings.OPENAI_MODEL,
@@ -36,12 +122,131 @@ def generate_chat_response(
             max_tokens=max_tokens or settings.OPENAI_MAX_TOKENS,
             temperature=temperature or settings.OPENAI_TEMPERATURE
         )
+        _record_usage(endpoint, response.usage, started)
         return response.choices[0].message.content
     except Exception as e:
+        _record_usage(endpoint, None, started, success=False)
         print(f"OpenAI API error: {e}")
         return None
 
 
+async def agenerate_chat_response(
+    messages: List[Dict[str, str]],
+    max_tokens: Optional[int] = None,
+    temperature: Optional[float] = None,
+    endpoint: str = "default"
+) -> Optional[str]:
+    """
+    Async variant of generate_chat_response.
+    Bounded by a per-worker semaphore, with a per-call timeout and
+    jittered retries on 429/5xx/timeouts.
+    """
+    openai_client = get_async_openai_client()
+    if not openai_client:
+        return None
+    
+    if not await usage_tracker.acheck_budget(endpoint):
+        return None
+    
+    started = time.perf_counter()
+    for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+        try:
+            async with _get_async_semaphore():
+                response = await asyncio.wait_for(
+                    openai_client.chat.completions.create(
+                        model=settings.OPENAI_MODEL,
+                        messages=messages,
+                        max_tokens=max_tokens or settings.OPENAI_MAX_TOKENS,
+                        temperature=temperature or settings.OPENAI_TEMPERATURE
+                    ),
+                    timeout=settings.OPENAI_TIMEOUT_SECONDS
+                )
+            _record_usage(endpoint, response.usage, started)
+            return response.choices[0].message.content
+        except Exception as e:
+            if attempt < settings.OPENAI_MAX_RETRIES and _is_retryable(e):
+                # Sleep outside the semaphore so waiting calls can proceed
+                await asyncio.sleep(_retry_delay(e, attempt))
+                continue
+            _record_usage(endpoint, None, started, success=False)
+            print(f"OpenAI API error: {e}")
+            return None
+    return None
+
+
+async def astream_chat_response(
+    messages: List[Dict[str, str]],
+    max_tokens: Optional[int] = None,
+    temperature: Optional[float] = None,
+    endpoint: str = "default"
+) -> AsyncIterator[str]:
+    """
+    Stream completion tokens as they arrive from the model.
+    Opening the stream is retried like agenerate_chat_response; each chunk
+    must arrive within OPENAI_TIMEOUT_SECONDS. A chunk timeout or API error
+    once tokens are flowing is recorded as a failed call and re-raised, so the
+    caller can tell a cut-off answer from a complete one. Closing or cancelling
+    the iterator closes the upstream HTTP stream so no further tokens are consumed.
+    """
+    openai_client = get_async_openai_client()
+    if not openai_client:
+        return
+    
+    if not await usage_tracker.acheck_budget(endpoint):
+        return
+    
+    started = time.perf_counter()
+    async with _get_async_semaphore():
+        stream = None
+        for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+            try:
+                stream = await asyncio.wait_for(
+                    openai_client.chat.completions.create(
+                        model=settings.OPENAI_MODEL,
+                        messages=messages,
+                        max_tokens=max_tokens or settings.OPENAI_MAX_TOKENS,
+                        temperature=temperature or settings.OPENAI_TEMPERATURE,
+                        stream=True,
+                        stream_options={"include_usage": True}  # Final chunk carries token usage
+                    ),
+                    timeout=settings.OPENAI_TIMEOUT_SECONDS
+                )
+                break
+            except Exception as e:
+                if attempt < settings.OPENAI_MAX_RETRIES and _is_retryable(e):
+                    await asyncio.sleep(_retry_delay(e, attempt))
+                    continue
+                _record_usage(endpoint, None, started, success=False)
+                print(f"OpenAI API error: {e}")
+                return
+        
+        if stream is None:
+            return
+        
+        chunks = stream.__aiter__()
+        usage = None
+        completed = False
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=settings.OPENAI_TIMEOUT_SECONDS)
+                except StopAsyncIteration:
+                    completed = True
+                    break
+                except Exception as e:
+                    print(f"OpenAI stream error: {e!r}")
+                    raise
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Cancelled streams report no usage; they are still counted as calls
+            _record_usage(endpoint, usage, started, success=completed)
+            await stream.close()
+
+
+@ai_cached("generate_service_description")
 def generate_service_description(service_name: str, short_description: str) -> Optional[Dict]:
     """
     Generate detailed service content using AI
@@ -67,7 +272,7 @@ Respond ONLY with valid JSON, no markdown or explanations."""
         {"role": "user", "content": prompt}
     ]
     
-    response = generate_chat_response(messages, max_tokens=2000, temperature=0.7)
+    response = generate_chat_response(messages, max_tokens=2000, temperature=0.7, endpoint="generate_service_description")
     if response:
         try:
             # Clean response if it has markdown code blocks
@@ -81,6 +286,7 @@ Respond ONLY with valid JSON, no markdown or explanations."""
     return None
 
 
+@ai_cached("generate_doctor_bio")
 def generate_doctor_bio(name: str, specialization: str, experience_years: int, qualification: str) -> Optional[Dict]:
     """
     Generate doctor bio and story using AI
@@ -106,7 +312,7 @@ Respond ONLY with valid JSON, no markdown or explanations."""
         {"role": "user", "content": prompt}
     ]
     
-    response = generate_chat_response(messages, max_tokens=1500, temperature=0.7)
+    response = generate_chat_response(messages, max_tokens=1500, temperature=0.7, endpoint="generate_doctor_bio")
     if response:
         try:
             if response.startswith("```"):
@@ -146,7 +352,7 @@ Write the reply only, no explanations."""
         {"role": "user", "content": prompt}
     ]
     
-    return generate_chat_response(messages, max_tokens=500, temperature=0.7)
+    return generate_chat_response(messages, max_tokens=500, temperature=0.7, endpoint="generate_ai_reply_to_inquiry")
 
 
 def generate_testimonial_response(patient_name: str, rating: int, content: str) -> Optional[str]:
@@ -173,13 +379,10 @@ Write the response only, no explanations."""
         {"role": "user", "content": prompt}
     ]
     
-    return generate_chat_response(messages, max_tokens=150, temperature=0.7)
+    return generate_chat_response(messages, max_tokens=150, temperature=0.7, endpoint="generate_testimonial_response")
 
 
-def analyze_symptoms(symptoms: str) -> Optional[Dict]:
-    """
-    Analyze patient symptoms and suggest relevant services/specialists
-    """
+def _symptom_messages(symptoms: str) -> List[Dict[str, str]]:
     prompt = f"""You are a medical assistant for a physiotherapy clinic.
 
 A patient describes these symptoms: {symptoms}
@@ -195,28 +398,29 @@ IMPORTANT: This is for informational purposes only. Always recommend consulting
 
 Respond ONLY with valid JSON."""
 
-    messages = [
+    return [
         {"role": "system", "content": "You are a helpful medical assistant providing preliminary guidance. Always recommend professional consultation."},
         {"role": "user", "content": prompt}
     ]
-    
-    response = generate_chat_response(messages, max_tokens=500, temperature=0.5)
-    if response:
-        try:
-            if response.startswith("```"):
-                response = response.split("```")[1]
-                if response.startswith("json"):
-                    response = response[4:]
-            return json.loads(response.strip())
-        except json.JSONDecodeError:
-            return None
-    return None
 
 
-def chat_with_assistant(user_message: str, conversation_history: List[Dict] = None) -> Optional[str]:
+@ai_cached("analyze_symptoms")
+def analyze_symptoms(symptoms: str) -> Optional[Dict]:
     """
-    General chat with AI assistant for the clinic
+    Analyze patient symptoms and suggest relevant services/specialists
     """
+    response = generate_chat_response(_symptom_messages(symptoms), max_tokens=500, temperature=0.5, endpoint="analyze_symptoms")
+    return _parse_json_response(response)
+
+
+@ai_cached("analyze_symptoms")
+async def aanalyze_symptoms(symptoms: str) -> Optional[Dict]:
+    """Async variant of analyze_symptoms"""
+    response = await agenerate_chat_response(_symptom_messages(symptoms), max_tokens=500, temperature=0.5, endpoint="analyze_symptoms")
+    return _parse_json_response(response)
+
+
+def _chat_messages(user_message: str, conversation_history: List[Dict] = None, summary: Optional[str] = None, knowledge: Optional[List[str]] = None) -> List[Dict]:
     system_prompt = """You are a helpful AI assistant for NovaCare 24/7 Physiotherapy Clinics.
 
 About NovaCare 24/7:
@@ -235,12 +439,67 @@ Always be professional, empathetic, and helpful. For specific medical advice, re
 
     messages = [{"role": "system", "content": system_prompt}]
     
+    if knowledge:
+        facts = "\n".join(f"- {snippet}" for snippet in knowledge)
+        messages.append({
+            "role": "system",
+            "content": f"Relevant NovaCare information (prefer this over general knowledge; do not invent prices, doctors or locations):\n{facts}"
+        })
+    
+    if summary:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+    
     if conversation_history:
         messages.extend(conversation_history)
     
     messages.append({"role": "user", "content": user_message})
     
-    return generate_chat_response(messages, max_tokens=500, temperature=0.7)
+    return messages
+
+
+def chat_with_assistant(user_message: str, conversation_history: List[Dict] = None, summary: Optional[str] = None, knowledge: Optional[List[str]] = None) -> Optional[str]:
+    """
+    General chat with AI assistant for the clinic
+    """
+    messages = _chat_messages(user_message, conversation_history, summary, knowledge)
+    return generate_chat_response(messages, max_tokens=500, temperature=0.7, endpoint="chat")
+
+
+async def achat_with_assistant(user_message: str, conversation_history: List[Dict] = None, summary: Optional[str] = None, knowledge: Optional[List[str]] = None) -> Optional[str]:
+    """Async variant of chat_with_assistant"""
+    messages = _chat_messages(user_message, conversation_history, summary, knowledge)
+    return await agenerate_chat_response(messages, max_tokens=500, temperature=0.7, endpoint="chat")
+
+
+async def astream_chat_with_assistant(user_message: str, conversation_history: List[Dict] = None, summary: Optional[str] = None, knowledge: Optional[List[str]] = None) -> AsyncIterator[str]:
+    """Streaming variant of chat_with_assistant, yields tokens as they arrive"""
+    messages = _chat_messages(user_message, conversation_history, summary, knowledge)
+    async for token in astream_chat_response(messages, max_tokens=500, temperature=0.7, endpoint="chat"):
+        yield token
+
+
+@ai_cached("chat_summary")
+async def asummarize_conversation(previous_summary: str, messages: List[Dict]) -> Optional[str]:
+    """
+    Fold older chat turns into a rolling summary.
+    Cached per (previous summary, turns) so replayed histories don't re-summarize.
+    """
+    transcript = "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages)
+    prompt = f"""Summary of the conversation so far:
+{previous_summary or "(none)"}
+
+New messages:
+{transcript}
+
+Update the summary to include the new messages. Keep the patient's symptoms, concerns,
+preferences (location, timing, visit type) and any services or advice already discussed.
+Write at most 120 words of plain text."""
+
+    summary = await agenerate_chat_response([
+        {"role": "system", "content": "You summarize clinic chat conversations concisely and factually."},
+        {"role": "user", "content": prompt}
+    ], max_tokens=250, temperature=0.2, endpoint="chat_summary")
+    return summary.strip() if summary else None
 
 
 def generate_blog_article(topic: str, keywords: Optional[str] = None, target_audience: Optional[str] = None) -> Optional[Dict]:
@@ -289,7 +548,7 @@ Respond ONLY with valid JSON, no markdown code blocks."""
         {"role": "user", "content": prompt}
     ]
     
-    response = generate_chat_response(messages, max_tokens=4000, temperature=0.7)
+    response = generate_chat_response(messages, max_tokens=4000, temperature=0.7, endpoint="generate_blog_article")
     if response:
         try:
             # Clean response if it has markdown code blocks
@@ -304,6 +563,7 @@ Respond ONLY with valid JSON, no markdown code blocks."""
     return None
 
 
+@ai_cached("generate_blog_outline")
 def generate_blog_outline(topic: str) -> Optional[Dict]:
     """
     Generate a blog article outline for review before full generation
@@ -328,7 +588,7 @@ Respond ONLY with valid JSON."""
         {"role": "user", "content": prompt}
     ]
     
-    response = generate_chat_response(messages, max_tokens=1000, temperature=0.7)
+    response = generate_chat_response(messages, max_tokens=1000, temperature=0.7, endpoint="generate_blog_outline")
     if response:
         try:
             if response.startswith("```"):
@@ -368,7 +628,7 @@ Respond with the improved HTML content only, no explanations."""
         {"role": "user", "content": prompt}
     ]
     
-    return generate_chat_response(messages, max_tokens=4000, temperature=0.6)
+    return generate_chat_response(messages, max_tokens=4000, temperature=0.6, endpoint="improve_blog_content")
 
 
 # ============ DOCTOR ONBOARDING AI FUNCTIONS ============
@@ -423,7 +683,7 @@ Respond ONLY with valid JSON."""
         {"role": "user", "content": prompt}
     ]
     
-    response = generate_chat_response(messages, max_tokens=1000, temperature=0.3)
+    response = generate_chat_response(messages, max_tokens=1000, temperature=0.3, endpoint="verify_doctor_credentials")
     if response:
         try:
             if response.startswith("```"):
@@ -436,6 +696,7 @@ Respond ONLY with valid JSON."""
     return None
 
 
+@ai_cached("generate_interview_questions")
 def generate_interview_questions(
     name: str,
     specialization: str,
@@ -475,7 +736,7 @@ Respond ONLY with valid JSON."""
         {"role": "user", "content": prompt}
     ]
     
-    response = generate_chat_response(messages, max_tokens=2000, temperature=0.6)
+    response = generate_chat_response(messages, max_tokens=2000, temperature=0.6, endpoint="generate_interview_questions")
     if response:
         try:
             if response.startswith("```"):
@@ -523,7 +784,7 @@ Respond ONLY with valid JSON."""
         {"role": "user", "content": prompt}
     ]
     
-    response = generate_chat_response(messages, max_tokens=3000, temperature=0.6)
+    response = generate_chat_response(messages, max_tokens=3000, temperature=0.6, endpoint="generate_training_content")
     if response:
         try:
             if response.startswith("```"):
@@ -573,7 +834,7 @@ Respond ONLY with valid JSON."""
         {"role": "user", "content": prompt}
     ]
     
-    response = generate_chat_response(messages, max_tokens=800, temperature=0.5)
+    response = generate_chat_response(messages, max_tokens=800, temperature=0.5, endpoint="analyze_doctor_performance")
     if response:
         try:
             if response.startswith("```"):
@@ -625,7 +886,7 @@ Respond ONLY with valid JSON."""
         {"role": "user", "content": prompt}
     ]
     
-    response = generate_chat_response(messages, max_tokens=1000, temperature=0.6)
+    response = generate_chat_response(messages, max_tokens=1000, temperature=0.6, endpoint="generate_onboarding_email")
     if response:
         try:
             if response.startswith("```"):
@@ -0,0 +1,243 @@
+"""
+Token usage accounting and budgets for OpenAI calls.
+
+Every model call (and every AI response cache hit) is recorded with its
+endpoint, model, prompt/completion tokens and latency. Records are buffered in
+memory and written to the ai_usage_logs table in batches by a background
+thread, like the view counters.
+
+Per-endpoint daily token budgets come from AI_TOKEN_BUDGETS (JSON), e.g.
+
+    {"generate_blog_article": 200000, "chat": 500000, "total": 2000000}
+
+"total" caps all endpoints together. check_budget() is called before each API
+request; once a budget is used up the call is refused as if the API had
+failed, until midnight UTC.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models import AIUsageLog
+
+# Records per INSERT batch
+FLUSH_BATCH_SIZE = 500
+
+# How often today's totals are re-read from the database (other workers' usage)
+BUDGET_REFRESH_SECONDS = 30
+
+TOTAL_BUDGET_KEY = "total"
+
+
+def _load_budgets() -> Dict[str, int]:
+    if not settings.AI_TOKEN_BUDGETS:
+        return {}
+    try:
+        return {str(k): int(v) for k, v in json.loads(settings.AI_TOKEN_BUDGETS).items()}
+    except (TypeError, ValueError, AttributeError) as e:
+        print(f"Invalid AI_TOKEN_BUDGETS setting: {e}")
+        return {}
+
+
+class UsageTracker:
+    """Buffers usage records and enforces daily token budgets"""
+
+    def __init__(self, flush_interval: int = 10):
+        self.flush_interval = flush_interval
+        self.budgets = _load_budgets()
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # Today's token totals per endpoint: database snapshot + usage since
+        self._day: Optional[date] = None
+        self._db_totals: Counter = Counter()
+        self._local_totals: Counter = Counter()
+        self._refreshed_at = 0.0
+
+    # --- recording ---
+
+    def record(
+        self,
+        endpoint: str,
+        model: Optional[str] = None,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        latency_ms: int = 0,
+        cache_hit: bool = False,
+        success: bool = True
+    ):
+        total = (prompt_tokens or 0) + (completion_tokens or 0)
+        with self._lock:
+            self._pending.append({
+                "endpoint": endpoint,
+                "model": model,
+                "prompt_tokens": prompt_tokens or 0,
+                "completion_tokens": completion_tokens or 0,
+                "total_tokens": total,
+                "latency_ms": int(latency_ms),
+                "cache_hit": cache_hit,
+                "success": success,
+                "created_at": datetime.utcnow(),
+            })
+            if total:
+                self._local_totals[endpoint] += total
+                self._local_totals[TOTAL_BUDGET_KEY] += total
+
+    def flush(self) -> int:
+        """Write buffered records to the database. Returns rows written."""
+        with self._flush_lock:
+            with self._lock:
+                records, self._pending = self._pending, []
+            if not records:
+                return 0
+            try:
+                with engine.begin() as conn:
+                    for start in range(0, len(records), FLUSH_BATCH_SIZE):
+                        conn.execute(AIUsageLog.__table__.insert(), records[start:start + FLUSH_BATCH_SIZE])
+                return len(records)
+            except Exception as e:
+                print(f"AI usage flush failed: {e}")
+                with self._lock:
+                    self._pending = records + self._pending
+                return 0
+
+    # --- budgets ---
+
+    def _refresh_totals(self):
+        """Re-read today's totals from the database (caller holds no locks)"""
+        self.flush()
+        today = datetime.utcnow().date()
+        start = datetime.combine(today, datetime.min.time())
+        db = SessionLocal()
+        try:
+            rows = db.query(AIUsageLog.endpoint, func.sum(AIUsageLog.total_tokens)).filter(
+                AIUsageLog.created_at >= start
+            ).group_by(AIUsageLog.endpoint).all()
+        finally:
+            db.close()
+        totals = Counter({endpoint: int(tokens or 0) for endpoint, tokens in rows})
+        totals[TOTAL_BUDGET_KEY] = sum(totals.values())
+        with self._lock:
+            self._day = today
+            self._db_totals = totals
+            # Anything recorded since the flush above is not in the database yet
+            self._local_totals = Counter()
+            for record in self._pending:
+                if record["total_tokens"]:
+                    self._local_totals[record["endpoint"]] += record["total_tokens"]
+                    self._local_totals[TOTAL_BUDGET_KEY] += record["total_tokens"]
+            self._refreshed_at = time.monotonic()
+
+    def used_today(self, endpoint: str) -> int:
+        stale = (
+            self._day != datetime.utcnow().date()
+            or time.monotonic() - self._refreshed_at > BUDGET_REFRESH_SECONDS
+        )
+        if stale:
+            try:
+                self._refresh_totals()
+            except Exception as e:
+                print(f"AI usage totals refresh failed: {e}")
+        with self._lock:
+            return self._db_totals[endpoint] + self._local_totals[endpoint]
+
+    def check_budget(self, endpoint: str) -> bool:
+        """True if `endpoint` may call the API now"""
+        for key in (endpoint, TOTAL_BUDGET_KEY):
+            limit = self.budgets.get(key)
+            if limit is not None and self.used_today(key) >= limit:
+                print(f"AI token budget exhausted for '{key}' ({limit} tokens/day); refusing {endpoint} call")
+                self.record(endpoint, success=False)
+                return False
+        return True
+
+    async def acheck_budget(self, endpoint: str) -> bool:
+        """
+        check_budget for the event loop: the periodic totals refresh (a flush
+        and an aggregate query) runs in a worker thread
+        """
+        if not self.budgets:
+            return True
+        return await asyncio.to_thread(self.check_budget, endpoint)
+
+    def budget_status(self) -> Dict[str, Dict[str, int]]:
+        status = {}
+        for key, limit in self.budgets.items():
+            used = self.used_today(key)
+            status[key] = {"limit": limit, "used": used, "remaining": max(0, limit - used)}
+        return status
+
+    # --- background flusher ---
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def start(self):
+        """Start the periodic background flusher"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ai-usage-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write out whatever is still buffered"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval)
+            self._thread = None
+        self.flush()
+
+
+def daily_report(days: int = 30) -> List[Dict]:
+    """Per day and endpoint: calls, cache hits, failures, tokens and latency"""
+    usage_tracker.flush()
+    since = datetime.combine(datetime.utcnow().date() - timedelta(days=days - 1), datetime.min.time())
+    day = func.date(AIUsageLog.created_at)
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            day.label("day"),
+            AIUsageLog.endpoint,
+            func.count(AIUsageLog.id),
+            func.sum(case((AIUsageLog.cache_hit == True, 1), else_=0)),
+            func.sum(case((AIUsageLog.success == False, 1), else_=0)),
+            func.sum(AIUsageLog.prompt_tokens),
+            func.sum(AIUsageLog.completion_tokens),
+            func.sum(AIUsageLog.total_tokens),
+            func.avg(AIUsageLog.latency_ms),
+        ).filter(
+            AIUsageLog.created_at >= since
+        ).group_by(day, AIUsageLog.endpoint).order_by(day.desc(), AIUsageLog.endpoint).all()
+    finally:
+        db.close()
+
+    return [
+        {
+            "date": str(row[0]),
+            "endpoint": row[1],
+            "calls": row[2],
+            "cache_hits": int(row[3] or 0),
+            "failures": int(row[4] or 0),
+            "prompt_tokens": int(row[5] or 0),
+            "completion_tokens": int(row[6] or 0),
+            "total_tokens": int(row[7] or 0),
+            "avg_latency_ms": round(float(row[8] or 0), 1),
+        }
+        for row in rows
+    ]
+
+
+# Singleton instance
+usage_tracker = UsageTracker(flush_interval=settings.AI_USAGE_FLUSH_SECONDS)
@@ -10,9 +10,47 @@ class Settings(BaseSettings):
     
     # OpenAI Configuration
     OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = ""  # Optional: OpenAI-compatible server, e.g. http://localhost:8100/v1 (openai_standin.py)
     OPENAI_MODEL: str = "gpt-4o"
     OPENAI_MAX_TOKENS: int = 4000
     OPENAI_TEMPERATURE: float = 0.7
+    OPENAI_TIMEOUT_SECONDS: float = 30.0  # Per-call timeout for chat completions
+    OPENAI_MAX_CONCURRENCY: int = 8  # Max in-flight async OpenAI calls per worker
+    OPENAI_MAX_RETRIES: int = 3  # Retries on 429/5xx/timeouts (with jittered backoff)
+    
+    # AI usage accounting
+    AI_USAGE_FLUSH_SECONDS: int = 10  # How often buffered usage records are written
+    AI_TOKEN_BUDGETS: str = ""  # JSON daily token limits, e.g. {"generate_blog_article": 200000, "total": 2000000}
+    
+    # AI Response Cache
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL_SECONDS: int = 60 * 60 * 24 * 7  # 7 days
+    AI_CACHE_MAX_ENTRIES: int = 2000  # In-memory LRU size per worker
+    AI_CACHE_SIMILARITY_THRESHOLD: float = 0.85  # Token-set similarity for fuzzy hits (0 disables)
+    
+    # Chat context
+    CHAT_CONTEXT_MAX_TOKENS: int = 1500  # Budget for summary + history sent with each turn
+    CHAT_RECENT_MESSAGES: int = 6  # Most recent messages always kept verbatim
+    CHAT_SESSION_TTL_HOURS: int = 24  # Idle chat sessions expire after this
+    CHAT_RETRIEVAL_TOP_K: int = 4  # Clinic data snippets added to each turn (0 disables)
+    
+    # Blog generation
+    BLOG_BATCH_CONCURRENCY: int = 3  # Parallel AI calls when generating a batch of articles
+    BLOG_DUPLICATE_THRESHOLD: float = 0.5  # Estimated shingle overlap that counts as a near-duplicate
+    
+    # Background jobs
+    JOB_MAX_CONCURRENCY: int = 4  # Jobs run in parallel per worker process
+    JOB_STALE_MINUTES: int = 30  # Unfinished jobs without a heartbeat for this long are marked failed
+    JOB_HEARTBEAT_SECONDS: int = 60  # How often a worker refreshes its queued/running jobs (well under JOB_STALE_MINUTES)
+    
+    # Cache invalidation across worker processes
+    CACHE_INVALIDATION_BUS: str = "auto"  # postgres (LISTEN/NOTIFY), memory (this process only), auto = by database
+    CACHE_INVALIDATION_CHANNEL: str = "novacare_cache_invalidation"
+    
+    # Local symptom triage (answered without the LLM when confident)
+    SYMPTOM_TRIAGE_ENABLED: bool = True
+    SYMPTOM_TRIAGE_MIN_SCORE: float = 0.35  # Minimum cosine similarity to the best service
+    SYMPTOM_TRIAGE_MIN_MARGIN: float = 0.25  # Required relative lead over the runner-up
     
     # Email Configuration
     SMTP_HOST: str = "smtp.gmail.com"
@@ -29,6 +67,29 @@ class Settings(BaseSettings):
     S3_BUCKET_NAME: str = ""
     S3_PRESIGNED_URL_EXPIRY: int = 3600  # 1 hour expiry for presigned URLs
     CLOUDFRONT_DOMAIN: str = ""  # Optional: CloudFront CDN domain for faster delivery
+    S3_DIRECT_UPLOAD_MAX_BYTES: int = 5 * 1024 * 1024  # Largest file accepted by POST /api/uploads/direct
+    S3_MULTIPART_CHUNK_BYTES: int = 8 * 1024 * 1024  # Part size for streamed uploads (S3 minimum is 5MB)
+    S3_PRESIGNED_PART_BYTES: int = 5 * 1024 * 1024  # Part size for presigned multipart uploads from browsers
+    S3_SIGNED_URL_CACHE_SIZE: int = 5000  # Presigned download URLs kept for reuse
+    S3_SIGNED_URL_REFRESH_SECONDS: int = 300  # Re-sign cached URLs this long before they expire
+    S3_DEDUP_UPLOADS: bool = True  # Store server-side uploads by content hash and reuse identical files
+    S3_GC_GRACE_HOURS: int = 72  # Orphaned objects younger than this are kept (uploads not yet saved on a record)
+    S3_GC_DELETE_BATCH: int = 1000  # Keys per delete_objects call (S3 maximum is 1000)
+    S3_ENDPOINT_URL: str = ""  # Override for a local stand-in (moto server, MinIO); empty = AWS
+    S3_MAX_POOL_CONNECTIONS: int = 50  # Pooled HTTP connections shared by all threads (botocore default 10)
+    S3_RETRY_MODE: str = "adaptive"  # legacy, standard or adaptive (client-side rate limiting on throttles)
+    S3_MAX_ATTEMPTS: int = 5  # Including the first attempt
+    S3_CONNECT_TIMEOUT: int = 5  # Seconds
+    S3_READ_TIMEOUT: int = 30  # Seconds
+    
+    # Image variants (resized copies + blurhash for doctor, blog and facility photos)
+    IMAGE_VARIANT_WIDTHS: str = "320,640,1280"  # Comma-separated widths in pixels
+    IMAGE_VARIANT_FORMATS: str = "webp,avif"  # Formats Pillow can't write are skipped
+    IMAGE_VARIANT_QUALITY: int = 75
+    IMAGE_PROCESS_WORKERS: int = 2  # Processes decoding/encoding images
+    
+    # View Counters
+    VIEW_COUNTER_FLUSH_SECONDS: int = 10  # How often buffered page views are written to the DB
     
     class Config:
         env_file = ".env"
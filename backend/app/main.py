@@ -3,9 +3,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine, Base
 from app.routes import auth, doctors, bookings, services, testimonials, contact, admin
 from app.routes import site_settings, site_stats, branches, milestones, ai, blog, sitemap, uploads
-from app.routes import onboarding, clinic_onboarding
+from app.routes import onboarding, clinic_onboarding, jobs, bootstrap
 from app.config import settings
 from app.seed import seed_database
+from app.utils.view_counter import view_counter
+from app.utils.chat_context import purge_expired_sessions
+from app.utils.jobs import job_runner
+from app.ai_usage import usage_tracker
+from app.utils import image_variants
+from app.utils.invalidation_bus import invalidation_bus
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -43,6 +49,8 @@ app.include_router(sitemap.router)
 app.include_router(uploads.router)
 app.include_router(onboarding.router)
 app.include_router(clinic_onboarding.router)
+app.include_router(jobs.router)
+app.include_router(bootstrap.router)
 
 @app.get("/")
 def root():
@@ -65,3 +73,32 @@ async def startup_event():
         seed_database(db)
     finally:
         db.close()
+    
+    # Drop idle chat sessions
+    try:
+        purge_expired_sessions()
+    except Exception as e:
+        print(f"Chat session cleanup error: {e}")
+    
+    # Fail jobs left unfinished by a worker that died
+    try:
+        job_runner.recover_stale_jobs()
+    except Exception as e:
+        print(f"Background job recovery error: {e}")
+    
+    # Periodically flush buffered page views and AI usage records
+    view_counter.start()
+    usage_tracker.start()
+    
+    # Evict cache entries when another worker commits a change
+    invalidation_bus.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Write out any page views still held in memory
+    view_counter.stop()
+    usage_tracker.stop()
+    # Let running jobs finish
+    job_runner.shutdown(wait=True)
+    image_variants.shutdown()
+    invalidation_bus.stop()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Date, Time, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Date, Time, Enum, Float, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -54,6 +54,7 @@ class Doctor(Base):
     profile_image = Column(String(500))
     is_available = Column(Boolean, default=True)
     rating = Column(Integer, default=45)  # Rating out of 50 (display as 4.5/5.0)
+    view_count = Column(Integer, default=0, nullable=False, index=True)  # Profile views (write-behind)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -202,6 +203,15 @@ class SiteSetting(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class SiteSettingsVersion(Base):
+    """Single-row counter bumped in every transaction that changes site settings"""
+    __tablename__ = "site_settings_version"
+    
+    id = Column(Integer, primary_key=True)  # Always 1
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class SiteStat(Base):
     """Statistics displayed on the website (1,900+ centers, 39 states, etc.)"""
     __tablename__ = "site_stats"
@@ -451,6 +461,10 @@ class BlogArticle(Base):
     slug = Column(String(500), unique=True, nullable=False, index=True)
     excerpt = Column(Text)                              # Short description for listings
     content = Column(Text, nullable=False)              # Full article content (markdown)
+    content_html = Column(Text)                         # Sanitized HTML rendered from content on save
+    content_toc = Column(Text)                          # JSON array of headings [{level, id, text}]
+    reading_minutes = Column(Integer)                   # Estimated reading time from word count
+    rendered_at = Column(DateTime)                      # When content_html was last rendered
     category = Column(String(50), default="conditions")
     author = Column(String(255))
     author_role = Column(String(255))
@@ -462,10 +476,159 @@ class BlogArticle(Base):
     is_published = Column(Boolean, default=True)
     published_at = Column(DateTime, default=datetime.utcnow)
     display_order = Column(Integer, default=0)
+    view_count = Column(Integer, default=0, nullable=False, index=True)  # Page views (write-behind)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class BlogTag(Base):
+    """Normalized blog tag (tags on articles are linked through blog_article_tags)"""
+    __tablename__ = "blog_tags"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)          # Display name e.g. "Back Pain"
+    slug = Column(String(120), unique=True, nullable=False, index=True)  # e.g. "back-pain"
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class BlogArticleTag(Base):
+    """Association between blog articles and tags"""
+    __tablename__ = "blog_article_tags"
+    __table_args__ = (
+        Index("ix_blog_article_tags_tag_id", "tag_id"),
+    )
+    
+    article_id = Column(Integer, ForeignKey("blog_articles.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("blog_tags.id", ondelete="CASCADE"), primary_key=True)
+
+
+class BlogRelatedArticle(Base):
+    """Precomputed top-K content-similarity neighbours for each blog article"""
+    __tablename__ = "blog_related_articles"
+    __table_args__ = (
+        Index("ix_blog_related_articles_article_rank", "article_id", "rank"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    article_id = Column(Integer, ForeignKey("blog_articles.id", ondelete="CASCADE"), nullable=False)
+    related_article_id = Column(Integer, ForeignKey("blog_articles.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)               # Cosine similarity 0-1
+    rank = Column(Integer, nullable=False)              # 1 = most similar
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AIResponseCache(Base):
+    """Persistent cache of AI responses for deterministic endpoints"""
+    __tablename__ = "ai_response_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, nullable=False, index=True)  # sha256(endpoint + normalized input)
+    endpoint = Column(String(100), nullable=False, index=True)  # e.g. "analyze_symptoms"
+    normalized_input = Column(Text, nullable=False)     # Normalized prompt inputs (similarity lookups, symptom triage training)
+    response = Column(Text, nullable=False)             # JSON-encoded AI result
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    last_hit_at = Column(DateTime)
+
+
+class ChatSession(Base):
+    """Server-side chat context: rolling summary of older turns + recent turns verbatim"""
+    __tablename__ = "chat_sessions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String(64), unique=True, nullable=False, index=True)  # Opaque token given to the client
+    summary = Column(Text)  # Rolling summary of turns no longer kept verbatim
+    messages = Column(Text)  # JSON array of recent {"role", "content"} turns
+    summarized_count = Column(Integer, default=0)  # Number of turns folded into the summary
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every save (optimistic locking)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+
+class AIUsageLog(Base):
+    """One OpenAI call (or AI response cache hit) with its token usage"""
+    __tablename__ = "ai_usage_logs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    endpoint = Column(String(100), nullable=False, index=True)  # e.g. "generate_blog_article", "chat"
+    model = Column(String(100))
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    total_tokens = Column(Integer, default=0)
+    latency_ms = Column(Integer, default=0)
+    cache_hit = Column(Boolean, default=False)
+    success = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class BackgroundJob(Base):
+    """Long-running task (AI generation etc.) executed off the request, polled by job_id"""
+    __tablename__ = "background_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(36), unique=True, nullable=False, index=True)  # Public UUID
+    job_type = Column(String(100), nullable=False, index=True)  # e.g. "onboarding.ai_verification"
+    status = Column(String(20), default="queued", index=True)  # queued, running, succeeded, failed
+    progress = Column(Integer, default=0)  # 0-100
+    message = Column(String(500))  # Current step, shown while polling
+    params = Column(Text)  # JSON keyword arguments for the handler
+    result = Column(Text)  # JSON result once succeeded
+    error = Column(Text)
+    worker = Column(String(100))  # host:pid of the process running it
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Heartbeat
+
+
+class MultipartUpload(Base):
+    """Presigned S3 multipart upload; lets clients upload parts in parallel, retry and resume"""
+    __tablename__ = "multipart_uploads"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    upload_id = Column(String(512), unique=True, nullable=False, index=True)  # S3 UploadId
+    key = Column(String(500), nullable=False)  # S3 object key
+    content_type = Column(String(100), nullable=False)
+    file_size = Column(Integer, nullable=False)  # Declared size, checked on completion
+    part_size = Column(Integer, nullable=False)
+    part_count = Column(Integer, nullable=False)
+    status = Column(String(20), default="in_progress", index=True)  # in_progress, completed, aborted
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    completed_at = Column(DateTime)
+
+
+class ImageAsset(Base):
+    """Resized variants and blurhash placeholder of an uploaded image, keyed by its S3 key"""
+    __tablename__ = "image_assets"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    source_key = Column(String(500), unique=True, nullable=False, index=True)  # Original object key
+    width = Column(Integer)
+    height = Column(Integer)
+    blurhash = Column(String(64))
+    variants = Column(Text)  # JSON list of {"format", "width", "height", "key"}
+    status = Column(String(20), default="pending", index=True)  # pending, ready, failed
+    error = Column(String(500))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UploadBlob(Base):
+    """Content-addressed upload: one S3 object per distinct file and folder, shared by every upload of it"""
+    __tablename__ = "upload_blobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    key = Column(String(500), unique=True, nullable=False, index=True)  # folder/sha256/ab/<sha256>.<ext>
+    size = Column(Integer, nullable=False)
+    content_type = Column(String(100))
+    ref_count = Column(Integer, default=1, nullable=False)  # Uploads that returned this object
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+
 class ClinicOnboardingApplication(Base):
     """Clinic/Branch onboarding application with full workflow tracking"""
     __tablename__ = "clinic_onboarding_applications"
@@ -1,15 +1,29 @@
 """
 AI-powered endpoints for enhanced user experience
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
+import asyncio
+import json
 import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from app.database import get_db
 from app.models import User, BlogArticle
 from app.auth import get_admin_user
 from app import ai_service
+from app import ai_cache
+from app.ai_usage import daily_report, usage_tracker
+from app.config import settings
+from app.utils import chat_context, symptom_triage
+from app.utils.chat_retrieval import format_snippets, retrieval_index
+from app.utils.jobs import JobContext, job_handler, job_runner, submitted_response
+from app.utils.near_duplicates import build_article_index, minhash_signature
+from app.utils.related_articles import schedule_rebuild
+from app.utils.markdown_render import apply_rendered_content
+from app.utils.blog_tags import sync_article_tags
 
 router = APIRouter(prefix="/api/ai", tags=["AI"])
 
@@ -191,12 +205,15 @@ def get_relevant_image(topic: str) -> str:
 # ============ Request/Response Schemas ============
 
 class ChatRequest(BaseModel):
-    message: str
-    conversation_history: Optional[List[Dict]] = None
+    message: str = Field(..., max_length=chat_context.MAX_MESSAGE_CHARS)
+    # Ignored when session_id is given; only the most recent messages are used
+    conversation_history: Optional[List[Dict]] = Field(None, max_length=chat_context.MAX_HISTORY_MESSAGES)
+    session_id: Optional[str] = None  # From POST /chat/sessions; history is kept server-side
 
 class ChatResponse(BaseModel):
     response: str
     success: bool
+    session_id: Optional[str] = None
 
 class SymptomAnalysisRequest(BaseModel):
     symptoms: str
@@ -207,18 +224,21 @@ class SymptomAnalysisResponse(BaseModel):
     recommended_services: Optional[List[str]] = None
     urgency: Optional[str] = None
     specialist_type: Optional[str] = None
+    source: Optional[str] = None  # "local" (triage classifier) or "ai"
     success: bool
     message: Optional[str] = None
 
 class GenerateServiceContentRequest(BaseModel):
     service_name: str
     short_description: str
+    bypass_cache: bool = False  # Force a fresh generation
 
 class GenerateDoctorContentRequest(BaseModel):
     name: str
     specialization: str
     experience_years: int
     qualification: str
+    bypass_cache: bool = False
 
 class GenerateInquiryReplyRequest(BaseModel):
     inquiry_name: str
@@ -232,6 +252,7 @@ class GenerateBlogArticleRequest(BaseModel):
 
 class GenerateBlogOutlineRequest(BaseModel):
     topic: str
+    bypass_cache: bool = False
 
 class ImproveBlogContentRequest(BaseModel):
     content: str
@@ -245,33 +266,189 @@ class GenerateContentResponse(BaseModel):
 
 # ============ Public AI Endpoints ============
 
+CHAT_FALLBACK_MESSAGE = "I'm sorry, I'm unable to respond right now. Please try again or contact us directly at +91 1234567890."
+
+
+async def _prepare_chat_context(request: ChatRequest) -> Dict:
+    """Load the session (if any) and fit summary + history into the token budget"""
+    session = None
+    if request.session_id:
+        session = await asyncio.to_thread(chat_context.load_session, request.session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Chat session not found or expired")
+        summary, history = session["summary"], session["messages"]
+    else:
+        summary, history = None, chat_context.clean_history(request.conversation_history)
+    
+    # Client-sent history is never summarized: it would cost a model call per replay
+    summary, history, folded = await chat_context.compact_history(
+        history, summary, max_summary_calls=1 if session else 0
+    )
+    return {
+        "session": session,
+        "summary": summary,
+        "history": history,
+        "summarized_count": (session["summarized_count"] if session else 0) + folded,
+        "knowledge": await _retrieve_knowledge(request.message, history),
+    }
+
+
+async def _retrieve_knowledge(message: str, history: List[Dict]) -> List[str]:
+    """Top clinic data snippets for this turn (the previous user turn helps follow-ups)"""
+    if settings.CHAT_RETRIEVAL_TOP_K <= 0:
+        return []
+    previous = next((m["content"] for m in reversed(history) if m["role"] == "user"), "")
+    try:
+        results = await asyncio.to_thread(
+            retrieval_index.search, f"{message} {previous}", settings.CHAT_RETRIEVAL_TOP_K
+        )
+    except Exception as e:
+        print(f"Chat retrieval error: {e}")
+        return []
+    return format_snippets(results)
+
+
+async def _save_chat_turn(request: ChatRequest, context: Dict, reply: str):
+    """Append the finished turn to the server-side session"""
+    if not context["session"]:
+        return
+    turn = [
+        {"role": "user", "content": request.message},
+        {"role": "assistant", "content": reply},
+    ]
+    saved = await asyncio.to_thread(
+        chat_context.save_session,
+        request.session_id,
+        context["summary"],
+        context["history"] + turn,
+        context["summarized_count"],
+        context["session"]["version"]
+    )
+    if not saved:
+        # Another turn of this session was saved meanwhile; keep both
+        await asyncio.to_thread(chat_context.append_messages, request.session_id, turn)
+
+
+@router.post("/chat/sessions")
+async def create_chat_session():
+    """
+    Start a server-side chat session. Send the returned session_id with each
+    message instead of the full conversation_history.
+    """
+    session_id = await asyncio.to_thread(chat_context.create_session)
+    return {"session_id": session_id}
+
+
+@router.delete("/chat/sessions/{session_id}")
+async def delete_chat_session(session_id: str):
+    """End a chat session and discard its stored context"""
+    if not await asyncio.to_thread(chat_context.delete_session, session_id):
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return {"message": "Chat session deleted"}
+
+
 @router.post("/chat", response_model=ChatResponse)
-def chat_with_assistant(request: ChatRequest):
+async def chat_with_assistant(request: ChatRequest):
     """
     Chat with AI assistant for general inquiries
     Available to all users
     """
-    response = ai_service.chat_with_assistant(
+    context = await _prepare_chat_context(request)
+    response = await ai_service.achat_with_assistant(
         request.message,
-        request.conversation_history
+        context["history"],
+        context["summary"],
+        context["knowledge"]
     )
     
     if response:
-        return ChatResponse(response=response, success=True)
+        await _save_chat_turn(request, context, response)
+        return ChatResponse(response=response, success=True, session_id=request.session_id)
     else:
         return ChatResponse(
-            response="I'm sorry, I'm unable to respond right now. Please try again or contact us directly at +91 1234567890.",
-            success=False
+            response=CHAT_FALLBACK_MESSAGE,
+            success=False,
+            session_id=request.session_id
+        )
+
+
+def _sse_event(data: Dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Events message"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat/stream")
+async def stream_chat_with_assistant(request: ChatRequest):
+    """
+    Streaming chat: tokens are forwarded as Server-Sent Events as the model produces them.
+    Events: `data: {"token": "..."}` per chunk, then `event: done` (or `event: error`,
+    also when the model stream fails part-way - the partial answer isn't saved).
+    
+    Backpressure: the next upstream chunk is only read after the previous event has
+    been handed to the client connection. If the client disconnects, Starlette cancels
+    this generator and the upstream OpenAI stream is closed in the finally block.
+    """
+    context = await _prepare_chat_context(request)
+    
+    async def event_stream():
+        tokens = ai_service.astream_chat_with_assistant(
+            request.message,
+            context["history"],
+            context["summary"],
+            context["knowledge"]
         )
+        received = []
+        failed = False
+        try:
+            async for token in tokens:
+                received.append(token)
+                yield _sse_event({"token": token})
+            if received:
+                await _save_chat_turn(request, context, "".join(received))
+        except Exception as e:
+            # Timeouts and API errors after the first token (usage is already marked failed)
+            print(f"Chat stream error: {e!r}")
+            failed = True
+        finally:
+            await tokens.aclose()
+        
+        if received and not failed:
+            yield _sse_event({"success": True, "session_id": request.session_id}, event="done")
+        else:
+            yield _sse_event({
+                "success": False,
+                "message": CHAT_FALLBACK_MESSAGE,
+                "partial": bool(received),
+            }, event="error")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable nginx proxy buffering for this response
+        }
+    )
 
 
 @router.post("/analyze-symptoms", response_model=SymptomAnalysisResponse)
-def analyze_symptoms(request: SymptomAnalysisRequest):
+async def analyze_symptoms(request: SymptomAnalysisRequest):
     """
     Analyze symptoms and suggest relevant services
     Includes disclaimer about professional consultation
+    
+    Common, clear-cut cases are answered by the local triage classifier;
+    ambiguous or red-flag descriptions are escalated to the AI model.
     """
-    result = ai_service.analyze_symptoms(request.symptoms)
+    result = None
+    source = "ai"
+    if settings.SYMPTOM_TRIAGE_ENABLED:
+        result = await asyncio.to_thread(symptom_triage.classify, request.symptoms)
+        if result:
+            source = "local"
+    if not result:
+        result = await ai_service.aanalyze_symptoms(request.symptoms)
     
     if result:
         return SymptomAnalysisResponse(
@@ -280,6 +457,7 @@ def analyze_symptoms(request: SymptomAnalysisRequest):
             recommended_services=result.get("recommended_services"),
             urgency=result.get("urgency"),
             specialist_type=result.get("specialist_type"),
+            source=source,
             success=True,
             message="This is for informational purposes only. Please consult our specialists for proper diagnosis."
         )
@@ -303,7 +481,8 @@ def generate_service_content(
     """
     result = ai_service.generate_service_description(
         request.service_name,
-        request.short_description
+        request.short_description,
+        bypass_cache=request.bypass_cache
     )
     
     if result:
@@ -328,7 +507,8 @@ def generate_doctor_content(
         request.name,
         request.specialization,
         request.experience_years,
-        request.qualification
+        request.qualification,
+        bypass_cache=request.bypass_cache
     )
     
     if result:
@@ -409,7 +589,7 @@ def generate_blog_outline(
     """
     Generate a blog article outline for review (Admin only)
     """
-    result = ai_service.generate_blog_outline(request.topic)
+    result = ai_service.generate_blog_outline(request.topic, bypass_cache=request.bypass_cache)
     
     if result:
         return {"outline": result, "success": True}
@@ -433,6 +613,64 @@ def improve_blog_content(
         return {"improved_content": None, "success": False, "message": "Failed to improve content."}
 
 
+# ============ AI Response Cache Admin ============
+
+@router.get("/cache/stats")
+def get_ai_cache_stats(admin: User = Depends(get_admin_user)):
+    """
+    AI response cache hit-rate metrics per endpoint (Admin only)
+    """
+    return ai_cache.get_stats()
+
+
+@router.delete("/cache")
+def clear_ai_cache(
+    endpoint: Optional[str] = None,
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Clear cached AI responses, optionally for one endpoint (Admin only)
+    """
+    deleted = ai_cache.clear(endpoint)
+    return {"message": "AI cache cleared", "deleted": deleted}
+
+
+# ============ AI Usage & Budgets ============
+
+@router.get("/usage/report")
+def get_ai_usage_report(
+    days: int = Query(30, ge=1, le=365),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Daily token usage, latency and cache hits per AI endpoint, plus today's
+    budget status (Admin only)
+    """
+    rows = daily_report(days)
+    return {
+        "days": days,
+        "daily": rows,
+        "total_tokens": sum(row["total_tokens"] for row in rows),
+        "budgets": usage_tracker.budget_status(),
+    }
+
+
+@router.get("/retrieval/stats")
+def get_chat_retrieval_stats(admin: User = Depends(get_admin_user)):
+    """
+    Size of the chat retrieval index (Admin only)
+    """
+    return retrieval_index.stats()
+
+
+@router.get("/triage/stats")
+def get_symptom_triage_stats(admin: User = Depends(get_admin_user)):
+    """
+    Local symptom triage answer/escalation counts (Admin only)
+    """
+    return symptom_triage.get_stats()
+
+
 def generate_slug(text: str) -> str:
     """Generate URL-friendly slug from text"""
     import re
@@ -443,6 +681,85 @@ def generate_slug(text: str) -> str:
     return slug.strip('-')
 
 
+# (topic data, lowercased topic, topic slug) - computed once instead of per request
+DAILY_TOPIC_INDEX = [
+    (topic_data, topic_data["topic"].lower(), generate_slug(topic_data["topic"]))
+    for topic_data in DAILY_BLOG_TOPICS
+]
+
+# Map AI category to our categories
+BLOG_CATEGORY_MAP = {
+    'Pain Management': 'conditions',
+    'Exercise & Rehabilitation': 'exercises',
+    'Sports & Fitness': 'sports',
+    'Health Tips': 'lifestyle',
+    'Treatment Guides': 'recovery',
+    'Patient Stories': 'lifestyle'
+}
+
+
+def get_unused_topics(db: Session) -> List[Dict]:
+    """Curated topics whose title or slug isn't used by an existing article"""
+    existing_articles = db.query(BlogArticle.title, BlogArticle.slug).all()
+    existing_titles = {a.title.lower() for a in existing_articles}
+    existing_slugs = {a.slug for a in existing_articles}
+    
+    return [
+        topic_data
+        for topic_data, topic_lower, topic_slug in DAILY_TOPIC_INDEX
+        if topic_lower not in existing_titles and topic_slug not in existing_slugs
+    ]
+
+
+def save_generated_article(db: Session, result: Dict, topic: Dict) -> BlogArticle:
+    """Create, render and publish a BlogArticle from AI output. Commits the session."""
+    title = result.get("title", topic["topic"])
+    article_slug = result.get("slug") or generate_slug(title)
+    
+    # Keep the slug unique if the AI reused an existing one
+    base_slug, suffix = article_slug, 2
+    while db.query(BlogArticle.id).filter(BlogArticle.slug == article_slug).first():
+        article_slug = f"{base_slug}-{suffix}"
+        suffix += 1
+    
+    content = result.get("content", "")
+    
+    new_article = BlogArticle(
+        title=title,
+        slug=article_slug,
+        excerpt=result.get("excerpt", ""),
+        content=content,
+        category=BLOG_CATEGORY_MAP.get(result.get("category"), "conditions"),
+        author="NovaCare Team",
+        author_role="Medical Content Team",
+        image=get_relevant_image(topic["topic"]),  # Relevant image based on topic
+        tags=json.dumps(result.get("tags", [])),
+        faqs=json.dumps([]),
+        is_published=True,
+        is_featured=False
+    )
+    apply_rendered_content(new_article)
+    
+    db.add(new_article)
+    db.flush()
+    sync_article_tags(db, new_article.id, result.get("tags", []))
+    db.commit()
+    db.refresh(new_article)
+    
+    schedule_rebuild()
+    return new_article
+
+
+def article_summary(article: BlogArticle) -> Dict:
+    return {
+        "id": article.id,
+        "title": article.title,
+        "slug": article.slug,
+        "category": article.category,
+        "image": article.image
+    }
+
+
 @router.get("/blog/available-topics")
 def get_available_topics(
     db: Session = Depends(get_db),
@@ -451,19 +768,7 @@ def get_available_topics(
     """
     Get list of topics that haven't been used yet (Admin only)
     """
-    # Get all existing article titles/slugs
-    existing_articles = db.query(BlogArticle.title, BlogArticle.slug).all()
-    existing_titles = {a.title.lower() for a in existing_articles}
-    existing_slugs = {a.slug for a in existing_articles}
-    
-    # Filter out used topics
-    available_topics = []
-    for topic_data in DAILY_BLOG_TOPICS:
-        topic_slug = generate_slug(topic_data["topic"])
-        # Check if topic or similar slug exists
-        if (topic_data["topic"].lower() not in existing_titles and 
-            topic_slug not in existing_slugs):
-            available_topics.append(topic_data)
+    available_topics = get_unused_topics(db)
     
     return {
         "available_topics": available_topics,
@@ -482,18 +787,7 @@ def generate_daily_article(
     Generate a daily blog article from available topics (Admin only)
     Automatically picks an unused topic and generates content
     """
-    # Get all existing article titles/slugs
-    existing_articles = db.query(BlogArticle.title, BlogArticle.slug).all()
-    existing_titles = {a.title.lower() for a in existing_articles}
-    existing_slugs = {a.slug for a in existing_articles}
-    
-    # Filter out used topics
-    available_topics = []
-    for topic_data in DAILY_BLOG_TOPICS:
-        topic_slug = generate_slug(topic_data["topic"])
-        if (topic_data["topic"].lower() not in existing_titles and 
-            topic_slug not in existing_slugs):
-            available_topics.append(topic_data)
+    available_topics = get_unused_topics(db)
     
     if not available_topics:
         return {
@@ -527,27 +821,9 @@ def generate_daily_article(
         }
 
 
-@router.post("/generate/daily-article-and-publish")
-def generate_and_publish_daily_article(
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
-):
-    """
-    Generate and immediately publish a daily blog article (Admin only)
-    One-click solution for daily content
-    """
-    # Get all existing article titles/slugs
-    existing_articles = db.query(BlogArticle.title, BlogArticle.slug).all()
-    existing_titles = {a.title.lower() for a in existing_articles}
-    existing_slugs = {a.slug for a in existing_articles}
-    
-    # Filter out used topics
-    available_topics = []
-    for topic_data in DAILY_BLOG_TOPICS:
-        topic_slug = generate_slug(topic_data["topic"])
-        if (topic_data["topic"].lower() not in existing_titles and 
-            topic_slug not in existing_slugs):
-            available_topics.append(topic_data)
+def publish_daily_article(db: Session) -> Dict:
+    """Pick an unused topic, generate the article with AI and publish it"""
+    available_topics = get_unused_topics(db)
     
     if not available_topics:
         return {
@@ -573,60 +849,25 @@ def generate_and_publish_daily_article(
             "article": None
         }
     
+    # Don't publish content that mostly repeats an existing article
+    duplicate = build_article_index(db, settings.BLOG_DUPLICATE_THRESHOLD).find(
+        minhash_signature(result.get("content", ""))
+    )
+    if duplicate:
+        return {
+            "success": False,
+            "message": f"Generated article is too similar to '{duplicate[0]}' ({duplicate[1]:.0%} overlap). Please try again.",
+            "article": None
+        }
+    
     # Create and save the article
     try:
-        import json
-        
-        # Map AI category to our categories
-        category_map = {
-            'Pain Management': 'conditions',
-            'Exercise & Rehabilitation': 'exercises',
-            'Sports & Fitness': 'sports',
-            'Health Tips': 'lifestyle',
-            'Treatment Guides': 'recovery',
-            'Patient Stories': 'lifestyle'
-        }
-        
-        article_slug = result.get("slug") or generate_slug(result.get("title", selected_topic["topic"]))
-        
-        # Estimate read time
-        content = result.get("content", "")
-        word_count = len(content.replace("<", " <").split())
-        read_time = f"{max(1, word_count // 200)} min read"
-        
-        # Get relevant image based on topic
-        article_image = get_relevant_image(selected_topic["topic"])
-        
-        new_article = BlogArticle(
-            title=result.get("title", selected_topic["topic"]),
-            slug=article_slug,
-            excerpt=result.get("excerpt", ""),
-            content=content,
-            category=category_map.get(result.get("category"), "conditions"),
-            author="NovaCare Team",
-            author_role="Medical Content Team",
-            read_time=read_time,
-            image=article_image,
-            tags=json.dumps(result.get("tags", [])),
-            faqs=json.dumps([]),
-            is_published=True,
-            is_featured=False
-        )
-        
-        db.add(new_article)
-        db.commit()
-        db.refresh(new_article)
+        new_article = save_generated_article(db, result, selected_topic)
         
         return {
             "success": True,
             "message": "Article generated and published successfully!",
-            "article": {
-                "id": new_article.id,
-                "title": new_article.title,
-                "slug": new_article.slug,
-                "category": new_article.category,
-                "image": new_article.image
-            },
+            "article": article_summary(new_article),
             "topic_used": selected_topic,
             "remaining_topics": len(available_topics) - 1
         }
@@ -637,3 +878,124 @@ def generate_and_publish_daily_article(
             "message": f"Failed to save article: {str(e)}",
             "article": None
         }
+
+
+def publish_daily_article_batch(db: Session, count: int, job: Optional[JobContext] = None) -> Dict:
+    """
+    Generate up to `count` articles from distinct unused topics in parallel
+    (at most BLOG_BATCH_CONCURRENCY AI calls at a time), drop near-duplicates
+    of existing articles and of each other, and publish the rest.
+    """
+    available_topics = get_unused_topics(db)
+    topics = random.sample(available_topics, min(count, len(available_topics)))
+    if not topics:
+        return {
+            "success": False,
+            "message": "All topics have been used! Add more topics to continue.",
+            "published": [], "rejected": [], "failed": []
+        }
+    
+    generated = []
+    failed = []
+    with ThreadPoolExecutor(max_workers=settings.BLOG_BATCH_CONCURRENCY) as pool:
+        futures = {
+            pool.submit(ai_service.generate_blog_article, t["topic"], t["keywords"], t["audience"]): t
+            for t in topics
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            topic = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Batch article generation error: {e}")
+                result = None
+            if result and result.get("content"):
+                generated.append((topic, result))
+            else:
+                failed.append({"topic": topic["topic"], "reason": "Generation failed"})
+            if job:
+                job.progress(int(80 * done / len(topics)), f"Generated {done}/{len(topics)} articles")
+    
+    # Existing articles plus the ones accepted so far in this batch
+    index = build_article_index(db, settings.BLOG_DUPLICATE_THRESHOLD)
+    published = []
+    rejected = []
+    for topic, result in generated:
+        signature = minhash_signature(result["content"])
+        duplicate = index.find(signature)
+        if duplicate:
+            rejected.append({
+                "topic": topic["topic"],
+                "title": result.get("title"),
+                "similar_to": duplicate[0],
+                "similarity": round(duplicate[1], 3)
+            })
+            continue
+        try:
+            article = save_generated_article(db, result, topic)
+        except Exception as e:
+            db.rollback()
+            failed.append({"topic": topic["topic"], "reason": f"Failed to save article: {str(e)}"})
+            continue
+        index.add(article.slug, signature)
+        published.append(article_summary(article))
+    
+    return {
+        "success": bool(published),
+        "message": f"Published {len(published)} of {len(topics)} articles",
+        "published": published,
+        "rejected": rejected,
+        "failed": failed,
+        "remaining_topics": len(available_topics) - len(published)
+    }
+
+
+@job_handler("blog.daily_article_batch")
+def daily_article_batch_job(job: JobContext, count: int):
+    return publish_daily_article_batch(job.db, count, job)
+
+
+@router.post("/generate/daily-articles/batch")
+def generate_and_publish_daily_article_batch(
+    count: int = Query(5, ge=1, le=20),
+    background: bool = False,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Generate and publish several daily articles at once (Admin only).
+    Articles that are near-duplicates of existing content are rejected.
+    
+    With background=true this runs as a background job; poll /api/jobs/{job_id}.
+    """
+    if background:
+        job_id = job_runner.submit("blog.daily_article_batch", {"count": count}, created_by=admin.id)
+        return submitted_response(job_id)
+    
+    return publish_daily_article_batch(db, count)
+
+
+@job_handler("blog.daily_article")
+def daily_article_job(job: JobContext):
+    job.progress(10, "Generating article")
+    return publish_daily_article(job.db)
+
+
+@router.post("/generate/daily-article-and-publish")
+def generate_and_publish_daily_article(
+    background: bool = False,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Generate and immediately publish a daily blog article (Admin only)
+    One-click solution for daily content
+    
+    With background=true the article is generated by a background job and a
+    job_id is returned; poll /api/jobs/{job_id} for the result.
+    """
+    if background:
+        job_id = job_runner.submit("blog.daily_article", {}, created_by=admin.id)
+        return submitted_response(job_id)
+    
+    return publish_daily_article(db)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_
+from sqlalchemy import desc, or_, func
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
@@ -8,11 +8,20 @@ import json
 import re
 
 from app.database import get_db
-from app.models import BlogArticle
+from app.models import BlogArticle, BlogRelatedArticle, BlogTag, BlogArticleTag
 from app.auth import get_admin_user
+from app.utils.related_articles import remove_article, schedule_rebuild
+from app.utils.markdown_render import apply_rendered_content
+from app.utils.blog_tags import sync_article_tags, remove_article_tags
+from app.utils.cache import cache, depends_on_tables
+from app.utils.view_counter import view_counter
+from app.utils import image_variants
 
 router = APIRouter(prefix="/api/blog", tags=["Blog"])
 
+TAG_COUNTS_CACHE_PREFIX = "blog:tag-counts:"
+depends_on_tables(TAG_COUNTS_CACHE_PREFIX, "blog_articles", "blog_article_tags", "blog_tags")
+
 
 # Pydantic Schemas
 class FAQItem(BaseModel):
@@ -58,12 +67,21 @@ class BlogArticleUpdate(BaseModel):
     display_order: Optional[int] = None
 
 
+class TocItem(BaseModel):
+    level: int
+    id: str
+    text: str
+
+
 class BlogArticleResponse(BaseModel):
     id: int
     title: str
     slug: str
     excerpt: Optional[str]
     content: str
+    content_html: Optional[str]
+    toc: List[TocItem]
+    reading_minutes: Optional[int]
     category: str
     author: Optional[str]
     author_role: Optional[str]
@@ -75,6 +93,7 @@ class BlogArticleResponse(BaseModel):
     is_published: bool
     published_at: Optional[datetime]
     display_order: int
+    view_count: int
     created_at: datetime
     updated_at: datetime
 
@@ -91,8 +110,8 @@ def generate_slug(title: str) -> str:
     return slug.strip('-')
 
 
-def serialize_article(article: BlogArticle) -> dict:
-    """Convert article to response format"""
+def serialize_article(article: BlogArticle, variants: Optional[dict] = None) -> dict:
+    """Convert article to response format (variants: resized copies of the featured image)"""
     tags = []
     if article.tags:
         try:
@@ -107,34 +126,54 @@ def serialize_article(article: BlogArticle) -> dict:
         except:
             faqs = []
     
+    toc = []
+    if article.content_toc:
+        try:
+            toc = json.loads(article.content_toc)
+        except:
+            toc = []
+    
     return {
         "id": article.id,
         "title": article.title,
         "slug": article.slug,
         "excerpt": article.excerpt,
         "content": article.content,
+        "content_html": article.content_html,
+        "toc": toc,
+        "reading_minutes": article.reading_minutes,
         "category": article.category,
         "author": article.author,
         "author_role": article.author_role,
         "read_time": article.read_time,
         "image": article.image,
+        "image_variants": variants,
         "tags": tags,
         "faqs": faqs,
         "is_featured": article.is_featured,
         "is_published": article.is_published,
         "published_at": article.published_at,
         "display_order": article.display_order,
+        "view_count": article.view_count or 0,
         "created_at": article.created_at,
         "updated_at": article.updated_at
     }
 
 
+def serialize_articles(db: Session, articles: List[BlogArticle]) -> List[dict]:
+    """serialize_article for a list, with image variants looked up in one query"""
+    variants = image_variants.lookup(db, [a.image for a in articles])
+    return [serialize_article(a, variants.get(a.image)) for a in articles]
+
+
 # Public Routes
 @router.get("/")
 def get_articles(
     category: Optional[str] = None,
     featured: Optional[bool] = None,
+    tag: Optional[str] = None,
     search: Optional[str] = None,
+    sort: str = Query("latest", pattern="^(latest|popular)$"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
     db: Session = Depends(get_db)
@@ -148,6 +187,14 @@ def get_articles(
     if featured is not None:
         query = query.filter(BlogArticle.is_featured == featured)
     
+    if tag:
+        # Indexed lookup through the normalized tag tables
+        query = query.join(
+            BlogArticleTag, BlogArticleTag.article_id == BlogArticle.id
+        ).join(
+            BlogTag, BlogTag.id == BlogArticleTag.tag_id
+        ).filter(BlogTag.slug == generate_slug(tag))
+    
     if search:
         search_term = f"%{search}%"
         query = query.filter(
@@ -158,13 +205,18 @@ def get_articles(
             )
         )
     
-    articles = query.order_by(
-        desc(BlogArticle.is_featured),
-        desc(BlogArticle.published_at),
-        BlogArticle.id
-    ).offset(offset).limit(limit).all()
+    if sort == "popular":
+        query = query.order_by(desc(BlogArticle.view_count), BlogArticle.id)
+    else:
+        query = query.order_by(
+            desc(BlogArticle.is_featured),
+            desc(BlogArticle.published_at),
+            BlogArticle.id
+        )
     
-    return [serialize_article(a) for a in articles]
+    articles = query.offset(offset).limit(limit).all()
+    
+    return serialize_articles(db, articles)
 
 
 @router.get("/categories/")
@@ -180,6 +232,31 @@ def get_categories():
     ]
 
 
+@router.get("/tags/")
+def get_tag_counts(
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Get tags with the number of published articles using each (cached)"""
+    def load():
+        rows = db.query(
+            BlogTag.name, BlogTag.slug, func.count(BlogArticleTag.article_id).label("count")
+        ).join(
+            BlogArticleTag, BlogArticleTag.tag_id == BlogTag.id
+        ).join(
+            BlogArticle, BlogArticle.id == BlogArticleTag.article_id
+        ).filter(
+            BlogArticle.is_published == True
+        ).group_by(
+            BlogTag.id, BlogTag.name, BlogTag.slug
+        ).order_by(
+            desc("count"), BlogTag.name
+        ).limit(limit).all()
+        return [{"name": r.name, "slug": r.slug, "count": r.count} for r in rows]
+    
+    return cache.get_or_set(f"{TAG_COUNTS_CACHE_PREFIX}{limit}", load)
+
+
 @router.get("/slug/{slug}/")
 def get_article_by_slug(slug: str, db: Session = Depends(get_db)):
     """Get a single article by slug"""
@@ -191,12 +268,27 @@ def get_article_by_slug(slug: str, db: Session = Depends(get_db)):
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    return serialize_article(article)
+    view_counter.increment("blog_articles", article.id)
+    
+    return serialize_articles(db, [article])[0]
 
 
 @router.get("/slug/{slug}/related/")
 def get_related_articles(slug: str, limit: int = 3, db: Session = Depends(get_db)):
-    """Get related articles based on category"""
+    """Get related articles from the precomputed content-similarity table"""
+    current_id = db.query(BlogArticle.id).filter(BlogArticle.slug == slug).scalar_subquery()
+    
+    related = db.query(BlogArticle).join(
+        BlogRelatedArticle, BlogRelatedArticle.related_article_id == BlogArticle.id
+    ).filter(
+        BlogRelatedArticle.article_id == current_id,
+        BlogArticle.is_published == True
+    ).order_by(BlogRelatedArticle.rank).limit(limit).all()
+    
+    if related:
+        return serialize_articles(db, related)
+    
+    # Fallback for articles not indexed yet: newest in the same category
     current = db.query(BlogArticle).filter(BlogArticle.slug == slug).first()
     
     if not current:
@@ -208,7 +300,7 @@ def get_related_articles(slug: str, limit: int = 3, db: Session = Depends(get_db
         BlogArticle.is_published == True
     ).order_by(desc(BlogArticle.published_at)).limit(limit).all()
     
-    return [serialize_article(a) for a in related]
+    return serialize_articles(db, related)
 
 
 @router.get("/{article_id}/")
@@ -219,7 +311,7 @@ def get_article(article_id: int, db: Session = Depends(get_db)):
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    return serialize_article(article)
+    return serialize_articles(db, [article])[0]
 
 
 # Admin Routes
@@ -271,11 +363,16 @@ def create_article(
         display_order=article.display_order,
         published_at=datetime.utcnow() if article.is_published else None
     )
+    apply_rendered_content(db_article, keep_read_time=bool(article.read_time))
     
     db.add(db_article)
+    db.flush()
+    sync_article_tags(db, db_article.id, article.tags)
     db.commit()
     db.refresh(db_article)
     
+    schedule_rebuild()
+    
     return serialize_article(db_article)
 
 
@@ -308,7 +405,18 @@ def update_article(
     for key, value in update_data.items():
         setattr(db_article, key, value)
     
+    if 'content' in update_data:
+        apply_rendered_content(db_article, keep_read_time='read_time' in update_data)
+    
+    if article.tags is not None:
+        sync_article_tags(db, db_article.id, article.tags)
+    
     db.commit()
+    
+    # Only content-bearing fields affect similarity
+    if {'title', 'tags', 'content', 'is_published'} & update_data.keys():
+        schedule_rebuild()
+    
     db.refresh(db_article)
     
     return serialize_article(db_article)
@@ -326,7 +434,10 @@ def delete_article(
     if not db_article:
         raise HTTPException(status_code=404, detail="Article not found")
     
+    remove_article(db, db_article.id)
+    remove_article_tags(db, db_article.id)
     db.delete(db_article)
     db.commit()
+    schedule_rebuild()
     
     return {"message": "Article deleted successfully"}
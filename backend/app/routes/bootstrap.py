@@ -0,0 +1,100 @@
+"""
+Homepage bootstrap bundle.
+
+The public site needs settings, stats, milestones, testimonials, services,
+featured articles and branches on first load. GET /api/bootstrap returns all
+of them in one response, built by the same route functions that serve them
+individually, and keeps the serialized JSON until one of the tables it was
+built from changes.
+"""
+import hashlib
+import json
+import threading
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.routes import blog, branches, milestones, services, site_settings, site_stats, testimonials
+from app.schemas import (
+    BranchResponse, MilestoneResponse, ServiceResponse, SiteStatResponse, TestimonialResponse
+)
+from app.utils.cache import cache, depends_on_tables, table_version
+
+router = APIRouter(prefix="/api/bootstrap", tags=["Bootstrap"])
+
+BOOTSTRAP_CACHE_KEY = "bootstrap:home"
+BOOTSTRAP_CACHE_TTL = 60 * 60
+BOOTSTRAP_TABLES = (
+    "site_settings", "site_stats", "milestones", "testimonials", "services",
+    "blog_articles", "branches", "image_assets"
+)
+depends_on_tables(BOOTSTRAP_CACHE_KEY, *BOOTSTRAP_TABLES)
+
+FEATURED_ARTICLES = 6
+TESTIMONIALS = 20
+SERVICES = 100
+
+# Article body fields the homepage cards don't use
+ARTICLE_DETAIL_FIELDS = ("content", "content_html", "toc", "faqs")
+
+# Only one request rebuilds the bundle after an invalidation
+_build_lock = threading.Lock()
+
+
+def build_bundle(db: Session) -> dict:
+    articles = blog.get_articles(
+        category=None, featured=True, tag=None, search=None,
+        sort="latest", limit=FEATURED_ARTICLES, offset=0, db=db
+    )
+    return {
+        "settings": site_settings.get_settings_grouped(db=db),
+        "stats": [SiteStatResponse.model_validate(s) for s in site_stats.get_stats(db=db)],
+        "milestones": [MilestoneResponse.model_validate(m) for m in milestones.get_milestones(db=db)],
+        "testimonials": [
+            TestimonialResponse.model_validate(t)
+            for t in testimonials.get_testimonials(skip=0, limit=TESTIMONIALS, db=db)
+        ],
+        "services": [
+            ServiceResponse.model_validate(s)
+            for s in services.get_services(skip=0, limit=SERVICES, db=db)
+        ],
+        "featured_articles": [
+            {k: v for k, v in article.items() if k not in ARTICLE_DETAIL_FIELDS}
+            for article in articles
+        ],
+        "branches": [
+            BranchResponse.model_validate(b)
+            for b in branches.get_branches(country=None, state=None, city=None, db=db)
+        ],
+    }
+
+
+def get_bundle(db: Session) -> dict:
+    """{"body": serialized JSON, "etag": ...}, from the cache or freshly built"""
+    cached = cache.get(BOOTSTRAP_CACHE_KEY)
+    if cached:
+        return cached
+    with _build_lock:
+        cached = cache.get(BOOTSTRAP_CACHE_KEY)
+        if cached:
+            return cached
+        versions = [table_version(table) for table in BOOTSTRAP_TABLES]
+        body = json.dumps(jsonable_encoder(build_bundle(db)), separators=(",", ":")).encode()
+        bundle = {"body": body, "etag": f'"{hashlib.sha1(body).hexdigest()}"'}
+        # A write committed while building may not be in this bundle; serve it but don't keep it
+        if versions == [table_version(table) for table in BOOTSTRAP_TABLES]:
+            cache.set(BOOTSTRAP_CACHE_KEY, bundle, ttl=BOOTSTRAP_CACHE_TTL)
+        return bundle
+
+
+@router.get("")
+def get_bootstrap(request: Request, db: Session = Depends(get_db)):
+    """Everything the public homepage loads on first render, in one response"""
+    bundle = get_bundle(db)
+    headers = {"ETag": bundle["etag"], "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == bundle["etag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=bundle["body"], media_type="application/json", headers=headers)
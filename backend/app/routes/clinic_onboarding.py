@@ -20,9 +20,11 @@ from app.schemas import (
     ScheduleSiteVerificationRequest, CompleteSiteVerificationRequest,
     SignContractRequest, CompleteSetupRequest, ScheduleTrainingRequest,
     CompleteClinicTrainingRequest, ActivateClinicRequest,
-    ClinicOnboardingActivityLogResponse, ClinicOnboardingDashboardStats
+    ClinicOnboardingActivityLogResponse, ClinicOnboardingDashboardStats,
+    ApplicationDocumentsResponse
 )
 from app.auth import get_admin_user
+from app.utils.document_urls import MAX_DOCUMENTS_BATCH, MAX_EXPIRES_IN, MIN_EXPIRES_IN, sign_documents
 
 router = APIRouter(prefix="/api/clinic-onboarding", tags=["Clinic Onboarding"])
 
@@ -377,6 +379,70 @@ def list_applications(
     return applications
 
 
+@router.get("/admin/applications/documents/", response_model=List[ApplicationDocumentsResponse])
+def list_application_documents(
+    ids: Optional[str] = Query(None),  # Comma-separated application ids
+    status: Optional[str] = Query(None),
+    statuses: Optional[str] = Query(None),  # Comma-separated list
+    skip: int = 0,
+    limit: int = Query(50, ge=1, le=MAX_DOCUMENTS_BATCH),  # Also caps the number of ids
+    expires_in: int = Query(3600, ge=MIN_EXPIRES_IN, le=MAX_EXPIRES_IN),
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Presigned document URLs for several applications in one call: the ids
+    given, or the same page list_applications returns for these filters
+    """
+    query = db.query(ClinicOnboardingApplication)
+    
+    if ids:
+        try:
+            id_list = [int(i) for i in ids.split(',') if i.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+        if len(id_list) > limit:
+            raise HTTPException(status_code=400, detail=f"At most {limit} ids per request")
+        applications = query.filter(ClinicOnboardingApplication.id.in_(id_list)).all()
+        order = {application_id: i for i, application_id in enumerate(id_list)}
+        applications.sort(key=lambda a: order[a.id])
+    else:
+        if statuses:
+            status_list = [s.strip() for s in statuses.split(',')]
+            query = query.filter(ClinicOnboardingApplication.status.in_(status_list))
+        elif status:
+            query = query.filter(ClinicOnboardingApplication.status == status)
+        applications = query.order_by(
+            ClinicOnboardingApplication.updated_at.desc()
+        ).offset(skip).limit(limit).all()
+    
+    try:
+        return sign_documents(applications, expires_in)
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@router.get("/admin/applications/{application_id}/documents/", response_model=ApplicationDocumentsResponse)
+def get_application_documents(
+    application_id: int,
+    expires_in: int = Query(3600, ge=MIN_EXPIRES_IN, le=MAX_EXPIRES_IN),
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Presigned URLs for every document on an application"""
+    application = db.query(ClinicOnboardingApplication).filter(
+        ClinicOnboardingApplication.id == application_id
+    ).first()
+    
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found")
+    
+    try:
+        return sign_documents([application], expires_in)[0]
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
 @router.get("/admin/applications/{application_id}/", response_model=ClinicOnboardingApplicationResponse)
 def get_application(
     application_id: int,
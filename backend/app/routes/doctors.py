@@ -11,14 +11,16 @@ from app.schemas import (
 )
 from app.auth import get_admin_user, get_password_hash
 from app.utils.slugs import generate_doctor_slug
+from app.utils.view_counter import view_counter
+from app.utils import image_variants
 
 router = APIRouter(prefix="/api/doctors", tags=["Doctors"])
 
 
 import json
 
-def build_doctor_public(doctor: Doctor, country: Optional[str] = None) -> DoctorPublic:
-    """Helper to build DoctorPublic response with branch and fees"""
+def build_doctor_public(doctor: Doctor, country: Optional[str] = None, variants: Optional[dict] = None) -> DoctorPublic:
+    """Helper to build DoctorPublic response with branch, fees and profile image variants"""
     # Build branch info if available
     branch_info = None
     if doctor.branch:
@@ -63,9 +65,11 @@ def build_doctor_public(doctor: Doctor, country: Optional[str] = None) -> Doctor
         expertise=expertise_list,
         consultation_fee=doctor.consultation_fee,
         profile_image=doctor.profile_image,
+        profile_image_variants=variants,
         is_available=doctor.is_available,
         full_name=doctor.user.full_name,
         rating=doctor.rating / 10.0 if doctor.rating else 4.5,  # Convert to x.x format
+        view_count=doctor.view_count or 0,
         branch=branch_info,
         consultation_fees=fees
     )
@@ -79,6 +83,7 @@ def get_doctors(
     branch_id: Optional[int] = Query(None, description="Filter by branch"),
     specialization: Optional[str] = Query(None, description="Filter by specialization"),
     consultation_type: Optional[str] = Query(None, description="Filter by consultation type (clinic/home/video)"),
+    sort: Optional[str] = Query(None, pattern="^popular$", description="Sort order (popular = most viewed first)"),
     db: Session = Depends(get_db)
 ):
     """Get all available doctors (public endpoint) with optional filters"""
@@ -103,9 +108,13 @@ def get_doctors(
             DoctorConsultationFee.is_available == True
         )
     
+    if sort == "popular":
+        query = query.order_by(Doctor.view_count.desc(), Doctor.id)
+    
     doctors = query.offset(skip).limit(limit).all()
+    variants = image_variants.lookup(db, [doctor.profile_image for doctor in doctors])
     
-    return [build_doctor_public(doctor, country) for doctor in doctors]
+    return [build_doctor_public(doctor, country, variants.get(doctor.profile_image)) for doctor in doctors]
 
 
 @router.get("/all/", response_model=List[DoctorResponse])
@@ -138,7 +147,11 @@ def get_doctor_by_slug(
     if not doctor:
         raise HTTPException(status_code=404, detail="Doctor not found")
     
-    return build_doctor_public(doctor, country)
+    view_counter.increment("doctors", doctor.id)
+    
+    variants = image_variants.lookup(db, [doctor.profile_image]).get(doctor.profile_image)
+    
+    return build_doctor_public(doctor, country, variants)
 
 
 @router.get("/{doctor_id}/", response_model=DoctorPublic)
@@ -156,7 +169,9 @@ def get_doctor(
     if not doctor:
         raise HTTPException(status_code=404, detail="Doctor not found")
     
-    return build_doctor_public(doctor, country)
+    variants = image_variants.lookup(db, [doctor.profile_image]).get(doctor.profile_image)
+    
+    return build_doctor_public(doctor, country, variants)
 
 @router.post("/", response_model=DoctorResponse)
 def create_doctor(
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.models import BackgroundJob, User
+from app.schemas import BackgroundJobResponse
+from app.auth import get_admin_user
+from app.utils.jobs import serialize_job
+
+router = APIRouter(prefix="/api/jobs", tags=["Background Jobs"])
+
+
+@router.get("/", response_model=List[BackgroundJobResponse])
+def list_jobs(
+    status: Optional[str] = Query(None, description="queued, running, succeeded or failed"),
+    job_type: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Recent background jobs, newest first (admin only)"""
+    query = db.query(BackgroundJob)
+    if status:
+        query = query.filter(BackgroundJob.status == status)
+    if job_type:
+        query = query.filter(BackgroundJob.job_type == job_type)
+    jobs = query.order_by(BackgroundJob.created_at.desc()).limit(limit).all()
+    return [serialize_job(job) for job in jobs]
+
+
+@router.get("/{job_id}", response_model=BackgroundJobResponse)
+def get_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Status, progress and (once finished) result of a background job"""
+    job = db.query(BackgroundJob).filter(BackgroundJob.job_id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return serialize_job(job)
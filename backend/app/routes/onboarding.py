@@ -5,7 +5,7 @@ Complete workflow: Application → AI Verification → Human Approval → Interv
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime, timedelta
 import json
 
@@ -19,13 +19,16 @@ from app.schemas import (
     AIVerificationResponse, HumanVerificationRequest, ScheduleInterviewRequest,
     AIInterviewQuestionsResponse, CompleteInterviewRequest, CompleteTrainingRequest,
     ActivationRequest, TrainingModuleCreate, TrainingModuleResponse, TrainingModuleUpdate,
-    OnboardingActivityLogResponse, OnboardingDashboardStats
+    OnboardingActivityLogResponse, OnboardingDashboardStats, JobSubmittedResponse,
+    ApplicationDocumentsResponse
 )
 from app.auth import get_admin_user, get_password_hash
 from app.ai_service import (
     verify_doctor_credentials, generate_interview_questions,
     generate_training_content, generate_onboarding_email
 )
+from app.utils.document_urls import MAX_DOCUMENTS_BATCH, MAX_EXPIRES_IN, MIN_EXPIRES_IN, sign_documents
+from app.utils.jobs import JobContext, job_handler, job_runner, submitted_response
 
 router = APIRouter(prefix="/api/onboarding", tags=["Doctor Onboarding"])
 
@@ -339,6 +342,70 @@ def list_applications(
     return applications
 
 
+@router.get("/admin/applications/documents/", response_model=List[ApplicationDocumentsResponse])
+def list_application_documents(
+    ids: Optional[str] = Query(None),  # Comma-separated application ids
+    status: Optional[str] = Query(None),
+    statuses: Optional[str] = Query(None),  # Comma-separated list
+    skip: int = 0,
+    limit: int = Query(50, ge=1, le=MAX_DOCUMENTS_BATCH),  # Also caps the number of ids
+    expires_in: int = Query(3600, ge=MIN_EXPIRES_IN, le=MAX_EXPIRES_IN),
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Presigned document URLs for several applications in one call: the ids
+    given, or the same page list_applications returns for these filters
+    """
+    query = db.query(DoctorOnboardingApplication)
+    
+    if ids:
+        try:
+            id_list = [int(i) for i in ids.split(',') if i.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+        if len(id_list) > limit:
+            raise HTTPException(status_code=400, detail=f"At most {limit} ids per request")
+        applications = query.filter(DoctorOnboardingApplication.id.in_(id_list)).all()
+        order = {application_id: i for i, application_id in enumerate(id_list)}
+        applications.sort(key=lambda a: order[a.id])
+    else:
+        if statuses:
+            status_list = [s.strip() for s in statuses.split(',')]
+            query = query.filter(DoctorOnboardingApplication.status.in_(status_list))
+        elif status:
+            query = query.filter(DoctorOnboardingApplication.status == status)
+        applications = query.order_by(
+            DoctorOnboardingApplication.updated_at.desc()
+        ).offset(skip).limit(limit).all()
+    
+    try:
+        return sign_documents(applications, expires_in)
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@router.get("/admin/applications/{application_id}/documents/", response_model=ApplicationDocumentsResponse)
+def get_application_documents(
+    application_id: int,
+    expires_in: int = Query(3600, ge=MIN_EXPIRES_IN, le=MAX_EXPIRES_IN),
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Presigned URLs for every document on an application"""
+    application = db.query(DoctorOnboardingApplication).filter(
+        DoctorOnboardingApplication.id == application_id
+    ).first()
+    
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found")
+    
+    try:
+        return sign_documents([application], expires_in)[0]
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
 @router.get("/admin/applications/{application_id}/", response_model=OnboardingApplicationResponse)
 def get_application(
     application_id: int,
@@ -389,13 +456,8 @@ def get_application_logs(
 
 # ============ VERIFICATION WORKFLOW ============
 
-@router.post("/admin/applications/{application_id}/ai-verify/", response_model=AIVerificationResponse)
-def run_ai_verification(
-    application_id: int,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
-):
-    """Run AI verification on credentials (requires human approval after)"""
+def get_verifiable_application(db: Session, application_id: int) -> DoctorOnboardingApplication:
+    """Load an application that is ready for AI verification"""
     application = db.query(DoctorOnboardingApplication).filter(
         DoctorOnboardingApplication.id == application_id
     ).first()
@@ -409,6 +471,11 @@ def run_ai_verification(
             detail=f"Cannot verify application in {application.status} status"
         )
     
+    return application
+
+
+def complete_ai_verification(db: Session, application: DoctorOnboardingApplication, admin_id: int) -> dict:
+    """Run the AI credential check and record it on the application"""
     # Run AI verification
     result = verify_doctor_credentials(
         name=application.full_name,
@@ -434,7 +501,7 @@ def run_ai_verification(
         db=db,
         application=application,
         new_status=OnboardingStatus.VERIFICATION_PENDING,
-        performed_by=admin.id,
+        performed_by=admin_id,
         performed_by_type="ai",
         notes=f"AI verification completed. Score: {result.get('score', 0)}/100. Awaiting human approval."
     )
@@ -444,7 +511,38 @@ def run_ai_verification(
         analysis=result.get("analysis", {}),
         recommendations=result.get("recommendations", []),
         flags=result.get("flags", [])
-    )
+    ).model_dump()
+
+
+@job_handler("onboarding.ai_verification")
+def ai_verification_job(job: JobContext, application_id: int, admin_id: int):
+    application = get_verifiable_application(job.db, application_id)
+    job.progress(10, "Verifying credentials")
+    return complete_ai_verification(job.db, application, admin_id)
+
+
+@router.post(
+    "/admin/applications/{application_id}/ai-verify/",
+    response_model=Union[AIVerificationResponse, JobSubmittedResponse]
+)
+def run_ai_verification(
+    application_id: int,
+    background: bool = Query(False, description="Run as a background job and return a job_id to poll"),
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Run AI verification on credentials (requires human approval after)"""
+    application = get_verifiable_application(db, application_id)
+    
+    if background:
+        job_id = job_runner.submit(
+            "onboarding.ai_verification",
+            {"application_id": application.id, "admin_id": admin.id},
+            created_by=admin.id
+        )
+        return submitted_response(job_id)
+    
+    return complete_ai_verification(db, application, admin.id)
 
 
 @router.post("/admin/applications/{application_id}/verify/")
@@ -498,13 +596,7 @@ def human_verify_application(
 
 # ============ INTERVIEW WORKFLOW ============
 
-@router.post("/admin/applications/{application_id}/generate-questions/", response_model=AIInterviewQuestionsResponse)
-def generate_ai_interview_questions(
-    application_id: int,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
-):
-    """Generate AI interview questions for the candidate"""
+def get_application_or_404(db: Session, application_id: int) -> DoctorOnboardingApplication:
     application = db.query(DoctorOnboardingApplication).filter(
         DoctorOnboardingApplication.id == application_id
     ).first()
@@ -512,11 +604,22 @@ def generate_ai_interview_questions(
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
+    return application
+
+
+def create_interview_questions(
+    db: Session,
+    application: DoctorOnboardingApplication,
+    admin_id: int,
+    bypass_cache: bool = False
+) -> List[dict]:
+    """Generate interview questions with AI and save them on the application"""
     result = generate_interview_questions(
         name=application.full_name,
         specialization=application.specialization or "",
         experience_years=application.experience_years or 0,
-        qualification=application.qualification or ""
+        qualification=application.qualification or "",
+        bypass_cache=bypass_cache
     )
     
     if not result:
@@ -540,12 +643,45 @@ def generate_ai_interview_questions(
         db=db,
         application_id=application.id,
         action="interview_questions_generated",
-        performed_by=admin.id,
+        performed_by=admin_id,
         performed_by_type="ai",
         notes=f"Generated {len(all_questions)} interview questions"
     )
     
-    return AIInterviewQuestionsResponse(questions=all_questions)
+    return all_questions
+
+
+@job_handler("onboarding.interview_questions")
+def interview_questions_job(job: JobContext, application_id: int, admin_id: int, bypass_cache: bool = False):
+    application = get_application_or_404(job.db, application_id)
+    job.progress(10, "Generating interview questions")
+    return {"questions": create_interview_questions(job.db, application, admin_id, bypass_cache)}
+
+
+@router.post(
+    "/admin/applications/{application_id}/generate-questions/",
+    response_model=Union[AIInterviewQuestionsResponse, JobSubmittedResponse]
+)
+def generate_ai_interview_questions(
+    application_id: int,
+    bypass_cache: bool = Query(False, description="Force fresh questions instead of cached ones"),
+    background: bool = Query(False, description="Run as a background job and return a job_id to poll"),
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Generate AI interview questions for the candidate"""
+    application = get_application_or_404(db, application_id)
+    
+    if background:
+        job_id = job_runner.submit(
+            "onboarding.interview_questions",
+            {"application_id": application.id, "admin_id": admin.id, "bypass_cache": bypass_cache},
+            created_by=admin.id
+        )
+        return submitted_response(job_id)
+    
+    questions = create_interview_questions(db, application, admin.id, bypass_cache)
+    return AIInterviewQuestionsResponse(questions=questions)
 
 
 @router.post("/admin/applications/{application_id}/schedule-interview/")
@@ -673,14 +809,8 @@ def create_training_module(
     return db_module
 
 
-@router.post("/admin/training-modules/generate/", response_model=TrainingModuleResponse)
-def generate_ai_training_module(
-    topic: str = Query(...),
-    specialization: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
-):
-    """Generate a training module using AI"""
+def create_ai_training_module(db: Session, topic: str, specialization: Optional[str] = None) -> TrainingModule:
+    """Generate training content with AI and save it as a module"""
     result = generate_training_content(topic, specialization)
     
     if not result:
@@ -706,6 +836,36 @@ def generate_ai_training_module(
     return module
 
 
+@job_handler("onboarding.training_module")
+def training_module_job(job: JobContext, topic: str, specialization: Optional[str] = None):
+    job.progress(10, f"Writing training module: {topic}")
+    module = create_ai_training_module(job.db, topic, specialization)
+    return TrainingModuleResponse.model_validate(module).model_dump(mode="json")
+
+
+@router.post(
+    "/admin/training-modules/generate/",
+    response_model=Union[TrainingModuleResponse, JobSubmittedResponse]
+)
+def generate_ai_training_module(
+    topic: str = Query(...),
+    specialization: Optional[str] = Query(None),
+    background: bool = Query(False, description="Run as a background job and return a job_id to poll"),
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Generate a training module using AI"""
+    if background:
+        job_id = job_runner.submit(
+            "onboarding.training_module",
+            {"topic": topic, "specialization": specialization},
+            created_by=admin.id
+        )
+        return submitted_response(job_id)
+    
+    return create_ai_training_module(db, topic, specialization)
+
+
 @router.post("/admin/applications/{application_id}/start-training/")
 def start_training(
     application_id: int,
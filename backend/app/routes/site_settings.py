@@ -1,14 +1,42 @@
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import literal_column
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from app.database import get_db
-from app.models import SiteSetting
+from app.models import SiteSetting, SiteSettingsVersion
 from app.schemas import SiteSettingCreate, SiteSettingResponse, SiteSettingUpdate
 from app.auth import get_admin_user
 from app.models import User
+from app.utils.cache import cache, depends_on_tables
 
 router = APIRouter(prefix="/api/site-settings", tags=["Site Settings"])
 
+SETTINGS_CACHE_PREFIX = "site-settings:"
+depends_on_tables(SETTINGS_CACHE_PREFIX, SiteSetting.__tablename__)
+
+
+def settings_version(db: Session) -> int:
+    """Stored settings version, the same on every worker and across restarts"""
+    version = db.query(SiteSettingsVersion.version).filter(SiteSettingsVersion.id == 1).scalar()
+    return version or 0
+
+
+def bump_settings_version(db: Session) -> int:
+    """Increment the settings version in the caller's transaction; returns the new version"""
+    updated = db.query(SiteSettingsVersion).filter(SiteSettingsVersion.id == 1).update(
+        {SiteSettingsVersion.version: SiteSettingsVersion.version + 1,
+         SiteSettingsVersion.updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    if not updated:
+        # Tables created by create_all rather than the migration start without the row
+        db.add(SiteSettingsVersion(id=1, version=1))
+        db.flush()
+    # The row stays locked by this transaction until commit
+    return settings_version(db)
+
 
 @router.get("/", response_model=List[SiteSettingResponse])
 def get_all_settings(
@@ -16,10 +44,22 @@ def get_all_settings(
     db: Session = Depends(get_db)
 ):
     """Get all site settings (public endpoint)"""
-    query = db.query(SiteSetting)
-    if category:
-        query = query.filter(SiteSetting.category == category)
-    return query.order_by(SiteSetting.id).all()
+    def load():
+        query = db.query(SiteSetting)
+        if category:
+            query = query.filter(SiteSetting.category == category)
+        return [
+            SiteSettingResponse.model_validate(setting).model_dump()
+            for setting in query.order_by(SiteSetting.id).all()
+        ]
+    
+    return cache.get_or_set(f"{SETTINGS_CACHE_PREFIX}all:{category or ''}", load)
+
+
+@router.get("/version/")
+def get_settings_version(db: Session = Depends(get_db)):
+    """Current settings version; changes whenever any setting is saved"""
+    return {"version": settings_version(db)}
 
 
 @router.get("/by-key/{key}/")
@@ -41,13 +81,16 @@ def get_settings_by_category(category: str, db: Session = Depends(get_db)):
 @router.get("/grouped/")
 def get_settings_grouped(db: Session = Depends(get_db)):
     """Get all settings grouped by category"""
-    settings = db.query(SiteSetting).all()
-    grouped = {}
-    for setting in settings:
-        if setting.category not in grouped:
-            grouped[setting.category] = {}
-        grouped[setting.category][setting.key] = setting.value
-    return grouped
+    def load():
+        settings = db.query(SiteSetting).all()
+        grouped = {}
+        for setting in settings:
+            if setting.category not in grouped:
+                grouped[setting.category] = {}
+            grouped[setting.category][setting.key] = setting.value
+        return grouped
+    
+    return cache.get_or_set(f"{SETTINGS_CACHE_PREFIX}grouped", load)
 
 
 @router.post("/", response_model=SiteSettingResponse)
@@ -64,6 +107,7 @@ def create_setting(
     
     new_setting = SiteSetting(**setting_data.model_dump())
     db.add(new_setting)
+    bump_settings_version(db)
     db.commit()
     db.refresh(new_setting)
     return new_setting
@@ -85,6 +129,7 @@ def update_setting_by_key(
     for field, value in update_data.items():
         setattr(setting, field, value)
     
+    bump_settings_version(db)
     db.commit()
     db.refresh(setting)
     return setting
@@ -102,6 +147,7 @@ def delete_setting_by_key(
         raise HTTPException(status_code=404, detail=f"Setting with key '{key}' not found")
     
     db.delete(setting)
+    bump_settings_version(db)
     db.commit()
     return {"message": f"Setting '{key}' deleted successfully"}
 
@@ -112,23 +158,60 @@ def upsert_settings_bulk(
     db: Session = Depends(get_db),
     admin: User = Depends(get_admin_user)
 ):
-    """Create or update multiple settings at once (admin only)"""
-    results = []
+    """
+    Create or update multiple settings at once (admin only)
+    
+    One INSERT ... ON CONFLICT (key) DO UPDATE ... RETURNING statement for
+    the whole batch. Postgres reports per row whether it was inserted
+    (xmax = 0); SQLite has no xmax, so the existing keys are read first.
+    """
+    # A key may only be touched once per statement; the last entry wins
+    rows: Dict[str, dict] = {}
+    now = datetime.utcnow()
     for setting_data in settings:
-        existing = db.query(SiteSetting).filter(SiteSetting.key == setting_data.key).first()
-        if existing:
-            # Update existing
-            for field, value in setting_data.model_dump().items():
-                setattr(existing, field, value)
-            results.append({"key": setting_data.key, "action": "updated"})
-        else:
-            # Create new
-            new_setting = SiteSetting(**setting_data.model_dump())
-            db.add(new_setting)
-            results.append({"key": setting_data.key, "action": "created"})
+        rows[setting_data.key] = {**setting_data.model_dump(), "created_at": now, "updated_at": now}
+    if not rows:
+        return {"message": "Bulk operation completed", "results": [], "version": settings_version(db)}
+    
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise HTTPException(status_code=501, detail=f"Bulk upsert is not supported on {dialect}")
     
+    stmt = insert(SiteSetting).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SiteSetting.key],
+        set_={
+            "value": stmt.excluded.value,
+            "category": stmt.excluded.category,
+            "description": stmt.excluded.description,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    )
+    
+    if dialect == "postgresql":
+        returned = db.execute(
+            stmt.returning(SiteSetting.key, literal_column("(xmax = 0)").label("inserted"))
+        ).all()
+        inserted = {row.key: row.inserted for row in returned}
+    else:
+        existing = {
+            key for (key,) in db.query(SiteSetting.key).filter(SiteSetting.key.in_(list(rows))).all()
+        }
+        returned = db.execute(stmt.returning(SiteSetting.key)).all()
+        inserted = {row.key: row.key not in existing for row in returned}
+    
+    version = bump_settings_version(db)
     db.commit()
-    return {"message": "Bulk operation completed", "results": results}
+    
+    results = [
+        {"key": key, "action": "created" if inserted.get(key) else "updated"}
+        for key in rows
+    ]
+    return {"message": "Bulk operation completed", "results": results, "version": version}
 
 
 @router.put("/{setting_id}/", response_model=SiteSettingResponse)
@@ -147,6 +230,7 @@ def update_setting_by_id(
     for field, value in update_data.items():
         setattr(setting, field, value)
     
+    bump_settings_version(db)
     db.commit()
     db.refresh(setting)
     return setting
@@ -164,5 +248,6 @@ def delete_setting_by_id(
         raise HTTPException(status_code=404, detail="Setting not found")
     
     db.delete(setting)
+    bump_settings_version(db)
     db.commit()
     return {"message": "Setting deleted successfully"}
@@ -1,16 +1,41 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import datetime
+from xml.sax.saxutils import escape
+import math
 import re
+import zlib
 
 from app.database import get_db
 from app.models import BlogArticle, Doctor, Service
+from app.utils.cache import cache, depends_on_tables, table_version
 
 router = APIRouter(tags=["Sitemap"])
 
 BASE_URL = "https://novacare247.com"
 
+# Sitemaps protocol limit per file
+MAX_URLS_PER_SITEMAP = 50000
+# Rows fetched per round trip while streaming a child sitemap
+QUERY_CHUNK_SIZE = 1000
+# Bytes buffered before a chunk is sent to the client
+STREAM_BUFFER_BYTES = 64 * 1024
+
+# Rendered sitemaps are cached until a blog article, service or doctor changes
+SITEMAP_CACHE_PREFIX = "sitemap:"
+SITEMAP_CACHE_TTL = 6 * 60 * 60
+SITEMAP_TABLES = ("blog_articles", "services", "doctors")
+depends_on_tables(SITEMAP_CACHE_PREFIX, *SITEMAP_TABLES)
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '''<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+        xsi:schemaLocation="http://www.sitemaps.org/schemas/sitemap/0.9 http://www.sitemaps.org/schemas/sitemap/0.9/sitemap.xsd">
+'''
+SITEMAP_FILE_RE = re.compile(r"^(pages|blog|services|doctors)(?:-(\d+))?\.xml(\.gz)?$")
+
 
 def format_date(dt: datetime) -> str:
     """Format datetime to sitemap date format"""
@@ -28,29 +53,82 @@ def generate_slug(name: str) -> str:
     return slug.strip('-')
 
 
-@router.get("/sitemap.xml")
-def generate_sitemap(db: Session = Depends(get_db)):
-    """Generate dynamic XML sitemap"""
-    
-    today = datetime.now().strftime("%Y-%m-%d")
-    
-    # Get latest update dates for dynamic pages
-    latest_service = db.query(Service).filter(Service.is_active == True).order_by(Service.created_at.desc()).first()
-    latest_doctor = db.query(Doctor).filter(Doctor.is_available == True).order_by(Doctor.created_at.desc()).first()
-    latest_blog = db.query(BlogArticle).filter(BlogArticle.is_published == True).order_by(BlogArticle.updated_at.desc()).first()
-    
-    services_lastmod = format_date(latest_service.created_at) if latest_service else today
-    doctors_lastmod = format_date(latest_doctor.created_at) if latest_doctor else today
-    blog_lastmod = format_date(latest_blog.updated_at or latest_blog.published_at) if latest_blog else today
-    
-    # Start XML
-    xml_content = '''<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
-        xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
-        xsi:schemaLocation="http://www.sitemaps.org/schemas/sitemap/0.9 http://www.sitemaps.org/schemas/sitemap/0.9/sitemap.xsd">
+# ============ Section queries (slug/timestamp columns only) ============
+
+def _blog_rows(db: Session):
+    return db.query(
+        BlogArticle.id,
+        BlogArticle.slug,
+        func.coalesce(BlogArticle.updated_at, BlogArticle.published_at, BlogArticle.created_at).label("lastmod")
+    ).filter(BlogArticle.is_published == True)
+
+
+def _service_rows(db: Session):
+    return db.query(
+        Service.id, Service.slug, Service.created_at.label("lastmod")
+    ).filter(Service.is_active == True)
+
+
+def _doctor_rows(db: Session):
+    return db.query(
+        Doctor.id, Doctor.slug, Doctor.created_at.label("lastmod")
+    ).filter(Doctor.is_available == True)
+
+
+# name -> (row query, paging key, URL prefix, changefreq, priority)
+SITEMAP_SECTIONS = {
+    "blog": (_blog_rows, BlogArticle.id, "/blog/", "monthly", "0.7"),
+    "services": (_service_rows, Service.id, "/services/", "monthly", "0.8"),
+    "doctors": (_doctor_rows, Doctor.id, "/doctors/", "monthly", "0.8"),
+}
+
+
+def _section_summary(db: Session, section: str):
+    """(url count, latest lastmod) for a section without loading its rows"""
+    rows = SITEMAP_SECTIONS[section][0](db).subquery()
+    count, latest = db.query(func.count(), func.max(rows.c.lastmod)).select_from(rows).one()
+    return count, latest
+
+
+def _url_entry(loc: str, lastmod: str, changefreq: str, priority: str) -> str:
+    return f'''  <url>
+    <loc>{escape(BASE_URL + loc)}</loc>
+    <lastmod>{lastmod}</lastmod>
+    <changefreq>{changefreq}</changefreq>
+    <priority>{priority}</priority>
+  </url>
 '''
-    
-    # Static pages with dynamic lastmod where applicable
+
+
+# ============ Streaming renderers ============
+
+def _render_index(db: Session):
+    yield XML_HEADER
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    yield f'''  <sitemap>
+    <loc>{BASE_URL}/sitemaps/pages.xml</loc>
+    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>
+  </sitemap>
+'''
+    for section in SITEMAP_SECTIONS:
+        count, latest = _section_summary(db, section)
+        for page in range(1, math.ceil(count / MAX_URLS_PER_SITEMAP) + 1):
+            yield f'''  <sitemap>
+    <loc>{BASE_URL}/sitemaps/{section}-{page}.xml</loc>
+    <lastmod>{format_date(latest)}</lastmod>
+  </sitemap>
+'''
+    yield '</sitemapindex>\n'
+
+
+def _render_pages(db: Session):
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    # Latest update dates for listing pages (aggregates only)
+    services_lastmod = format_date(_section_summary(db, "services")[1])
+    doctors_lastmod = format_date(_section_summary(db, "doctors")[1])
+    blog_lastmod = format_date(_section_summary(db, "blog")[1])
+
     static_pages = [
         {"loc": "/", "changefreq": "daily", "priority": "1.0", "lastmod": today},
         {"loc": "/services", "changefreq": "weekly", "priority": "0.9", "lastmod": services_lastmod},
@@ -64,77 +142,112 @@ def generate_sitemap(db: Session = Depends(get_db)):
         {"loc": "/privacy-policy", "changefreq": "yearly", "priority": "0.3", "lastmod": today},
         {"loc": "/terms-of-service", "changefreq": "yearly", "priority": "0.3", "lastmod": today},
     ]
-    
-    xml_content += "\n  <!-- Main Pages -->\n"
+
+    yield XML_HEADER
+    yield URLSET_OPEN
     for page in static_pages:
-        xml_content += f'''  <url>
-    <loc>{BASE_URL}{page["loc"]}</loc>
-    <lastmod>{page["lastmod"]}</lastmod>
-    <changefreq>{page["changefreq"]}</changefreq>
-    <priority>{page["priority"]}</priority>
-  </url>
-'''
-    
-    # Dynamic Blog Articles
-    blog_articles = db.query(BlogArticle).filter(
-        BlogArticle.is_published == True
-    ).order_by(BlogArticle.published_at.desc()).all()
-    
-    if blog_articles:
-        xml_content += "\n  <!-- Blog Articles -->\n"
-        for article in blog_articles:
-            lastmod = format_date(article.updated_at or article.published_at or article.created_at)
-            xml_content += f'''  <url>
-    <loc>{BASE_URL}/blog/{article.slug}</loc>
-    <lastmod>{lastmod}</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-'''
-    
-    # Dynamic Services
-    services = db.query(Service).filter(Service.is_active == True).all()
-    
-    if services:
-        xml_content += "\n  <!-- Services -->\n"
-        for service in services:
-            lastmod = format_date(service.created_at)
-            # Use slug if available, fallback to id
-            service_url = service.slug if service.slug else str(service.id)
-            xml_content += f'''  <url>
-    <loc>{BASE_URL}/services/{service_url}</loc>
-    <lastmod>{lastmod}</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.8</priority>
-  </url>
-'''
-    
-    # Dynamic Doctors
-    doctors = db.query(Doctor).filter(Doctor.is_available == True).all()
-    
-    if doctors:
-        xml_content += "\n  <!-- Doctors -->\n"
-        for doctor in doctors:
-            lastmod = format_date(doctor.created_at)
-            # Use slug if available, fallback to id
-            doctor_url = doctor.slug if doctor.slug else str(doctor.id)
-            xml_content += f'''  <url>
-    <loc>{BASE_URL}/doctors/{doctor_url}</loc>
-    <lastmod>{lastmod}</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.8</priority>
-  </url>
-'''
-    
-    # Close XML
-    xml_content += "</urlset>"
-    
-    return Response(
-        content=xml_content,
-        media_type="application/xml",
-        headers={
-            "Cache-Control": "public, max-age=3600",  # Cache for 1 hour
-        }
+        yield _url_entry(page["loc"], page["lastmod"], page["changefreq"], page["priority"])
+    yield "</urlset>\n"
+
+
+def _render_section(db: Session, section: str, page: int):
+    rows_query, key, prefix, changefreq, priority = SITEMAP_SECTIONS[section]
+    rows = rows_query(db).order_by(key).offset(
+        (page - 1) * MAX_URLS_PER_SITEMAP
+    ).limit(MAX_URLS_PER_SITEMAP).yield_per(QUERY_CHUNK_SIZE)
+
+    yield XML_HEADER
+    yield URLSET_OPEN
+    for row in rows:
+        # Use slug if available, fallback to id
+        yield _url_entry(f"{prefix}{row.slug or row.id}", format_date(row.lastmod), changefreq, priority)
+    yield "</urlset>\n"
+
+
+def _buffered(chunks):
+    """Coalesce small string chunks into ~64KB byte blocks"""
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= STREAM_BUFFER_BYTES:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _gzipped(blocks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for block in blocks:
+        data = compressor.compress(block)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _sitemap_response(cache_key: str, render, gzipped: bool):
+    """Serve from cache, or stream the rendering and cache it once complete"""
+    media_type = "application/x-gzip" if gzipped else "application/xml"
+    headers = {"Cache-Control": "public, max-age=3600"}  # Cache for 1 hour
+    key = f"{SITEMAP_CACHE_PREFIX}{cache_key}{'.gz' if gzipped else ''}"
+
+    cached = cache.get(key)
+    if cached is not None:
+        return Response(content=cached, media_type=media_type, headers=headers)
+
+    def stream():
+        versions = [table_version(table) for table in SITEMAP_TABLES]
+        blocks = _buffered(render())
+        if gzipped:
+            blocks = _gzipped(blocks)
+        parts = []
+        for block in blocks:
+            parts.append(block)
+            yield block
+        # A write committed while streaming may not be in this sitemap; don't keep it
+        if versions == [table_version(table) for table in SITEMAP_TABLES]:
+            cache.set(key, b"".join(parts), ttl=SITEMAP_CACHE_TTL)
+
+    return StreamingResponse(stream(), media_type=media_type, headers=headers)
+
+
+@router.get("/sitemap.xml")
+def generate_sitemap(db: Session = Depends(get_db)):
+    """Sitemap index pointing at the per-section child sitemaps"""
+    return _sitemap_response("index.xml", lambda: _render_index(db), gzipped=False)
+
+
+@router.get("/sitemap.xml.gz")
+def generate_sitemap_gz(db: Session = Depends(get_db)):
+    """Gzip variant of the sitemap index"""
+    return _sitemap_response("index.xml", lambda: _render_index(db), gzipped=True)
+
+
+@router.get("/sitemaps/{filename}")
+def generate_child_sitemap(filename: str, db: Session = Depends(get_db)):
+    """Child sitemaps: pages.xml, blog-N.xml, services-N.xml, doctors-N.xml (+ .gz)"""
+    match = SITEMAP_FILE_RE.match(filename)
+    if not match:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+
+    section, page, gz = match.group(1), match.group(2), bool(match.group(3))
+
+    if section == "pages":
+        if page:
+            raise HTTPException(status_code=404, detail="Sitemap not found")
+        return _sitemap_response("pages.xml", lambda: _render_pages(db), gzipped=gz)
+
+    page = int(page or 1)
+    if page < 1:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+
+    return _sitemap_response(
+        f"{section}-{page}.xml",
+        lambda: _render_section(db, section, page),
+        gzipped=gz
     )
 
 
@@ -7,12 +7,19 @@ Best practices:
 - Admin-only endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from pydantic import BaseModel
-from typing import Optional
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+from typing import List, Optional
 from app.auth import get_admin_user
-from app.models import User
+from app.config import settings
+from app.database import get_db
+from app.models import MultipartUpload, User
 from app.s3_service import s3_service
+from app.utils import content_store, image_variants, storage_gc
+from app.utils.jobs import job_runner, submitted_response
 
 router = APIRouter(prefix="/api/uploads", tags=["Uploads"])
 
@@ -46,6 +53,80 @@ class DeleteFileRequest(BaseModel):
     file_url: str
 
 
+class ImageVariantsRequest(BaseModel):
+    """Request model for (re)generating resized variants of uploaded images"""
+    file_urls: List[str] = Field(..., min_length=1)
+    force: bool = False  # Regenerate even if variants exist
+
+
+class MultipartInitiateResponse(BaseModel):
+    """Response for starting a presigned multipart upload"""
+    upload_id: str
+    key: str
+    file_url: str
+    part_size: int
+    part_count: int
+
+
+class MultipartUploadRef(BaseModel):
+    """Identifies a multipart upload"""
+    upload_id: str
+    key: str
+
+
+class PresignPartsRequest(MultipartUploadRef):
+    """Part numbers (1-based) to presign, at most MAX_PRESIGN_BATCH per call"""
+    part_numbers: List[int] = Field(..., min_length=1)
+
+
+class PresignedPart(BaseModel):
+    part_number: int
+    url: str
+    size: int
+
+
+class PresignPartsResponse(BaseModel):
+    parts: List[PresignedPart]
+    expires_in: int
+
+
+class UploadedPart(BaseModel):
+    part_number: int
+    etag: str
+    size: int
+
+
+class MultipartStatusResponse(BaseModel):
+    """What S3 has received so far, for resuming an interrupted upload"""
+    upload_id: str
+    key: str
+    status: str
+    part_size: int
+    part_count: int
+    uploaded_parts: List[UploadedPart]
+    missing_parts: List[int]
+
+
+class CompletedPart(BaseModel):
+    part_number: int
+    etag: str
+
+
+class MultipartCompleteRequest(MultipartUploadRef):
+    """Optional client-side ETags; S3's own part list is used when omitted"""
+    parts: Optional[List[CompletedPart]] = None
+
+
+class MultipartCompleteResponse(BaseModel):
+    file_url: str
+    key: str
+    size: int
+
+
+# Part URLs handed out per presign call
+MAX_PRESIGN_BATCH = 100
+
+
 @router.get("/status", response_model=UploadStatusResponse)
 def get_upload_status(admin: User = Depends(get_admin_user)):
     """
@@ -163,6 +244,13 @@ async def upload_file_directly(
     Upload file directly through the server (admin only)
     Use this for smaller files when client-side upload isn't feasible
     
+    The upload is streamed from its temporary spool file to S3 in a worker
+    thread (multipart for files larger than one part), so it is never held
+    in memory whole and doesn't block the event loop.
+    
+    With S3_DEDUP_UPLOADS, the file is hashed first and a file already in the
+    bucket is returned without uploading it again ("deduplicated": true).
+    
     Note: For large files, use presigned URL method instead
     """
     if not s3_service.is_configured:
@@ -171,37 +259,310 @@ async def upload_file_directly(
             detail="File upload service is not configured."
         )
     
-    # Read file content
-    content = await file.read()
-    
-    # Validate file size (max 5MB for direct upload)
-    if len(content) > 5 * 1024 * 1024:
+    max_mb = settings.S3_DIRECT_UPLOAD_MAX_BYTES / (1024 * 1024)
+    # Reject early when the size is known; otherwise it is enforced while streaming
+    if file.size is not None and file.size > settings.S3_DIRECT_UPLOAD_MAX_BYTES:
         raise HTTPException(
             status_code=400,
-            detail="File too large. Use presigned URL for files over 5MB."
+            detail=f"File too large. Use presigned URL for files over {max_mb:g}MB."
         )
     
+    await file.seek(0)
+    deduplicated = False
     try:
-        file_url = s3_service.upload_file_directly(
-            file_content=content,
-            original_filename=file.filename or "upload",
-            content_type=file.content_type or "application/octet-stream",
-            folder=folder
-        )
-        
-        return {"file_url": file_url, "filename": file.filename}
+        if settings.S3_DEDUP_UPLOADS:
+            file_url, deduplicated = await asyncio.to_thread(
+                content_store.store_upload,
+                file.file,
+                original_filename=file.filename or "upload",
+                content_type=file.content_type or "application/octet-stream",
+                folder=folder,
+                max_size=settings.S3_DIRECT_UPLOAD_MAX_BYTES
+            )
+        else:
+            file_url = await asyncio.to_thread(
+                s3_service.upload_fileobj_streaming,
+                file.file,
+                original_filename=file.filename or "upload",
+                content_type=file.content_type or "application/octet-stream",
+                folder=folder,
+                max_size=settings.S3_DIRECT_UPLOAD_MAX_BYTES
+            )
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    # Resized WebP/AVIF copies are rendered in the background
+    await asyncio.to_thread(image_variants.queue_variants, [file_url])
+    
+    return {"file_url": file_url, "filename": file.filename, "deduplicated": deduplicated}
+
+
+@router.post("/variants")
+def generate_image_variants(
+    request: ImageVariantsRequest,
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Queue resized variants + blurhash for already uploaded images (admin only).
+    Images saved on doctors, blog articles and clinic applications are queued
+    automatically; this is for backfills and re-renders after changing
+    IMAGE_VARIANT_* settings.
+    """
+    if not s3_service.is_configured:
+        raise HTTPException(
+            status_code=503,
+            detail="File upload service is not configured."
+        )
+    
+    job_ids = image_variants.queue_variants(request.file_urls, force=request.force)
+    return {"queued": len(job_ids), "job_ids": job_ids}
+
+
+@router.post("/gc")
+def collect_orphaned_files(
+    dry_run: bool = True,
+    grace_hours: Optional[int] = Query(None, ge=0),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Delete bucket objects no record references any more (admin only).
+    Runs as a background job; with dry_run (the default) the job result
+    reports what would be deleted without deleting anything.
+    """
+    if not s3_service.is_configured:
+        raise HTTPException(
+            status_code=503,
+            detail="File upload service is not configured."
+        )
+    
+    job_id = job_runner.submit(
+        "storage.gc",
+        {"dry_run": dry_run, "grace_hours": grace_hours},
+        created_by=admin.id
+    )
+    return submitted_response(job_id)
+
+
+# ============ Presigned multipart uploads ============
+#
+# For large onboarding documents on unreliable connections. Public like
+# /presigned-url/public and likewise limited to the documents folder.
+#
+# 1. POST /multipart/initiate            -> upload_id, key, part_size, part_count
+# 2. POST /multipart/presign-parts       -> PUT URLs for a batch of part numbers;
+#    PUT each slice (part_size bytes, last one shorter), in parallel, and
+#    re-presign and retry any part that fails
+# 3. GET  /multipart/status              -> parts S3 already has (to resume)
+# 4. POST /multipart/complete            -> assembles the file, returns file_url
+#    DELETE /multipart                   -> abandon the upload
+
+def _get_multipart_upload(db: Session, upload_id: str, key: str) -> MultipartUpload:
+    if not s3_service.is_configured:
+        raise HTTPException(
+            status_code=503,
+            detail="File upload service is not configured."
+        )
+    
+    upload = db.query(MultipartUpload).filter(MultipartUpload.upload_id == upload_id).first()
+    if not upload or upload.key != key:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+def _require_in_progress(upload: MultipartUpload):
+    if upload.status != "in_progress":
+        raise HTTPException(status_code=409, detail=f"Upload is already {upload.status}")
+
+
+def _part_length(upload: MultipartUpload, part_number: int) -> int:
+    if part_number < upload.part_count:
+        return upload.part_size
+    return upload.file_size - upload.part_size * (upload.part_count - 1)
+
+
+@router.post("/multipart/initiate", response_model=MultipartInitiateResponse)
+def initiate_multipart_upload(request: PresignedUrlRequest, db: Session = Depends(get_db)):
+    """
+    Start a resumable multipart upload (public, documents folder only).
+    file_size is required: it fixes the part layout and the completed size.
+    """
+    if not s3_service.is_configured:
+        raise HTTPException(
+            status_code=503,
+            detail="File upload service is not configured. Please configure AWS S3 credentials."
+        )
+    
+    try:
+        result = s3_service.initiate_multipart_upload(
+            original_filename=request.filename,
+            content_type=request.content_type,
+            folder='documents',
+            file_size=request.file_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    db.add(MultipartUpload(
+        upload_id=result['upload_id'],
+        key=result['key'],
+        content_type=request.content_type,
+        file_size=request.file_size,
+        part_size=result['part_size'],
+        part_count=result['part_count']
+    ))
+    db.commit()
+    
+    return MultipartInitiateResponse(**result)
+
+
+@router.post("/multipart/presign-parts", response_model=PresignPartsResponse)
+def presign_multipart_parts(request: PresignPartsRequest, db: Session = Depends(get_db)):
+    """
+    Presigned PUT URLs for a batch of parts. Call again for a fresh URL when
+    a part has to be retried after its URL expired.
+    """
+    upload = _get_multipart_upload(db, request.upload_id, request.key)
+    _require_in_progress(upload)
+    
+    part_numbers = sorted(set(request.part_numbers))
+    if len(part_numbers) > MAX_PRESIGN_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PRESIGN_BATCH} parts per request")
+    invalid = [n for n in part_numbers if n < 1 or n > upload.part_count]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid part numbers {invalid}: this upload has parts 1-{upload.part_count}"
+        )
+    
+    try:
+        parts = [
+            PresignedPart(
+                part_number=n,
+                url=s3_service.generate_presigned_part_url(upload.key, upload.upload_id, n, _part_length(upload, n)),
+                size=_part_length(upload, n)
+            )
+            for n in part_numbers
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    
+    return PresignPartsResponse(parts=parts, expires_in=settings.S3_PRESIGNED_URL_EXPIRY)
+
+
+@router.get("/multipart/status", response_model=MultipartStatusResponse)
+def get_multipart_status(upload_id: str, key: str, db: Session = Depends(get_db)):
+    """
+    Parts already stored by S3 and the ones still missing, so an interrupted
+    upload can continue where it stopped
+    """
+    upload = _get_multipart_upload(db, upload_id, key)
+    
+    uploaded = []
+    if upload.status == "in_progress":
+        try:
+            uploaded = s3_service.list_uploaded_parts(upload.key, upload.upload_id)
+        except ValueError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+    
+    received = {part['part_number'] for part in uploaded}
+    return MultipartStatusResponse(
+        upload_id=upload.upload_id,
+        key=upload.key,
+        status=upload.status,
+        part_size=upload.part_size,
+        part_count=upload.part_count,
+        uploaded_parts=[UploadedPart(**part) for part in uploaded],
+        missing_parts=[] if upload.status != "in_progress" else [
+            n for n in range(1, upload.part_count + 1) if n not in received
+        ]
+    )
+
+
+@router.post("/multipart/complete", response_model=MultipartCompleteResponse)
+def complete_multipart(request: MultipartCompleteRequest, db: Session = Depends(get_db)):
+    """
+    Assemble the uploaded parts into the final file. Every part must be
+    present and the total must match the size declared at initiation.
+    """
+    upload = _get_multipart_upload(db, request.upload_id, request.key)
+    if upload.status == "completed":
+        # Completing twice (e.g. a retried request) is harmless
+        return MultipartCompleteResponse(
+            file_url=s3_service.get_file_url(upload.key), key=upload.key, size=upload.file_size
+        )
+    _require_in_progress(upload)
+    
+    try:
+        uploaded = s3_service.list_uploaded_parts(upload.key, upload.upload_id)
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    
+    by_number = {part['part_number']: part for part in uploaded}
+    missing = [n for n in range(1, upload.part_count + 1) if n not in by_number]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Parts not uploaded yet: {missing}")
+    
+    total = sum(by_number[n]['size'] for n in range(1, upload.part_count + 1))
+    if total != upload.file_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Uploaded {total} bytes but {upload.file_size} were declared"
+        )
+    
+    if request.parts:
+        for part in request.parts:
+            stored = by_number.get(part.part_number)
+            if not stored or stored['etag'].strip('"') != part.etag.strip('"'):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Part {part.part_number} does not match what S3 received; upload it again"
+                )
+    
+    try:
+        file_url = s3_service.complete_multipart_upload(
+            upload.key,
+            upload.upload_id,
+            [by_number[n] for n in range(1, upload.part_count + 1)]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    
+    upload.status = "completed"
+    upload.completed_at = datetime.utcnow()
+    db.commit()
+    
+    image_variants.queue_variants([file_url])
+    
+    return MultipartCompleteResponse(file_url=file_url, key=upload.key, size=total)
+
+
+@router.delete("/multipart")
+def abort_multipart(request: MultipartUploadRef, db: Session = Depends(get_db)):
+    """Abandon an unfinished upload and discard its parts"""
+    upload = _get_multipart_upload(db, request.upload_id, request.key)
+    _require_in_progress(upload)
+    
+    if not s3_service.abort_multipart_upload(upload.key, upload.upload_id):
+        raise HTTPException(status_code=502, detail="Failed to abort upload")
+    
+    upload.status = "aborted"
+    upload.completed_at = datetime.utcnow()
+    db.commit()
+    return {"message": "Upload aborted"}
 
 
 @router.delete("/")
 def delete_file(
     request: DeleteFileRequest,
+    db: Session = Depends(get_db),
     admin: User = Depends(get_admin_user)
 ):
     """
     Delete a file from S3 (admin only)
+    
+    Deduplicated uploads are shared: this releases one reference and the
+    object is removed with the last one.
     """
     if not s3_service.is_configured:
         raise HTTPException(
@@ -209,7 +570,9 @@ def delete_file(
             detail="File upload service is not configured."
         )
     
-    success = s3_service.delete_file_by_url(request.file_url)
+    success = content_store.release(db, request.file_url)
+    if success is None:
+        success = s3_service.delete_file_by_url(request.file_url)
     
     if success:
         return {"message": "File deleted successfully"}
@@ -217,6 +580,19 @@ def delete_file(
         raise HTTPException(status_code=400, detail="Failed to delete file")
 
 
+@router.get("/metrics")
+def get_s3_metrics(admin: User = Depends(get_admin_user)):
+    """
+    S3 call counts, errors, retries and latency percentiles per operation
+    for this worker (admin only)
+    """
+    return {
+        "operations": s3_service.metrics.snapshot(),
+        "max_pool_connections": settings.S3_MAX_POOL_CONNECTIONS,
+        "retry_mode": settings.S3_RETRY_MODE,
+    }
+
+
 @router.get("/allowed-types")
 def get_allowed_file_types():
     """
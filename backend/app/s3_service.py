@@ -5,6 +5,8 @@ AWS S3 Service for file uploads with best practices:
 - Unique filenames to prevent collisions
 - Organized folder structure
 - Optional CloudFront CDN integration
+- One shared client: pooled connections, adaptive retries, timeouts from
+  settings, and per-operation latency metrics (S3Service.metrics)
 """
 
 import boto3
@@ -12,9 +14,67 @@ from botocore.exceptions import ClientError
 from botocore.config import Config
 import uuid
 from datetime import datetime
-from typing import Optional, Tuple
+import threading
+import time
+from collections import deque
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
 import mimetypes
 from app.config import settings
+from app.utils.cache import TTLCache
+
+# S3 rejects multipart parts (other than the last) smaller than 5MB
+MIN_MULTIPART_CHUNK = 5 * 1024 * 1024
+MAX_MULTIPART_PARTS = 10000
+
+# Latency samples kept per operation for the percentiles
+METRICS_SAMPLES = 1000
+
+
+class OperationMetrics:
+    """Call counts, errors, retries and latency percentiles per S3 operation (this worker)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ops: Dict[str, Dict] = {}
+
+    def record(self, operation: str, seconds: float, error: bool = False, retries: int = 0):
+        with self._lock:
+            op = self._ops.get(operation)
+            if op is None:
+                op = self._ops[operation] = {
+                    "calls": 0, "errors": 0, "retries": 0, "total": 0.0,
+                    "samples": deque(maxlen=METRICS_SAMPLES),
+                }
+            op["calls"] += 1
+            op["errors"] += int(error)
+            op["retries"] += retries
+            op["total"] += seconds
+            op["samples"].append(seconds)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            ops = {name: (dict(op), sorted(op["samples"])) for name, op in self._ops.items()}
+
+        def percentile(samples, q):
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 1)
+
+        return {
+            name: {
+                "calls": op["calls"],
+                "errors": op["errors"],
+                "retries": op["retries"],
+                "avg_ms": round(op["total"] / op["calls"] * 1000, 1),
+                "p50_ms": percentile(samples, 0.50),
+                "p95_ms": percentile(samples, 0.95),
+                "p99_ms": percentile(samples, 0.99),
+                "max_ms": round(samples[-1] * 1000, 1),
+            }
+            for name, (op, samples) in sorted(ops.items())
+        }
+
+    def reset(self):
+        with self._lock:
+            self._ops.clear()
 
 
 class S3Service:
@@ -45,7 +105,11 @@ class S3Service:
     
     def __init__(self):
         self._client = None
+        self._client_lock = threading.Lock()
         self._is_configured = False
+        self.metrics = OperationMetrics()
+        # "<expires_in>:<key>" -> (signed URL, expiry timestamp)
+        self._download_urls = TTLCache(maxsize=settings.S3_SIGNED_URL_CACHE_SIZE, ttl=600)
         self._check_configuration()
     
     def _check_configuration(self):
@@ -58,30 +122,82 @@ class S3Service:
     
     @property
     def client(self):
-        """Lazy initialization of S3 client"""
+        """
+        Lazily created client shared by every request and thread (boto3
+        clients are thread-safe once built)
+        """
         if self._client is None and self._is_configured:
-            # Configure with retries and timeouts
-            config = Config(
-                region_name=settings.AWS_REGION,
-                signature_version='s3v4',
-                s3={
-                    'addressing_style': 'virtual'
-                },
-                retries={
-                    'max_attempts': 3,
-                    'mode': 'standard'
-                }
-            )
-            self._client = boto3.client(
-                's3',
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION,
-                endpoint_url=f"https://s3.{settings.AWS_REGION}.amazonaws.com",
-                config=config
-            )
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self.build_client()
         return self._client
     
+    def build_client(self, **config_overrides):
+        """
+        S3 client configured from settings: connection pool size, retry mode
+        and attempts, connect/read timeouts. Keyword arguments override
+        botocore Config fields (the benchmark compares pool sizes this way).
+        """
+        options = dict(
+            region_name=settings.AWS_REGION,
+            signature_version='s3v4',
+            s3={
+                # Local stand-ins (moto, MinIO) only understand path-style URLs
+                'addressing_style': 'path' if settings.S3_ENDPOINT_URL else 'virtual'
+            },
+            retries={
+                'max_attempts': settings.S3_MAX_ATTEMPTS,
+                'mode': settings.S3_RETRY_MODE
+            },
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.S3_CONNECT_TIMEOUT,
+            read_timeout=settings.S3_READ_TIMEOUT,
+            tcp_keepalive=True,
+        )
+        options.update(config_overrides)
+        client = boto3.client(
+            's3',
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION,
+            endpoint_url=settings.S3_ENDPOINT_URL or f"https://s3.{settings.AWS_REGION}.amazonaws.com",
+            config=Config(**options)
+        )
+        self._register_metrics(client)
+        return client
+    
+    def _register_metrics(self, client):
+        """Time every API call (retries included) through botocore's event hooks"""
+        events = client.meta.events
+        
+        def before_call(model, context, **kwargs):
+            context['metrics_call'] = (model.name, time.perf_counter())
+        
+        # after-call-error (connection failures after all retries) carries no model
+        def after_call(context, parsed=None, exception=None, **kwargs):
+            call = context.pop('metrics_call', None)
+            if call is None:
+                return
+            operation, started = call
+            error = exception is not None or bool((parsed or {}).get('Error'))
+            retries = (parsed or {}).get('ResponseMetadata', {}).get('RetryAttempts', 0)
+            self.metrics.record(operation, time.perf_counter() - started, error=error, retries=retries)
+        
+        events.register('before-call.s3', before_call)
+        events.register('after-call.s3', after_call)
+        events.register('after-call-error.s3', after_call)
+    
+    def _presign(self, operation: str, params: Dict, expires_in: int, http_method: Optional[str] = None) -> str:
+        """generate_presigned_url, timed into the metrics as presign:<operation>"""
+        started = time.perf_counter()
+        kwargs = {'Params': params, 'ExpiresIn': expires_in}
+        if http_method:
+            kwargs['HttpMethod'] = http_method
+        try:
+            return self.client.generate_presigned_url(operation, **kwargs)
+        finally:
+            self.metrics.record(f"presign:{operation}", time.perf_counter() - started)
+    
     @property
     def is_configured(self) -> bool:
         """Check if S3 is properly configured"""
@@ -99,6 +215,12 @@ class S3Service:
         
         return f"{folder}{now.year}/{now.month:02d}/{unique_id}_{timestamp}.{ext}"
     
+    def content_addressed_key(self, sha256: str, original_filename: str, folder: str = 'misc') -> str:
+        """Key derived from a file's SHA-256: folder/sha256/ab/abcdef....ext"""
+        ext = original_filename.rsplit('.', 1)[-1].lower() if '.' in original_filename else 'jpg'
+        folder_path = self.FOLDERS.get(folder, self.FOLDERS['misc'])
+        return f"{folder_path}sha256/{sha256[:2]}/{sha256}.{ext}"
+    
     def validate_file(
         self, 
         content_type: str, 
@@ -170,15 +292,15 @@ class S3Service:
         
         try:
             # Generate presigned URL for PUT operation
-            presigned_url = self.client.generate_presigned_url(
+            presigned_url = self._presign(
                 'put_object',
-                Params={
+                {
                     'Bucket': settings.S3_BUCKET_NAME,
                     'Key': key,
                     'ContentType': content_type,
                 },
-                ExpiresIn=settings.S3_PRESIGNED_URL_EXPIRY,
-                HttpMethod='PUT'
+                settings.S3_PRESIGNED_URL_EXPIRY,
+                http_method='PUT'
             )
             
             # Build the final file URL
@@ -199,21 +321,49 @@ class S3Service:
     
     def generate_presigned_download_url(self, key: str, expires_in: int = 3600) -> str:
         """Generate a presigned URL for private file download"""
+        return self.generate_presigned_download_urls([key], expires_in)[key][0]
+    
+    def generate_presigned_download_urls(
+        self,
+        keys: Iterable[str],
+        expires_in: int = 3600
+    ) -> Dict[str, Tuple[str, int]]:
+        """
+        Presigned download URLs for many keys: {key: (url, expires_at)}
+        
+        Signed URLs are cached and handed out again until
+        S3_SIGNED_URL_REFRESH_SECONDS before they expire, so repeated review
+        screens get identical (browser-cacheable) URLs and skip re-signing.
+        """
         if not self.is_configured:
             raise ValueError("AWS S3 is not configured")
         
-        try:
-            url = self.client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': settings.S3_BUCKET_NAME,
-                    'Key': key,
-                },
-                ExpiresIn=expires_in
-            )
-            return url
-        except ClientError as e:
-            raise ValueError(f"Failed to generate download URL: {str(e)}")
+        # Short-lived URLs are not worth caching
+        reusable_for = expires_in - settings.S3_SIGNED_URL_REFRESH_SECONDS
+        now = time.time()
+        signed = {}
+        for key in keys:
+            if key in signed:
+                continue
+            cached = self._download_urls.get(f"{expires_in}:{key}") if reusable_for > 0 else None
+            if cached:
+                signed[key] = cached
+                continue
+            try:
+                url = self._presign(
+                    'get_object',
+                    {
+                        'Bucket': settings.S3_BUCKET_NAME,
+                        'Key': key,
+                    },
+                    expires_in
+                )
+            except ClientError as e:
+                raise ValueError(f"Failed to generate download URL: {str(e)}")
+            signed[key] = (url, int(now) + expires_in)
+            if reusable_for > 0:
+                self._download_urls.set(f"{expires_in}:{key}", signed[key], ttl=reusable_for)
+        return signed
     
     def delete_file(self, key: str) -> bool:
         """Delete a file from S3"""
@@ -240,6 +390,10 @@ class S3Service:
             return self.delete_file(key)
         return False
     
+    def get_key_from_url(self, url: str) -> Optional[str]:
+        """S3 key of one of our file URLs (None for external URLs)"""
+        return self._extract_key_from_url(url)
+    
     def _extract_key_from_url(self, url: str) -> Optional[str]:
         """Extract S3 key from a full URL"""
         if not url:
@@ -289,13 +443,241 @@ class S3Service:
                 CacheControl='public, max-age=31536000',  # 1 year cache
             )
             
-            if settings.CLOUDFRONT_DOMAIN:
-                return f"https://{settings.CLOUDFRONT_DOMAIN}/{key}"
-            return f"https://{settings.S3_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
+            return self.get_file_url(key)
             
         except ClientError as e:
             raise ValueError(f"Failed to upload file: {str(e)}")
 
+    def upload_fileobj_streaming(
+        self,
+        fileobj: BinaryIO,
+        original_filename: str,
+        content_type: str,
+        folder: str = 'misc',
+        max_size: Optional[int] = None,
+        key: Optional[str] = None
+    ) -> str:
+        """
+        Stream a file object to S3 without holding it in memory.
+
+        Reads S3_MULTIPART_CHUNK_BYTES at a time: a file that fits in one chunk
+        is sent with a single PUT, anything larger as a multipart upload. The
+        size limit (the content type's limit, or max_size if lower) is checked
+        as bytes arrive, and an over-size or failed multipart upload is aborted
+        so no orphaned parts are left behind. Blocking - call it from a worker
+        thread in async handlers. Uploads to key if given, else a fresh unique
+        key in folder. Returns the final file URL.
+        """
+        if not self.is_configured:
+            raise ValueError("AWS S3 is not configured")
+
+        # Type check up front; size is checked incrementally below
+        is_valid, error = self.validate_file(content_type, 0)
+        if not is_valid:
+            raise ValueError(error)
+        limit = self.ALLOWED_IMAGE_TYPES.get(content_type) or self.ALLOWED_DOCUMENT_TYPES[content_type]
+        if max_size is not None:
+            limit = min(limit, max_size)
+
+        def too_large():
+            return ValueError(f"File too large. Maximum size for {content_type}: {limit / (1024 * 1024)}MB")
+
+        chunk_size = max(MIN_MULTIPART_CHUNK, settings.S3_MULTIPART_CHUNK_BYTES)
+        if key is None:
+            folder_path = self.FOLDERS.get(folder, self.FOLDERS['misc'])
+            key = self._generate_unique_filename(original_filename, folder_path)
+
+        chunk = fileobj.read(chunk_size)
+        if len(chunk) > limit:
+            raise too_large()
+        next_chunk = fileobj.read(chunk_size) if len(chunk) == chunk_size else b''
+
+        if not next_chunk:
+            # Small file: one request, no multipart bookkeeping
+            try:
+                self.client.put_object(
+                    Bucket=settings.S3_BUCKET_NAME,
+                    Key=key,
+                    Body=chunk,
+                    ContentType=content_type,
+                    CacheControl='public, max-age=31536000',  # 1 year cache
+                )
+                return self.get_file_url(key)
+            except ClientError as e:
+                raise ValueError(f"Failed to upload file: {str(e)}")
+
+        try:
+            upload = self.client.create_multipart_upload(
+                Bucket=settings.S3_BUCKET_NAME,
+                Key=key,
+                ContentType=content_type,
+                CacheControl='public, max-age=31536000',
+            )
+        except ClientError as e:
+            raise ValueError(f"Failed to upload file: {str(e)}")
+        upload_id = upload['UploadId']
+
+        parts = []
+        total = 0
+        try:
+            while chunk:
+                total += len(chunk)
+                if total > limit:
+                    raise too_large()
+                response = self.client.upload_part(
+                    Bucket=settings.S3_BUCKET_NAME,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=len(parts) + 1,
+                    Body=chunk,
+                )
+                parts.append({'PartNumber': len(parts) + 1, 'ETag': response['ETag']})
+                chunk, next_chunk = next_chunk, (fileobj.read(chunk_size) if next_chunk else b'')
+
+            self.client.complete_multipart_upload(
+                Bucket=settings.S3_BUCKET_NAME,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts},
+            )
+            return self.get_file_url(key)
+        except Exception as e:
+            self.abort_multipart_upload(key, upload_id)
+            if isinstance(e, ClientError):
+                raise ValueError(f"Failed to upload file: {str(e)}")
+            raise
+
+    # ============ Presigned multipart uploads ============
+
+    def initiate_multipart_upload(
+        self,
+        original_filename: str,
+        content_type: str,
+        folder: str,
+        file_size: int
+    ) -> dict:
+        """
+        Start a multipart upload that the client fills with presigned part URLs
+
+        Returns:
+            {
+                'upload_id': S3 UploadId,
+                'key': S3 object key,
+                'file_url': Final URL once completed,
+                'part_size': Bytes per part (the last part may be smaller),
+                'part_count': Number of parts the file splits into
+            }
+        """
+        if not self.is_configured:
+            raise ValueError("AWS S3 is not configured. Please set AWS credentials in environment.")
+
+        if file_size <= 0:
+            raise ValueError("file_size is required for multipart uploads")
+        is_valid, error = self.validate_file(content_type, file_size, file_category='any')
+        if not is_valid:
+            raise ValueError(error)
+
+        part_size = max(MIN_MULTIPART_CHUNK, settings.S3_PRESIGNED_PART_BYTES, -(-file_size // MAX_MULTIPART_PARTS))
+        part_count = max(1, -(-file_size // part_size))
+
+        folder_path = self.FOLDERS.get(folder, self.FOLDERS['misc'])
+        key = self._generate_unique_filename(original_filename, folder_path)
+
+        try:
+            upload = self.client.create_multipart_upload(
+                Bucket=settings.S3_BUCKET_NAME,
+                Key=key,
+                ContentType=content_type,
+                CacheControl='public, max-age=31536000',
+            )
+        except ClientError as e:
+            raise ValueError(f"Failed to start upload: {str(e)}")
+
+        return {
+            'upload_id': upload['UploadId'],
+            'key': key,
+            'file_url': self.get_file_url(key),
+            'part_size': part_size,
+            'part_count': part_count,
+        }
+
+    def generate_presigned_part_url(self, key: str, upload_id: str, part_number: int, content_length: int) -> str:
+        """Presigned PUT URL for one part; the signed Content-Length pins the part size"""
+        try:
+            return self._presign(
+                'upload_part',
+                {
+                    'Bucket': settings.S3_BUCKET_NAME,
+                    'Key': key,
+                    'UploadId': upload_id,
+                    'PartNumber': part_number,
+                    'ContentLength': content_length,
+                },
+                settings.S3_PRESIGNED_URL_EXPIRY,
+                http_method='PUT'
+            )
+        except ClientError as e:
+            raise ValueError(f"Failed to generate part URL: {str(e)}")
+
+    def list_uploaded_parts(self, key: str, upload_id: str) -> list:
+        """Parts S3 has received so far: [{'part_number', 'etag', 'size'}]"""
+        parts = []
+        marker = 0
+        try:
+            while True:
+                response = self.client.list_parts(
+                    Bucket=settings.S3_BUCKET_NAME,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumberMarker=marker,
+                )
+                for part in response.get('Parts', []):
+                    parts.append({
+                        'part_number': part['PartNumber'],
+                        'etag': part['ETag'],
+                        'size': part['Size'],
+                    })
+                if not response.get('IsTruncated'):
+                    return parts
+                marker = response['NextPartNumberMarker']
+        except ClientError as e:
+            raise ValueError(f"Failed to list uploaded parts: {str(e)}")
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: list) -> str:
+        """Assemble uploaded parts ([{'part_number', 'etag'}]) into the object. Returns the file URL."""
+        try:
+            self.client.complete_multipart_upload(
+                Bucket=settings.S3_BUCKET_NAME,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': [
+                    {'PartNumber': part['part_number'], 'ETag': part['etag']}
+                    for part in sorted(parts, key=lambda p: p['part_number'])
+                ]},
+            )
+        except ClientError as e:
+            raise ValueError(f"Failed to complete upload: {str(e)}")
+        return self.get_file_url(key)
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> bool:
+        """Discard an unfinished multipart upload and its parts"""
+        try:
+            self.client.abort_multipart_upload(
+                Bucket=settings.S3_BUCKET_NAME,
+                Key=key,
+                UploadId=upload_id,
+            )
+            return True
+        except ClientError as e:
+            print(f"S3 abort multipart upload error: {e}")
+            return False
+
+    def get_file_url(self, key: str) -> str:
+        """Public URL of an object (CloudFront if configured)"""
+        if settings.CLOUDFRONT_DOMAIN:
+            return f"https://{settings.CLOUDFRONT_DOMAIN}/{key}"
+        return f"https://{settings.S3_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
+
 
 # Singleton instance
 s3_service = S3Service()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import date, time, datetime
 from app.models import UserRole, BookingStatus
 
@@ -129,6 +129,22 @@ class DoctorReviewResponse(DoctorReviewBase):
         from_attributes = True
 
 
+# Resized image variants (see app/utils/image_variants.py)
+class ImageVariant(BaseModel):
+    format: str  # webp, avif
+    width: int
+    height: int
+    url: str
+
+
+class ImageVariants(BaseModel):
+    width: Optional[int] = None  # Original dimensions
+    height: Optional[int] = None
+    blurhash: Optional[str] = None  # Placeholder shown while loading
+    srcset: Dict[str, str] = {}  # format -> "url 320w, url 640w, ..."
+    variants: List[ImageVariant] = []
+
+
 # Branch info for doctor response
 class BranchInfo(BaseModel):
     id: int
@@ -152,9 +168,11 @@ class DoctorPublic(BaseModel):
     expertise: Optional[List[str]] = None  # List of expertise areas
     consultation_fee: int  # Default/legacy fee
     profile_image: Optional[str]
+    profile_image_variants: Optional[ImageVariants] = None
     is_available: bool
     full_name: str
     rating: float  # Displayed as x.x out of 5.0
+    view_count: int = 0  # Profile views, used for "popular" sorting
     branch: Optional[BranchInfo] = None
     consultation_fees: List[ConsultationFeeResponse] = []
     
@@ -872,5 +890,42 @@ class ClinicOnboardingDashboardStats(BaseModel):
     rejected_this_month: int
 
 
+# ============ APPLICATION DOCUMENT SCHEMAS ============
+
+class SignedDocumentResponse(BaseModel):
+    field: str
+    index: Optional[int] = None  # Position within JSON list fields
+    url: str
+    signed_url: Optional[str] = None  # None for files outside our bucket
+    expires_at: Optional[int] = None  # Unix timestamp
+
+
+class ApplicationDocumentsResponse(BaseModel):
+    application_id: int
+    documents: List[SignedDocumentResponse]
+
+
+# ============ BACKGROUND JOB SCHEMAS ============
+
+class JobSubmittedResponse(BaseModel):
+    """Returned instead of the result when an endpoint runs with background=true"""
+    job_id: str
+    status: str
+    status_url: str
+
+
+class BackgroundJobResponse(BaseModel):
+    job_id: str
+    job_type: str
+    status: str
+    progress: int = 0
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 # Rebuild models with forward references
 DoctorResponse.model_rebuild()
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Helpers for keeping the normalized blog tag tables in sync.
+
+BlogArticle.tags keeps the JSON list as entered (used for display), while
+blog_tags / blog_article_tags hold the normalized, indexed form used for
+filtering and tag counts.
+"""
+import re
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.models import BlogTag, BlogArticleTag
+from app.utils.slugs import generate_slug
+
+
+def normalize_tag(tag: str) -> str:
+    """Trim and collapse whitespace in a tag name"""
+    return re.sub(r"\s+", " ", str(tag or "")).strip()
+
+
+def get_or_create_tags(db: Session, names: List[str]) -> List[BlogTag]:
+    """Resolve tag names to BlogTag rows (one SELECT, inserts only for new tags)"""
+    by_slug: Dict[str, str] = {}
+    for name in names:
+        name = normalize_tag(name)
+        slug = generate_slug(name)
+        if slug and slug not in by_slug:
+            by_slug[slug] = name
+    
+    if not by_slug:
+        return []
+    
+    existing = {
+        tag.slug: tag
+        for tag in db.query(BlogTag).filter(BlogTag.slug.in_(list(by_slug.keys()))).all()
+    }
+    
+    tags = []
+    for slug, name in by_slug.items():
+        tag = existing.get(slug)
+        if tag is None:
+            tag = BlogTag(name=name, slug=slug)
+            db.add(tag)
+        tags.append(tag)
+    db.flush()
+    return tags
+
+
+def sync_article_tags(db: Session, article_id: int, names: List[str]):
+    """Replace an article's tag links with `names` (caller commits)"""
+    db.query(BlogArticleTag).filter(
+        BlogArticleTag.article_id == article_id
+    ).delete(synchronize_session=False)
+    
+    for tag in get_or_create_tags(db, names or []):
+        db.add(BlogArticleTag(article_id=article_id, tag_id=tag.id))
+
+
+def remove_article_tags(db: Session, article_id: int):
+    """Remove all tag links for an article (caller commits)"""
+    db.query(BlogArticleTag).filter(
+        BlogArticleTag.article_id == article_id
+    ).delete(synchronize_session=False)
@@ -0,0 +1,192 @@
+"""
+In-process response cache shared by the routers.
+
+Entries are grouped by key prefix (e.g. "blog:tags:") and each prefix can be
+registered as depending on one or more database tables. SQLAlchemy session
+hooks record which tables were written in a transaction and, after commit,
+evict every prefix that depends on them. Writes made outside the ORM session
+should call broadcast_invalidation() themselves.
+
+The cache lives in one worker process. Committed changes are also handed to
+the listeners registered with on_broadcast() - the invalidation bus
+(app.utils.invalidation_bus) - so other workers evict the same prefixes.
+
+Each invalidation also bumps the table's version (table_version()). The
+counters live in this process only - they tell code in this worker whether a
+table changed meanwhile, and are not meant for clients.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_CHANGED_TABLES_KEY = "cache_changed_tables"
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry time-to-live"""
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: str, factory: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        """Return cached value or compute, store and return it"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [k for k in self._data if k.startswith(prefix)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Shared application cache
+cache = TTLCache(maxsize=2048, ttl=600)
+
+# table name -> cache key prefixes to evict when that table changes
+_table_dependencies: Dict[str, Set[str]] = {}
+
+# table name -> number of committed changes seen by this process
+_table_versions: Dict[str, int] = {}
+_versions_lock = threading.Lock()
+
+# Called with the changed tables after a local invalidation (other workers)
+_broadcast_listeners: List[Callable[[Set[str]], None]] = []
+
+
+def depends_on_tables(prefix: str, *tables: str):
+    """Register that cache entries under `prefix` are derived from `tables`"""
+    for table in tables:
+        _table_dependencies.setdefault(table, set()).add(prefix)
+
+
+def table_version(table: str) -> int:
+    """Incremented every time `table` is invalidated"""
+    return _table_versions.get(table, 0)
+
+
+def invalidate_tables(tables: Iterable[str]):
+    """Evict every cache prefix that depends on any of `tables`"""
+    prefixes = set()
+    tables = set(tables)
+    with _versions_lock:
+        for table in tables:
+            _table_versions[table] = _table_versions.get(table, 0) + 1
+    for table in tables:
+        prefixes |= _table_dependencies.get(table, set())
+    for prefix in prefixes:
+        cache.invalidate_prefix(prefix)
+
+
+def invalidate_all():
+    """Drop every entry and bump every known table version (state of other workers unknown)"""
+    with _versions_lock:
+        for table in set(_table_versions) | set(_table_dependencies):
+            _table_versions[table] = _table_versions.get(table, 0) + 1
+    cache.clear()
+
+
+def on_broadcast(listener: Callable[[Set[str]], None]):
+    """Register a listener for changes that other workers should also invalidate"""
+    _broadcast_listeners.append(listener)
+
+
+def broadcast_invalidation(tables: Iterable[str]):
+    """Invalidate `tables` here and tell the broadcast listeners about them"""
+    tables = set(tables)
+    invalidate_tables(tables)
+    # Only tables something is cached from are worth telling other workers about
+    shared = {table for table in tables if table in _table_dependencies}
+    if not shared:
+        return
+    for listener in list(_broadcast_listeners):
+        try:
+            listener(shared)
+        except Exception as e:
+            print(f"Cache invalidation broadcast error: {e}")
+
+
+def _mark_changed(session: Session, table_name: str):
+    session.info.setdefault(_CHANGED_TABLES_KEY, set()).add(table_name)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            _mark_changed(session, table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state):
+    # Query.update()/delete() and insert() statements bypass the unit of work
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None and getattr(table, "name", None):
+            _mark_changed(orm_execute_state.session, table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    changed = session.info.pop(_CHANGED_TABLES_KEY, None)
+    if changed:
+        broadcast_invalidation(changed)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop(_CHANGED_TABLES_KEY, None)
@@ -0,0 +1,240 @@
+"""
+Bounded conversation context for the AI chat.
+
+Every turn is sent with at most CHAT_CONTEXT_MAX_TOKENS of context: the most
+recent messages verbatim, and everything older folded into a rolling summary.
+Older messages are folded in fixed-size blocks, at most MAX_SUMMARY_CALLS per
+request; whatever still doesn't fit is dropped, oldest first.
+
+Chat sessions keep that state server-side (chat_sessions table), so clients
+only send the new message and a session_id. Stateless requests carry their
+own history, which is untrusted: only the most recent
+STATELESS_HISTORY_MESSAGES (and MAX_HISTORY_CHARS) are kept and nothing is
+summarized, so one request can't fan out into many model calls.
+
+Saves are optimistic: a session row carries a version, and save_session only
+writes if it is unchanged since load_session. When two turns of one session
+run at once, the later save loses and append_messages adds its turn after the
+other one, so neither is dropped.
+"""
+import json
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app import ai_service
+from app.config import settings
+from app.database import SessionLocal
+from app.models import ChatSession
+
+# Messages folded into the summary per summarization call
+SUMMARY_BLOCK_SIZE = 4
+
+# Roles a client may put in the history (no system prompts)
+ALLOWED_ROLES = ("user", "assistant")
+
+# Rough per-message overhead of the chat format, in tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Longest single message kept in the context
+MAX_MESSAGE_CHARS = 4000
+
+# Most history messages a client may send with a stateless request
+MAX_HISTORY_MESSAGES = 50
+
+# Total characters of client-sent history kept (most recent first)
+MAX_HISTORY_CHARS = 24000
+
+# Client-sent messages kept for stateless requests; older ones are dropped
+STATELESS_HISTORY_MESSAGES = 12
+
+# Summarization calls allowed per request
+MAX_SUMMARY_CALLS = 1
+
+# Reload-and-append attempts when a concurrent turn keeps winning the save
+APPEND_ATTEMPTS = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return (len(text or "") + 3) // 4
+
+
+def context_tokens(summary: Optional[str], history: List[Dict]) -> int:
+    total = estimate_tokens(summary) if summary else 0
+    for message in history:
+        total += estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+    return total
+
+
+def clean_history(
+    history: Optional[List[Dict]],
+    max_messages: int = STATELESS_HISTORY_MESSAGES,
+    max_chars: int = MAX_HISTORY_CHARS
+) -> List[Dict]:
+    """
+    Keep only well-formed user/assistant turns: the most recent max_messages,
+    and no more than max_chars of content in total
+    """
+    cleaned = []
+    total_chars = 0
+    for message in reversed(history or []):
+        if len(cleaned) >= max_messages:
+            break
+        if not isinstance(message, dict):
+            continue
+        role = message.get("role")
+        content = message.get("content")
+        if role in ALLOWED_ROLES and isinstance(content, str) and content.strip():
+            content = content[:MAX_MESSAGE_CHARS]
+            if total_chars + len(content) > max_chars:
+                break
+            total_chars += len(content)
+            cleaned.append({"role": role, "content": content})
+    cleaned.reverse()
+    return cleaned
+
+
+async def compact_history(
+    history: List[Dict],
+    summary: Optional[str] = None,
+    max_summary_calls: int = MAX_SUMMARY_CALLS
+) -> Tuple[Optional[str], List[Dict], int]:
+    """
+    Fold the oldest messages into the summary until the context fits the
+    budget, with at most max_summary_calls model calls; messages that still
+    don't fit are dropped. Returns (summary, remaining history, number of
+    messages folded or dropped).
+    """
+    budget = settings.CHAT_CONTEXT_MAX_TOKENS
+    keep = settings.CHAT_RECENT_MESSAGES
+    history = list(history)
+    folded = 0
+    calls = 0
+
+    while calls < max_summary_calls and len(history) > keep and context_tokens(summary, history) > budget:
+        size = min(SUMMARY_BLOCK_SIZE, len(history) - keep)
+        block, history = history[:size], history[size:]
+        folded += size
+        calls += 1
+        updated = await ai_service.asummarize_conversation(summary or "", block)
+        if updated:
+            summary = updated
+        # If summarizing fails the block is simply dropped - the turn still goes through
+
+    # Out of summary calls, or recent messages alone exceed the budget (long pastes)
+    while len(history) > 1 and context_tokens(summary, history) > budget:
+        history.pop(0)
+        folded += 1
+
+    return summary, history, folded
+
+
+# ============ Server-side sessions ============
+
+def _expiry_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(hours=settings.CHAT_SESSION_TTL_HOURS)
+
+
+def create_session() -> str:
+    """Start a new chat session and return its id"""
+    session_id = secrets.token_urlsafe(24)
+    db = SessionLocal()
+    try:
+        db.add(ChatSession(session_id=session_id, messages="[]", summarized_count=0))
+        db.commit()
+    finally:
+        db.close()
+    return session_id
+
+
+def load_session(session_id: str) -> Optional[Dict]:
+    """Summary and recent messages of a live session, or None if unknown/expired"""
+    db = SessionLocal()
+    try:
+        row = db.query(ChatSession).filter(
+            ChatSession.session_id == session_id,
+            ChatSession.updated_at >= _expiry_cutoff()
+        ).first()
+        if not row:
+            return None
+        return {
+            "summary": row.summary,
+            "messages": json.loads(row.messages or "[]"),
+            "summarized_count": row.summarized_count or 0,
+            "version": row.version or 0,
+        }
+    finally:
+        db.close()
+
+
+def save_session(
+    session_id: str,
+    summary: Optional[str],
+    messages: List[Dict],
+    summarized_count: int,
+    version: int
+) -> bool:
+    """
+    Store the session state if it is still at `version` (as loaded). Returns
+    False if another turn saved in between, or the session is gone.
+    """
+    db = SessionLocal()
+    try:
+        updated = db.query(ChatSession).filter(
+            ChatSession.session_id == session_id,
+            ChatSession.version == version
+        ).update({
+            ChatSession.summary: summary,
+            ChatSession.messages: json.dumps(messages),
+            ChatSession.summarized_count: summarized_count,
+            ChatSession.version: version + 1,
+            ChatSession.updated_at: datetime.utcnow(),
+        }, synchronize_session=False)
+        db.commit()
+        return updated == 1
+    finally:
+        db.close()
+
+
+def append_messages(session_id: str, messages: List[Dict]) -> bool:
+    """Append messages to the latest stored state (after losing a save to a concurrent turn)"""
+    for _ in range(APPEND_ATTEMPTS):
+        session = load_session(session_id)
+        if session is None:
+            return False
+        if save_session(
+            session_id,
+            session["summary"],
+            session["messages"] + messages,
+            session["summarized_count"],
+            session["version"]
+        ):
+            return True
+    print(f"Chat session {session_id[:8]}: gave up saving a turn after {APPEND_ATTEMPTS} conflicts")
+    return False
+
+
+def delete_session(session_id: str) -> bool:
+    db = SessionLocal()
+    try:
+        deleted = db.query(ChatSession).filter(
+            ChatSession.session_id == session_id
+        ).delete(synchronize_session=False)
+        db.commit()
+        return bool(deleted)
+    finally:
+        db.close()
+
+
+def purge_expired_sessions() -> int:
+    """Delete idle sessions past CHAT_SESSION_TTL_HOURS. Returns rows deleted."""
+    db = SessionLocal()
+    try:
+        deleted = db.query(ChatSession).filter(
+            ChatSession.updated_at < _expiry_cutoff()
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    finally:
+        db.close()
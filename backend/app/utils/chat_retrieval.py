@@ -0,0 +1,346 @@
+"""
+Retrieval index that grounds the chat assistant in real clinic data.
+
+Services, doctors (with their consultation fees), branches and published blog
+articles are kept as short text documents in an in-memory BM25 index. Each chat
+turn retrieves the top-k documents for the user's message and only those
+snippets are added to the prompt.
+
+The index follows database writes incrementally: SQLAlchemy session hooks
+record which rows changed, and after commit those rows are marked stale and
+re-read on the next search. Bulk UPDATE/DELETE statements mark the whole
+document type stale. A full rebuild still happens every REBUILD_SECONDS to
+catch writes made outside the ORM.
+"""
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload
+
+from app.database import SessionLocal
+from app.models import BlogArticle, Branch, Doctor, DoctorConsultationFee, Service, User, UserRole
+from app.utils.related_articles import STOPWORDS
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+# Title terms are counted this many times
+TITLE_WEIGHT = 2
+
+# Longest snippet put into the prompt
+SNIPPET_CHARS = 400
+
+REBUILD_SECONDS = 6 * 60 * 60
+
+_CHANGED_KEY = "retrieval_changed"
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# table name -> document kind
+TABLE_KINDS = {
+    "services": "service",
+    "doctors": "doctor",
+    "doctor_consultation_fees": "doctor",
+    "branches": "branch",
+    "blog_articles": "blog",
+}
+
+
+def _tokenize(text: str) -> List[str]:
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def _json_list(value) -> List[str]:
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return [str(value)]
+    return [str(item) for item in parsed] if isinstance(parsed, list) else [str(parsed)]
+
+
+def _clip(text: str, limit: int = 160) -> str:
+    text = re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", text or "")).strip()
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + "..."
+
+
+# ============ Documents ============
+
+def _service_doc(service: Service) -> Tuple[str, str]:
+    parts = [f"{_clip(service.description)}"]
+    conditions = _json_list(service.conditions_treated)
+    if conditions:
+        parts.append(f"Treats: {', '.join(conditions[:8])}.")
+    parts.append(f"Price: Rs. {service.price} for {service.duration} min.")
+    modes = ["clinic visit"]
+    if service.home_available:
+        modes.append("home visit")
+    if service.video_available:
+        modes.append("video consultation")
+    parts.append(f"Available as: {', '.join(modes)}. Page: /services/{service.slug or service.id}")
+    return f"Service: {service.name}", " ".join(parts)
+
+
+def _doctor_doc(doctor: Doctor) -> Tuple[str, str]:
+    name = doctor.user.full_name if doctor.user else "Doctor"
+    parts = [f"{doctor.specialization}, {doctor.qualification or ''}, {doctor.experience_years or 0} years experience."]
+    expertise = _json_list(doctor.expertise)
+    if expertise:
+        parts.append(f"Expertise: {', '.join(expertise[:6])}.")
+    if doctor.branch:
+        parts.append(f"Branch: {doctor.branch.name}, {doctor.branch.city}.")
+    fees = [
+        f"{fee.consultation_type} {fee.currency or 'INR'} {fee.fee}"
+        for fee in doctor.consultation_fees
+        if fee.is_available
+    ]
+    parts.append(f"Fees: {', '.join(fees)}." if fees else f"Consultation fee: Rs. {doctor.consultation_fee}.")
+    parts.append(f"Profile: /doctors/{doctor.slug or doctor.id}")
+    return f"Doctor: Dr. {name}", " ".join(parts)
+
+
+def _branch_doc(branch: Branch) -> Tuple[str, str]:
+    parts = [f"{branch.address or ''}, {branch.city}, {branch.state} {branch.pincode or ''}."]
+    if branch.business_hours:
+        parts.append(f"Hours: {branch.business_hours}.")
+    if branch.phone:
+        parts.append(f"Phone: {branch.phone}.")
+    if branch.is_headquarters:
+        parts.append("Headquarters.")
+    return f"Branch: {branch.name}", " ".join(parts)
+
+
+def _blog_doc(article: BlogArticle) -> Tuple[str, str]:
+    return f"Article: {article.title}", f"{_clip(article.excerpt or article.content)} Read: /blog/{article.slug}"
+
+
+def _load_documents(db, kind: str, ids: Optional[Set[int]] = None) -> Dict[Tuple[str, int], Tuple[str, str]]:
+    """Current documents of one kind (optionally only some ids)"""
+    if kind == "service":
+        query = db.query(Service).filter(Service.is_active == True)
+        model, build = Service, _service_doc
+    elif kind == "doctor":
+        query = db.query(Doctor).options(
+            joinedload(Doctor.user), joinedload(Doctor.branch), joinedload(Doctor.consultation_fees)
+        ).filter(Doctor.is_available == True)
+        model, build = Doctor, _doctor_doc
+    elif kind == "branch":
+        query = db.query(Branch).filter(Branch.is_active == True)
+        model, build = Branch, _branch_doc
+    else:
+        query = db.query(BlogArticle).filter(BlogArticle.is_published == True)
+        model, build = BlogArticle, _blog_doc
+
+    if ids is not None:
+        query = query.filter(model.id.in_(ids))
+    return {(kind, row.id): build(row) for row in query.all()}
+
+
+# ============ BM25 index ============
+
+class RetrievalIndex:
+    """Incrementally maintained BM25 index over clinic documents"""
+
+    KINDS = ("service", "doctor", "branch", "blog")
+
+    def __init__(self):
+        self._docs: Dict[Tuple[str, int], Tuple[str, str]] = {}
+        self._postings: Dict[str, Dict[Tuple[str, int], int]] = defaultdict(dict)
+        self._lengths: Dict[Tuple[str, int], int] = {}
+        self._total_length = 0
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._pending_rows: Set[Tuple[str, int]] = set()
+        self._pending_kinds: Set[str] = set()
+        self._pending_lock = threading.Lock()
+
+    # --- change tracking ---
+
+    def mark_stale(self, rows: Set[Tuple[str, Optional[int]]]):
+        with self._pending_lock:
+            for kind, row_id in rows:
+                if row_id is None:
+                    self._pending_kinds.add(kind)
+                else:
+                    self._pending_rows.add((kind, row_id))
+
+    def _take_pending(self):
+        with self._pending_lock:
+            rows, kinds = self._pending_rows, self._pending_kinds
+            self._pending_rows, self._pending_kinds = set(), set()
+        return rows, kinds
+
+    # --- index maintenance (caller holds self._lock) ---
+
+    def _add(self, key, doc: Tuple[str, str]):
+        title, body = doc
+        counts = Counter(_tokenize(body))
+        for token in _tokenize(title):
+            counts[token] += TITLE_WEIGHT
+        self._docs[key] = doc
+        for token, tf in counts.items():
+            self._postings[token][key] = tf
+        length = sum(counts.values())
+        self._lengths[key] = length
+        self._total_length += length
+
+    def _remove(self, key):
+        if key not in self._docs:
+            return
+        title, body = self._docs.pop(key)
+        for token in set(_tokenize(title)) | set(_tokenize(body)):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[token]
+        self._total_length -= self._lengths.pop(key, 0)
+
+    def _replace_kind(self, kind: str, docs: Dict):
+        for key in [k for k in self._docs if k[0] == kind]:
+            self._remove(key)
+        for key, doc in docs.items():
+            self._add(key, doc)
+
+    def _refresh(self):
+        rows, kinds = self._take_pending()
+        full = not self._built_at or time.monotonic() - self._built_at > REBUILD_SECONDS
+        if not full and not rows and not kinds:
+            return
+
+        db = SessionLocal()
+        try:
+            if full:
+                for kind in self.KINDS:
+                    self._replace_kind(kind, _load_documents(db, kind))
+                self._built_at = time.monotonic()
+                return
+
+            for kind in kinds:
+                self._replace_kind(kind, _load_documents(db, kind))
+
+            by_kind = defaultdict(set)
+            for kind, row_id in rows:
+                if kind not in kinds:
+                    by_kind[kind].add(row_id)
+            for kind, ids in by_kind.items():
+                fresh = _load_documents(db, kind, ids)
+                for row_id in ids:
+                    self._remove((kind, row_id))
+                    if (kind, row_id) in fresh:
+                        self._add((kind, row_id), fresh[(kind, row_id)])
+        except Exception:
+            # Try again on the next search
+            self.mark_stale(rows | {(kind, None) for kind in kinds})
+            raise
+        finally:
+            db.close()
+
+    # --- queries ---
+
+    def search(self, query: str, k: int = 4) -> List[Dict]:
+        """Top-k documents for a query: [{kind, id, title, text, score}]"""
+        terms = set(_tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            self._refresh()
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+            scores = Counter()
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    norm = K1 * (1 - B + B * self._lengths[key] / avg_length)
+                    scores[key] += idf * tf * (K1 + 1) / (tf + norm)
+            results = []
+            for key, score in scores.most_common(k):
+                title, body = self._docs[key]
+                results.append({
+                    "kind": key[0],
+                    "id": key[1],
+                    "title": title,
+                    "text": body,
+                    "score": round(score, 4),
+                })
+            return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            kinds = Counter(key[0] for key in self._docs)
+            return {"documents": len(self._docs), "terms": len(self._postings), "by_kind": dict(kinds)}
+
+
+def format_snippets(results: List[Dict]) -> List[str]:
+    """Prompt-ready lines for retrieved documents"""
+    snippets = []
+    for result in results:
+        text = f"{result['title']}. {result['text']}"
+        snippets.append(text if len(text) <= SNIPPET_CHARS else text[:SNIPPET_CHARS].rsplit(" ", 1)[0] + "...")
+    return snippets
+
+
+# Singleton instance
+retrieval_index = RetrievalIndex()
+
+
+# ============ Session hooks ============
+
+def _changed_row(obj) -> Optional[Tuple[str, Optional[int]]]:
+    table = getattr(obj, "__table__", None)
+    if table is None:
+        return None
+    if isinstance(obj, DoctorConsultationFee):
+        return ("doctor", obj.doctor_id)
+    if isinstance(obj, User):
+        # Doctor documents include the user's name
+        return ("doctor", None) if obj.role == UserRole.DOCTOR else None
+    kind = TABLE_KINDS.get(table.name)
+    return (kind, obj.id) if kind else None
+
+
+@event.listens_for(Session, "after_flush")
+def _track_changed_rows(session, flush_context):
+    changed = session.info.setdefault(_CHANGED_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        row = _changed_row(obj)
+        if row:
+            changed.add(row)
+            if isinstance(obj, Branch):
+                # Branch names and cities appear in doctor documents too
+                changed.add(("doctor", None))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_changes(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        table = getattr(orm_execute_state.statement, "table", None)
+        kind = TABLE_KINDS.get(getattr(table, "name", None))
+        if kind:
+            orm_execute_state.session.info.setdefault(_CHANGED_KEY, set()).add((kind, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_index_stale(session):
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        retrieval_index.mark_stale(changed)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changed_rows(session, previous_transaction):
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,128 @@
+"""
+Content-addressed storage for server-side uploads.
+
+Admins re-upload the same logos and stock photos many times. Uploads through
+POST /api/uploads/direct are hashed (SHA-256) from their spool file in chunks
+before anything is sent to S3. The key is derived from the hash, the folder
+and the file extension, and the upload_blobs table records each such object.
+A known key returns the existing URL without a transfer, so the URL is always
+in the requested folder with the uploaded extension; a new one is streamed.
+The same content uploaded to two folders is stored once per folder.
+
+ref_count counts the uploads handed that object. Deleting a file through the
+uploads API releases one reference and only removes the object when the last
+one goes.
+"""
+import hashlib
+from datetime import datetime
+from typing import BinaryIO, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import UploadBlob
+from app.s3_service import s3_service
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def hash_fileobj(fileobj: BinaryIO, limit: Optional[int] = None) -> Tuple[str, int]:
+    """(SHA-256 hex digest, size) of a seekable file object, which is rewound afterwards"""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = fileobj.read(HASH_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if limit is not None and size > limit:
+            raise ValueError(f"File too large. Maximum size: {limit / (1024 * 1024):g}MB")
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+
+def _add_reference(db: Session, blob: UploadBlob):
+    db.query(UploadBlob).filter(UploadBlob.id == blob.id).update(
+        {UploadBlob.ref_count: UploadBlob.ref_count + 1, UploadBlob.last_used_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    db.commit()
+
+
+def store_upload(
+    fileobj: BinaryIO,
+    original_filename: str,
+    content_type: str,
+    folder: str = 'misc',
+    max_size: Optional[int] = None
+) -> Tuple[str, bool]:
+    """
+    Upload a file unless identical content is already stored in this folder
+    with the same extension.
+    Returns (file URL, whether an existing object was reused).
+
+    Blocking - call it from a worker thread in async handlers.
+    """
+    sha256, size = hash_fileobj(fileobj, limit=max_size)
+    is_valid, error = s3_service.validate_file(content_type, size)
+    if not is_valid:
+        raise ValueError(error)
+
+    key = s3_service.content_addressed_key(sha256, original_filename, folder)
+    db = SessionLocal()
+    try:
+        blob = db.query(UploadBlob).filter(UploadBlob.key == key).first()
+        if blob:
+            _add_reference(db, blob)
+            return s3_service.get_file_url(blob.key), True
+
+        # Same content always maps to the same key, so two uploads racing here
+        # write identical bytes and the loser just takes a reference below
+        file_url = s3_service.upload_fileobj_streaming(
+            fileobj,
+            original_filename=original_filename,
+            content_type=content_type,
+            folder=folder,
+            max_size=max_size,
+            key=key
+        )
+        db.add(UploadBlob(sha256=sha256, key=key, size=size, content_type=content_type))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            blob = db.query(UploadBlob).filter(UploadBlob.key == key).first()
+            if blob:
+                _add_reference(db, blob)
+                return s3_service.get_file_url(blob.key), True
+        return file_url, False
+    finally:
+        db.close()
+
+
+def release(db: Session, file_url: str) -> Optional[bool]:
+    """
+    Drop one reference to a content-addressed file, deleting the object with
+    the last one. Returns None if the URL isn't a content-addressed upload,
+    otherwise whether the release succeeded.
+    """
+    key = s3_service.get_key_from_url(file_url)
+    if not key:
+        return None
+    blob = db.query(UploadBlob).filter(UploadBlob.key == key).with_for_update().first()
+    if not blob:
+        return None
+
+    if blob.ref_count > 1:
+        blob.ref_count -= 1
+        db.commit()
+        return True
+
+    if not s3_service.delete_file(key):
+        db.rollback()
+        return False
+    db.delete(blob)
+    db.commit()
+    return True
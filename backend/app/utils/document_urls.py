@@ -0,0 +1,98 @@
+"""
+Presigned download URLs for onboarding application documents.
+
+Reviewers open every licence, certificate and photo on an application, and the
+admin list shows a page of applications at once. Rather than one signing call
+per file from the browser, sign_documents() collects every document URL on a
+set of applications and signs their S3 keys in one pass; s3_service reuses
+signed URLs until shortly before they expire.
+"""
+import json
+from typing import Dict, Iterable, List, Optional
+
+from app.models import ClinicOnboardingApplication, DoctorOnboardingApplication
+from app.s3_service import s3_service
+
+# Document URL columns per application model: (attribute, holds a JSON list)
+DOCUMENT_FIELDS = {
+    DoctorOnboardingApplication: (
+        ("profile_image", False),
+        ("license_document_url", False),
+        ("degree_certificate_url", False),
+        ("additional_certifications", True),
+    ),
+    ClinicOnboardingApplication: (
+        ("registration_certificate_url", False),
+        ("gst_certificate_url", False),
+        ("owner_id_proof_url", False),
+        ("insurance_certificate_url", False),
+        ("contract_document_url", False),
+        ("facility_photos_urls", True),
+        ("site_verification_photos", True),
+    ),
+}
+
+# Bounds for the expires_in query parameter (presigned URLs max out at 7 days)
+MIN_EXPIRES_IN = 60
+MAX_EXPIRES_IN = 7 * 24 * 3600
+
+# Applications signed per bulk documents request
+MAX_DOCUMENTS_BATCH = 100
+
+
+def _field_urls(value, is_json_list: bool) -> List[Optional[str]]:
+    if not value:
+        return []
+    if not is_json_list:
+        return [value]
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    return [url if isinstance(url, str) else None for url in parsed] if isinstance(parsed, list) else []
+
+
+def list_documents(application) -> List[Dict]:
+    """Every document URL on an application, with the field (and list index) it came from"""
+    documents = []
+    for attribute, is_json_list in DOCUMENT_FIELDS[type(application)]:
+        for index, url in enumerate(_field_urls(getattr(application, attribute), is_json_list)):
+            if url:
+                documents.append({
+                    "field": attribute,
+                    "index": index if is_json_list else None,
+                    "url": url,
+                })
+    return documents
+
+
+def sign_documents(applications: Iterable, expires_in: int = 3600) -> List[Dict]:
+    """
+    Signed document URLs for each application, in order.
+
+    URLs outside our bucket (or any URL when S3 isn't configured) come back
+    with signed_url None and are used as-is.
+    """
+    applications = list(applications)
+    by_application = [(application, list_documents(application)) for application in applications]
+
+    keys = {}
+    if s3_service.is_configured:
+        for _, documents in by_application:
+            for document in documents:
+                keys[document["url"]] = s3_service.get_key_from_url(document["url"])
+    signed = s3_service.generate_presigned_download_urls(
+        [key for key in keys.values() if key], expires_in
+    ) if any(keys.values()) else {}
+
+    results = []
+    for application, documents in by_application:
+        for document in documents:
+            url, expires_at = signed.get(keys.get(document["url"]), (None, None))
+            document["signed_url"] = url
+            document["expires_at"] = expires_at
+        results.append({
+            "application_id": application.id,
+            "documents": documents,
+        })
+    return results
@@ -0,0 +1,133 @@
+"""
+Image rendering for the variant pipeline (see image_variants).
+
+Kept free of app imports so the process pool's spawned workers start quickly:
+they only need Pillow.
+"""
+import io
+import math
+from typing import Dict, List
+
+# Blurhash components (x, y) and the thumbnail size they are computed from
+BLURHASH_COMPONENTS = (4, 3)
+BLURHASH_SAMPLE_SIZE = 32
+
+
+# ============ Blurhash ============
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def _base83(value: int, length: int) -> str:
+    return "".join(_BASE83[(value // 83 ** (length - i)) % 83] for i in range(1, length + 1))
+
+
+def _srgb_to_linear(value: int) -> float:
+    v = value / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value: float) -> int:
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value: float, exponent: float) -> float:
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def blurhash_encode(pixels: List[tuple], width: int, height: int, components=BLURHASH_COMPONENTS) -> str:
+    """Blurhash of row-major RGB pixels (https://blurha.sh)"""
+    cx, cy = components
+    linear = [tuple(_srgb_to_linear(c) for c in pixel[:3]) for pixel in pixels]
+    cos_x = [[math.cos(math.pi * i * x / width) for x in range(width)] for i in range(cx)]
+    cos_y = [[math.cos(math.pi * j * y / height) for y in range(height)] for j in range(cy)]
+
+    factors = []
+    for j in range(cy):
+        for i in range(cx):
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                for x in range(width):
+                    basis = cos_x[i][x] * cos_y[j][y]
+                    pr, pg, pb = linear[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = (1 if i == 0 and j == 0 else 2) / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((cx - 1) + (cy - 1) * 9, 1)
+    if ac:
+        quantised_max = max(0, min(82, int(max(abs(c) for f in ac for c in f) * 166 - 0.5)))
+        max_value = (quantised_max + 1) / 166
+        result += _base83(quantised_max, 1)
+    else:
+        max_value = 1.0
+        result += _base83(0, 1)
+
+    result += _base83((_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4)
+
+    def quantise(value: float) -> int:
+        return max(0, min(18, int(math.floor(_sign_pow(value / max_value, 0.5) * 9 + 9.5))))
+
+    for r, g, b in ac:
+        result += _base83(quantise(r) * 19 * 19 + quantise(g) * 19 + quantise(b), 2)
+    return result
+
+
+# ============ Rendering (runs in worker processes) ============
+
+def render_variants(data: bytes, widths: List[int], formats: List[str], quality: int) -> Dict:
+    """
+    Decode an image and encode every (width, format) variant.
+    Widths at or above the original are skipped (the original width is used
+    instead if nothing smaller remains). Formats this Pillow build can't write
+    are skipped.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        import pillow_avif  # noqa: F401  (AVIF plugin for Pillow < 11.2)
+    except ImportError:
+        pass
+    Image.init()
+
+    with Image.open(io.BytesIO(data)) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    width, height = image.size
+
+    targets = sorted({w for w in widths if w < width}) or [width]
+    supported = {fmt for fmt in formats if fmt.upper() in Image.SAVE}
+
+    variants = []
+    for target in targets:
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.LANCZOS
+        )
+        for fmt in formats:
+            if fmt not in supported:
+                continue
+            buffer = io.BytesIO()
+            resized.save(buffer, format=fmt.upper(), quality=quality)
+            variants.append({
+                "format": fmt,
+                "width": resized.size[0],
+                "height": resized.size[1],
+                "data": buffer.getvalue(),
+            })
+
+    sample = image.convert("RGB")
+    sample.thumbnail((BLURHASH_SAMPLE_SIZE, BLURHASH_SAMPLE_SIZE))
+    return {
+        "width": width,
+        "height": height,
+        "blurhash": blurhash_encode(list(sample.getdata()), sample.size[0], sample.size[1]),
+        "variants": variants,
+    }
@@ -0,0 +1,279 @@
+"""
+Resized WebP/AVIF variants and blurhash placeholders for uploaded photos.
+
+Doctor profile images, blog featured images and clinic facility photos are
+uploaded at full resolution. For each one we store smaller copies at
+IMAGE_VARIANT_WIDTHS in IMAGE_VARIANT_FORMATS under derived keys
+
+    variants/<original key without extension>/<width>w.<format>
+
+plus a blurhash string the frontend can paint while the image loads. The
+results are recorded in the image_assets table, keyed by the original's S3 key,
+and public responses attach them via lookup().
+
+Decoding and encoding (image_render) are CPU-bound, so they run in a process
+pool; the S3 transfers around them run in the background job that requested
+the variants.
+
+Variants are requested when a file is uploaded through the server and when an
+image URL is saved on a doctor, blog article or clinic application (session
+hooks below), so presigned browser uploads are covered too.
+"""
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import BlogArticle, ClinicOnboardingApplication, Doctor, ImageAsset
+from app.s3_service import s3_service
+from app.utils.image_render import render_variants
+from app.utils.jobs import JobContext, job_handler, job_runner
+
+VARIANT_PREFIX = "variants/"
+
+IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "webp", "gif"}
+
+CONTENT_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+
+# Longest a job waits for the process pool to render one image
+RENDER_TIMEOUT_SECONDS = 120
+
+_CHANGED_KEY = "image_urls_changed"
+
+# Image URL columns that get variants: model -> (attribute, holds a JSON list)
+IMAGE_FIELDS = {
+    Doctor: ("profile_image", False),
+    BlogArticle: ("image", False),
+    ClinicOnboardingApplication: ("facility_photos_urls", True),
+}
+
+
+def _setting_list(value: str) -> List[str]:
+    return [item.strip().lower() for item in value.split(",") if item.strip()]
+
+
+def variant_key(source_key: str, width: int, fmt: str) -> str:
+    stem = source_key.rsplit(".", 1)[0]
+    return f"{VARIANT_PREFIX}{stem}/{width}w.{fmt}"
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned, not forked: the app process has threads and open connections
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def shutdown():
+    """Stop the render processes (app shutdown)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ============ Generating and recording variants ============
+
+def is_image_key(key: Optional[str]) -> bool:
+    return bool(key) and not key.startswith(VARIANT_PREFIX) and key.rsplit(".", 1)[-1].lower() in IMAGE_EXTENSIONS
+
+
+def generate_variants(db: Session, source_key: str) -> Dict:
+    """Download an original, render its variants, upload them and record the asset"""
+    original = s3_service.client.get_object(Bucket=settings.S3_BUCKET_NAME, Key=source_key)
+    data = original["Body"].read()
+
+    future = _get_executor().submit(
+        render_variants,
+        data,
+        [int(w) for w in _setting_list(settings.IMAGE_VARIANT_WIDTHS)],
+        _setting_list(settings.IMAGE_VARIANT_FORMATS),
+        settings.IMAGE_VARIANT_QUALITY
+    )
+    rendered = future.result(timeout=RENDER_TIMEOUT_SECONDS)
+
+    stored = []
+    for variant in rendered["variants"]:
+        key = variant_key(source_key, variant["width"], variant["format"])
+        s3_service.client.put_object(
+            Bucket=settings.S3_BUCKET_NAME,
+            Key=key,
+            Body=variant["data"],
+            ContentType=CONTENT_TYPES[variant["format"]],
+            CacheControl='public, max-age=31536000',  # 1 year cache
+        )
+        stored.append({k: variant[k] for k in ("format", "width", "height")} | {"key": key})
+
+    asset = db.query(ImageAsset).filter(ImageAsset.source_key == source_key).first()
+    if not asset:
+        asset = ImageAsset(source_key=source_key)
+        db.add(asset)
+    asset.width = rendered["width"]
+    asset.height = rendered["height"]
+    asset.blurhash = rendered["blurhash"]
+    asset.variants = json.dumps(stored)
+    asset.status = "ready"
+    asset.error = None
+    db.commit()
+    return {"source_key": source_key, "variants": len(stored), "blurhash": rendered["blurhash"]}
+
+
+@job_handler("images.variants")
+def image_variants_job(job: JobContext, source_key: str):
+    job.progress(10, "Rendering image variants")
+    try:
+        return generate_variants(job.db, source_key)
+    except Exception as e:
+        job.db.rollback()
+        job.db.query(ImageAsset).filter(ImageAsset.source_key == source_key).update(
+            {ImageAsset.status: "failed", ImageAsset.error: str(e)[:500]},
+            synchronize_session=False
+        )
+        job.db.commit()
+        raise
+
+
+def queue_variants(urls: Iterable[str], force: bool = False) -> List[str]:
+    """
+    Queue variant generation for image URLs that don't have variants yet.
+    Returns the job ids submitted.
+    """
+    if not s3_service.is_configured:
+        return []
+
+    keys = {s3_service.get_key_from_url(url) for url in urls if url}
+    keys = {key for key in keys if is_image_key(key)}
+    if not keys:
+        return []
+
+    # Pending rows older than this belong to jobs that never finished
+    stale_before = datetime.utcnow() - timedelta(minutes=settings.JOB_STALE_MINUTES)
+    job_ids = []
+    db = SessionLocal()
+    try:
+        existing = {
+            asset.source_key: asset
+            for asset in db.query(ImageAsset).filter(ImageAsset.source_key.in_(keys)).all()
+        }
+        for key in sorted(keys):
+            asset = existing.get(key)
+            if asset and not force and (
+                asset.status == "ready"
+                or (asset.status == "pending" and asset.updated_at and asset.updated_at > stale_before)
+            ):
+                continue
+            if asset:
+                asset.status = "pending"
+            else:
+                db.add(ImageAsset(source_key=key, status="pending"))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker queued the same image first
+                db.rollback()
+                continue
+            job_ids.append(job_runner.submit("images.variants", {"source_key": key}))
+    finally:
+        db.close()
+    return job_ids
+
+
+def serialize_asset(asset: ImageAsset) -> Dict:
+    """Variant URLs, srcset strings and placeholder for an image"""
+    variants = []
+    for variant in json.loads(asset.variants or "[]"):
+        variants.append({
+            "format": variant["format"],
+            "width": variant["width"],
+            "height": variant["height"],
+            "url": s3_service.get_file_url(variant["key"]),
+        })
+    srcset = {}
+    for fmt in {v["format"] for v in variants}:
+        srcset[fmt] = ", ".join(
+            f"{v['url']} {v['width']}w" for v in sorted(variants, key=lambda v: v["width"]) if v["format"] == fmt
+        )
+    return {
+        "width": asset.width,
+        "height": asset.height,
+        "blurhash": asset.blurhash,
+        "srcset": srcset,
+        "variants": variants,
+    }
+
+
+def lookup(db: Session, urls: Iterable[Optional[str]]) -> Dict[str, Dict]:
+    """{image url: serialized variants} for the URLs whose variants are ready"""
+    by_key = {}
+    for url in urls:
+        key = s3_service.get_key_from_url(url) if url else None
+        if is_image_key(key):
+            by_key[key] = url
+    if not by_key:
+        return {}
+    assets = db.query(ImageAsset).filter(
+        ImageAsset.source_key.in_(list(by_key)),
+        ImageAsset.status == "ready"
+    ).all()
+    return {by_key[asset.source_key]: serialize_asset(asset) for asset in assets}
+
+
+# ============ Session hooks ============
+
+def _field_urls(value, is_json_list: bool) -> List[str]:
+    if not value:
+        return []
+    if not is_json_list:
+        return [value]
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    return [url for url in parsed if isinstance(url, str)] if isinstance(parsed, list) else []
+
+
+@event.listens_for(Session, "after_flush")
+def _track_image_urls(session, flush_context):
+    for obj in list(session.new) + list(session.dirty):
+        field = IMAGE_FIELDS.get(type(obj))
+        if not field:
+            continue
+        attribute, is_json_list = field
+        history = inspect(obj).attrs[attribute].history
+        if history.added:
+            urls = session.info.setdefault(_CHANGED_KEY, set())
+            for value in history.added:
+                urls.update(_field_urls(value, is_json_list))
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_changed_images(session):
+    urls = session.info.pop(_CHANGED_KEY, None)
+    if urls:
+        try:
+            queue_variants(urls)
+        except Exception as e:
+            print(f"Image variant queue error: {e}")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_image_urls(session, previous_transaction):
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,178 @@
+"""
+Cross-worker cache invalidation.
+
+Each uvicorn worker has its own in-process cache (app.utils.cache). When an
+admin write commits, the cache evicts the affected prefixes in that worker and
+hands the changed tables to this bus, which tells the other workers:
+
+- PostgresBus: NOTIFY on CACHE_INVALIDATION_CHANNEL with
+  {"origin": worker, "tables": [...]}; every worker keeps a connection
+  LISTENing on the channel in a background thread and evicts the same
+  prefixes. After the listener reconnects, notifications may have been
+  missed, so it drops the whole cache.
+- MemoryBus: delivers to subscribers in this process. Used for SQLite, a
+  single worker, and tests.
+
+Messages from this worker are ignored on receipt - it has already invalidated.
+"""
+import json
+import os
+import select
+import socket
+import threading
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+from app.utils.cache import invalidate_all, invalidate_tables, on_broadcast
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# How long the listener blocks waiting for a notification before checking for shutdown
+LISTEN_POLL_SECONDS = 5
+
+# Wait before reconnecting after the listener connection fails
+RECONNECT_DELAY_SECONDS = 2
+MAX_RECONNECT_DELAY_SECONDS = 60
+
+
+def _apply(message: Dict):
+    """Evict what another worker changed; "tables": None means everything"""
+    if message.get("origin") == WORKER_ID:
+        return
+    tables = message.get("tables")
+    if tables is None:
+        invalidate_all()
+    else:
+        invalidate_tables(tables)
+
+
+class MemoryBus:
+    """In-process bus (tests, SQLite, single worker)"""
+
+    def __init__(self):
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self.published = 0
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        self._subscribers.append(callback)
+
+    def publish(self, tables: Set[str]):
+        self.published += 1
+        message = {"origin": WORKER_ID, "tables": sorted(tables)}
+        for callback in list(self._subscribers):
+            callback(message)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class PostgresBus:
+    """LISTEN/NOTIFY on a Postgres channel"""
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.published = 0
+        self.received = 0
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        self._subscribers.append(callback)
+
+    def publish(self, tables: Set[str]):
+        payload = json.dumps({"origin": WORKER_ID, "tables": sorted(tables)})
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("SELECT pg_notify(:channel, :payload)"), {
+                    "channel": self.channel,
+                    "payload": payload,
+                })
+            self.published += 1
+        except Exception as e:
+            print(f"Cache invalidation publish error: {e}")
+
+    def _deliver(self, message: Dict):
+        self.received += 1
+        for callback in list(self._subscribers):
+            try:
+                callback(message)
+            except Exception as e:
+                print(f"Cache invalidation handler error: {e}")
+
+    def _listen_once(self, first: bool):
+        # A connection of its own, outside the pool, so LISTEN never leaks into requests
+        proxied = engine.raw_connection()
+        proxied.detach()
+        conn = proxied.driver_connection
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            if not first:
+                self._deliver({"origin": None, "tables": None})
+            print(f"🔔 Listening for cache invalidations on '{self.channel}'")
+
+            while not self._stop.is_set():
+                if select.select([conn], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        message = json.loads(notify.payload)
+                    except ValueError:
+                        continue
+                    self._deliver(message)
+        finally:
+            proxied.close()
+
+    def _run(self):
+        delay = RECONNECT_DELAY_SECONDS
+        first = True
+        while not self._stop.is_set():
+            try:
+                self._listen_once(first)
+                delay = RECONNECT_DELAY_SECONDS
+            except Exception as e:
+                print(f"Cache invalidation listener error: {e}")
+                self._stop.wait(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+            first = False
+
+    def start(self):
+        """Start the background listener"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=LISTEN_POLL_SECONDS + 1)
+            self._thread = None
+
+
+def create_bus():
+    kind = settings.CACHE_INVALIDATION_BUS
+    if kind == "auto":
+        kind = "postgres" if engine.dialect.name == "postgresql" else "memory"
+    if kind == "postgres":
+        return PostgresBus(settings.CACHE_INVALIDATION_CHANNEL)
+    if kind == "memory":
+        return MemoryBus()
+    raise ValueError(f"Unknown CACHE_INVALIDATION_BUS '{settings.CACHE_INVALIDATION_BUS}'")
+
+
+# Singleton instance
+invalidation_bus = create_bus()
+invalidation_bus.subscribe(_apply)
+on_broadcast(invalidation_bus.publish)
@@ -0,0 +1,238 @@
+"""
+Background job runner for long AI tasks.
+
+Endpoints that would otherwise block on a model call submit a job instead and
+return its job_id straight away; clients poll GET /api/jobs/{job_id} for
+progress and the result.
+
+Jobs are rows in the background_jobs table (so any worker process can answer a
+status poll) and run on a per-process thread pool capped at
+JOB_MAX_CONCURRENCY. Handlers are registered by name:
+
+    @job_handler("onboarding.ai_verification")
+    def ai_verification_job(job: JobContext, application_id: int, admin_id: int):
+        job.progress(10, "Checking credentials")
+        ...
+        return {"score": 87}     # JSON-serializable result
+
+Each job gets its own database session (job.db). While a job is queued or
+running, its worker refreshes the row's updated_at every JOB_HEARTBEAT_SECONDS,
+so recover_stale_jobs() only fails jobs whose worker has actually stopped.
+"""
+import json
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import BackgroundJob
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+_handlers: Dict[str, Callable] = {}
+
+
+def job_handler(job_type: str):
+    """Register a function as the handler for `job_type`"""
+    def decorator(func):
+        _handlers[job_type] = func
+        return func
+    return decorator
+
+
+def _worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _update(job_id: str, fields: Dict):
+    """Write job fields in a short session of its own (also bumps the heartbeat)"""
+    db = SessionLocal()
+    try:
+        db.query(BackgroundJob).filter(BackgroundJob.job_id == job_id).update(
+            {**fields, BackgroundJob.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+class JobContext:
+    """Handed to job handlers: a database session and progress reporting"""
+
+    def __init__(self, job_id: str, db):
+        self.job_id = job_id
+        self.db = db
+
+    def progress(self, percent: int, message: Optional[str] = None):
+        fields = {BackgroundJob.progress: max(0, min(100, int(percent)))}
+        if message is not None:
+            fields[BackgroundJob.message] = message[:500]
+        try:
+            _update(self.job_id, fields)
+        except Exception as e:
+            print(f"Job progress update error: {e}")
+
+
+class JobRunner:
+    """Thread pool executing submitted jobs"""
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Jobs of this process that are queued or running (heartbeat targets)
+        self._active: Set[str] = set()
+        self._active_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+                self._stop.clear()
+                self._heartbeat_thread = threading.Thread(
+                    target=self._heartbeat, name="job-heartbeat", daemon=True
+                )
+                self._heartbeat_thread.start()
+            return self._executor
+
+    def _heartbeat(self):
+        """Keep updated_at fresh on this process's queued and running jobs"""
+        while not self._stop.wait(settings.JOB_HEARTBEAT_SECONDS):
+            with self._active_lock:
+                job_ids = list(self._active)
+            if not job_ids:
+                continue
+            db = SessionLocal()
+            try:
+                db.query(BackgroundJob).filter(
+                    BackgroundJob.job_id.in_(job_ids),
+                    BackgroundJob.status.in_([JOB_QUEUED, JOB_RUNNING])
+                ).update({BackgroundJob.updated_at: datetime.utcnow()}, synchronize_session=False)
+                db.commit()
+            except Exception as e:
+                print(f"Job heartbeat error: {e}")
+            finally:
+                db.close()
+
+    def submit(self, job_type: str, params: Dict[str, Any], created_by: Optional[int] = None) -> str:
+        """Persist a job and queue it. Returns the job_id."""
+        if job_type not in _handlers:
+            raise ValueError(f"No handler registered for job type '{job_type}'")
+
+        job_id = str(uuid.uuid4())
+        db = SessionLocal()
+        try:
+            db.add(BackgroundJob(
+                job_id=job_id,
+                job_type=job_type,
+                status=JOB_QUEUED,
+                params=json.dumps(params),
+                worker=_worker_name(),
+                created_by=created_by
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+        with self._active_lock:
+            self._active.add(job_id)
+        self._get_executor().submit(self._run, job_id, job_type, params)
+        return job_id
+
+    def _run(self, job_id: str, job_type: str, params: Dict[str, Any]):
+        _update(job_id, {
+            BackgroundJob.status: JOB_RUNNING,
+            BackgroundJob.started_at: datetime.utcnow(),
+        })
+
+        db = SessionLocal()
+        try:
+            result = _handlers[job_type](JobContext(job_id, db), **params)
+            _update(job_id, {
+                BackgroundJob.status: JOB_SUCCEEDED,
+                BackgroundJob.progress: 100,
+                BackgroundJob.result: json.dumps(result, default=str),
+                BackgroundJob.finished_at: datetime.utcnow(),
+            })
+        except Exception as e:
+            db.rollback()
+            # HTTPException raised by shared endpoint code carries a readable detail
+            error = getattr(e, "detail", None) or str(e) or e.__class__.__name__
+            print(f"Job {job_type} ({job_id}) failed: {error}")
+            _update(job_id, {
+                BackgroundJob.status: JOB_FAILED,
+                BackgroundJob.error: str(error),
+                BackgroundJob.finished_at: datetime.utcnow(),
+            })
+        finally:
+            db.close()
+            with self._active_lock:
+                self._active.discard(job_id)
+
+    def recover_stale_jobs(self) -> int:
+        """
+        Fail jobs whose worker died: queued or running, not in this process,
+        and no heartbeat for JOB_STALE_MINUTES
+        """
+        cutoff = datetime.utcnow() - timedelta(minutes=settings.JOB_STALE_MINUTES)
+        with self._active_lock:
+            own_jobs = list(self._active)
+        db = SessionLocal()
+        try:
+            query = db.query(BackgroundJob).filter(
+                BackgroundJob.status.in_([JOB_QUEUED, JOB_RUNNING]),
+                BackgroundJob.updated_at < cutoff
+            )
+            if own_jobs:
+                query = query.filter(BackgroundJob.job_id.notin_(own_jobs))
+            failed = query.update({
+                BackgroundJob.status: JOB_FAILED,
+                BackgroundJob.error: "Interrupted: the worker running this job stopped",
+                BackgroundJob.finished_at: datetime.utcnow(),
+            }, synchronize_session=False)
+            db.commit()
+            return failed
+        finally:
+            db.close()
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait)
+        self._stop.set()
+
+
+def serialize_job(job: BackgroundJob) -> Dict[str, Any]:
+    return {
+        "job_id": job.job_id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "progress": job.progress or 0,
+        "message": job.message,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def submitted_response(job_id: str) -> Dict[str, str]:
+    """Body for endpoints called with background=true"""
+    return {"job_id": job_id, "status": JOB_QUEUED, "status_url": f"/api/jobs/{job_id}"}
+
+
+# Singleton instance
+job_runner = JobRunner(max_workers=settings.JOB_MAX_CONCURRENCY)
@@ -0,0 +1,92 @@
+"""
+Render-on-write pipeline for blog article markdown.
+
+Articles are rendered once when they are saved: markdown -> sanitized HTML,
+a heading table of contents and a reading-time estimate. The results are
+stored next to the markdown source so clients, SSR and feeds never have to
+parse markdown themselves.
+"""
+import json
+import math
+import re
+from datetime import datetime
+from typing import Dict, List
+
+import bleach
+import markdown
+
+WORDS_PER_MINUTE = 200
+
+ALLOWED_TAGS = [
+    "p", "br", "hr", "h1", "h2", "h3", "h4", "h5", "h6",
+    "strong", "em", "b", "i", "u", "s", "blockquote", "code", "pre",
+    "ul", "ol", "li", "dl", "dt", "dd",
+    "table", "thead", "tbody", "tr", "th", "td",
+    "a", "img", "span", "div", "sup", "sub",
+]
+
+ALLOWED_ATTRIBUTES = {
+    "*": ["id", "class"],
+    "a": ["href", "title", "rel", "target"],
+    "img": ["src", "alt", "title", "width", "height", "loading"],
+    "th": ["align"],
+    "td": ["align"],
+}
+
+ALLOWED_PROTOCOLS = ["http", "https", "mailto", "tel"]
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _flatten_toc(tokens: List[Dict]) -> List[Dict]:
+    """Flatten markdown's nested toc_tokens into [{level, id, text}]"""
+    flat = []
+    for token in tokens:
+        flat.append({"level": token["level"], "id": token["id"], "text": token["name"]})
+        flat.extend(_flatten_toc(token.get("children", [])))
+    return flat
+
+
+def count_words(content: str) -> int:
+    """Approximate word count of markdown/HTML content"""
+    if not content:
+        return 0
+    return len(_TAG_RE.sub(" ", content).split())
+
+
+def render_markdown(content: str) -> Dict:
+    """
+    Render markdown (raw HTML blocks are allowed, then sanitized).
+    Returns: {"html", "toc", "word_count", "reading_minutes"}
+    """
+    md = markdown.Markdown(extensions=["extra", "sane_lists", "toc"])
+    raw_html = md.convert(content or "")
+    html = bleach.clean(
+        raw_html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True
+    )
+    word_count = count_words(content)
+    return {
+        "html": html,
+        "toc": _flatten_toc(getattr(md, "toc_tokens", [])),
+        "word_count": word_count,
+        "reading_minutes": max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+    }
+
+
+def apply_rendered_content(article, keep_read_time: bool = False) -> None:
+    """
+    Render a BlogArticle's content and store the results on the instance.
+    read_time follows the content, unless keep_read_time (an admin set it in
+    the same write).
+    """
+    rendered = render_markdown(article.content)
+    article.content_html = rendered["html"]
+    article.content_toc = json.dumps(rendered["toc"])
+    article.reading_minutes = rendered["reading_minutes"]
+    article.rendered_at = datetime.utcnow()
+    if not (keep_read_time and article.read_time):
+        article.read_time = f"{rendered['reading_minutes']} min read"
@@ -0,0 +1,128 @@
+"""
+Near-duplicate detection for generated blog content.
+
+Articles are reduced to MinHash signatures over word shingles (overlapping
+5-word windows). The fraction of equal signature slots estimates the Jaccard
+similarity of the shingle sets, and LSH banding finds candidate pairs without
+comparing every article against every other one.
+
+Signatures of stored articles are memoised per article id and content hash, so
+only new or edited articles are re-hashed between batches.
+"""
+import hashlib
+import random
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import BlogArticle
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 similarity almost always collide
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures are comparable across processes and restarts
+_rng = random.Random(1337)
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# article id -> (content digest, signature)
+_signature_cache: Dict[int, Tuple[str, List[int]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _shingles(text: str) -> Set[int]:
+    words = _WORD_RE.findall(_TAG_RE.sub(" ", (text or "").lower()))
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    return {
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big")
+        for shingle in shingles
+    }
+
+
+def minhash_signature(text: str) -> List[int]:
+    """MinHash signature of a text's word shingles"""
+    shingles = _shingles(text)
+    if not shingles:
+        return [_MAX_HASH] * NUM_PERMUTATIONS
+    return [
+        min(((a * s + b) % _MERSENNE_PRIME) & _MAX_HASH for s in shingles)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimated Jaccard similarity of the two shingle sets"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERMUTATIONS
+
+
+def _bands(signature: List[int]):
+    for band in range(BANDS):
+        start = band * ROWS_PER_BAND
+        yield band, tuple(signature[start:start + ROWS_PER_BAND])
+
+
+class NearDuplicateIndex:
+    """LSH index of signatures; add() candidates as they are accepted"""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._buckets: Dict[Tuple[int, tuple], List[str]] = defaultdict(list)
+        self._signatures: Dict[str, List[int]] = {}
+
+    def add(self, key: str, signature: List[int]):
+        self._signatures[key] = signature
+        for band in _bands(signature):
+            self._buckets[band].append(key)
+
+    def find(self, signature: List[int]) -> Optional[Tuple[str, float]]:
+        """(key, similarity) of the closest stored item above the threshold, if any"""
+        candidates = set()
+        for band in _bands(signature):
+            candidates.update(self._buckets.get(band, ()))
+        best = None
+        for key in candidates:
+            similarity = estimate_similarity(signature, self._signatures[key])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+
+def build_article_index(db: Session, threshold: float) -> NearDuplicateIndex:
+    """Index every stored article (published or draft), keyed by slug"""
+    index = NearDuplicateIndex(threshold)
+    seen = set()
+    for article_id, slug, content in db.query(BlogArticle.id, BlogArticle.slug, BlogArticle.content).all():
+        digest = hashlib.blake2b((content or "").encode("utf-8"), digest_size=16).hexdigest()
+        with _cache_lock:
+            cached = _signature_cache.get(article_id)
+        if cached and cached[0] == digest:
+            signature = cached[1]
+        else:
+            signature = minhash_signature(content)
+            with _cache_lock:
+                _signature_cache[article_id] = (digest, signature)
+        index.add(slug, signature)
+        seen.add(article_id)
+
+    # Forget deleted articles
+    with _cache_lock:
+        for article_id in list(_signature_cache):
+            if article_id not in seen:
+                del _signature_cache[article_id]
+    return index
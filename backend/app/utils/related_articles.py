@@ -0,0 +1,201 @@
+"""
+Content-similarity engine for related blog articles.
+
+Each published article is turned into a TF-IDF vector over its title, tags and
+content (title and tag terms are weighted up). The top-K most similar articles
+are stored in the blog_related_articles table so the public related-articles
+endpoint is a single indexed read.
+
+The table is always recomputed in full: IDF weights depend on every published
+article, so one edit can reorder any article's list. Article writes call
+schedule_rebuild(), which queues a "blog.related_articles" background job
+instead of recomputing inside the request; writes that arrive while a rebuild
+is still queued share it. A deleted article's rows are dropped immediately
+(remove_article) and the queued rebuild refills the shortened lists.
+rebuild_all_related_articles() is also used by the backfill script.
+"""
+import json
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models import BlogArticle, BlogRelatedArticle
+from app.utils.jobs import JobContext, job_handler, job_runner
+
+# Number of neighbours stored per article
+TOP_K = 6
+
+# Relative weight of title and tag terms compared to body terms
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 4
+
+REBUILD_JOB = "blog.related_articles"
+
+# Set while a rebuild job is queued but not started yet
+_rebuild_queued = False
+_rebuild_lock = threading.Lock()
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during each
+few for from further had has have having he her here hers herself him himself his how
+i if in into is it its itself just let me more most my myself no nor not now of off on
+once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too
+under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves may might must one two get can't don't it's
+novacare physiotherapy physiotherapist physio
+""".split())
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercase, strip HTML/markdown and return meaningful word tokens"""
+    if not text:
+        return []
+    text = _TAG_RE.sub(" ", text.lower())
+    return [t for t in _TOKEN_RE.findall(text) if len(t) > 2 and t not in STOPWORDS]
+
+
+def _parse_tags(tags: str) -> List[str]:
+    if not tags:
+        return []
+    try:
+        parsed = json.loads(tags)
+    except (TypeError, ValueError):
+        return []
+    return [str(t).lower().strip() for t in parsed if t]
+
+
+def _term_counts(title: str, tags: str, content: str) -> Counter:
+    """Weighted term frequencies for one article"""
+    counts = Counter(_tokenize(content))
+    for token in _tokenize(title):
+        counts[token] += TITLE_WEIGHT
+    for tag in _parse_tags(tags):
+        # Whole tag as a phrase feature plus its individual words
+        counts[f"tag:{tag}"] += TAG_WEIGHT
+        for token in _tokenize(tag):
+            counts[token] += TAG_WEIGHT
+    return counts
+
+
+def _build_vectors(rows) -> Dict[int, Dict[str, float]]:
+    """Build L2-normalised TF-IDF vectors keyed by article id"""
+    term_counts = {row.id: _term_counts(row.title, row.tags, row.content) for row in rows}
+
+    doc_freq = Counter()
+    for counts in term_counts.values():
+        doc_freq.update(counts.keys())
+
+    n_docs = len(term_counts)
+    vectors = {}
+    for article_id, counts in term_counts.items():
+        vector = {}
+        for term, tf in counts.items():
+            idf = math.log((1 + n_docs) / (1 + doc_freq[term])) + 1
+            vector[term] = (1 + math.log(tf)) * idf
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        vectors[article_id] = {term: w / norm for term, w in vector.items()}
+    return vectors
+
+
+def _cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(term, 0.0) for term, w in a.items())
+
+
+def _top_k(candidates: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
+    """Highest scores first, ties broken by newer (higher) id"""
+    ranked = sorted(
+        (c for c in candidates if c[1] > 0),
+        key=lambda c: (c[1], c[0]),
+        reverse=True
+    )
+    return ranked[:TOP_K]
+
+
+def _load_published(db: Session):
+    return db.query(
+        BlogArticle.id, BlogArticle.title, BlogArticle.tags, BlogArticle.content
+    ).filter(BlogArticle.is_published == True).all()
+
+
+def _replace_neighbours(db: Session, article_id: int, neighbours: List[Tuple[int, float]]):
+    db.query(BlogRelatedArticle).filter(
+        BlogRelatedArticle.article_id == article_id
+    ).delete(synchronize_session=False)
+    for rank, (related_id, score) in enumerate(neighbours, start=1):
+        db.add(BlogRelatedArticle(
+            article_id=article_id,
+            related_article_id=related_id,
+            score=round(score, 6),
+            rank=rank
+        ))
+
+
+def remove_article(db: Session, article_id: int):
+    """Drop an article from the neighbour table (unpublished or deleted). Does not commit."""
+    db.query(BlogRelatedArticle).filter(
+        (BlogRelatedArticle.article_id == article_id) |
+        (BlogRelatedArticle.related_article_id == article_id)
+    ).delete(synchronize_session=False)
+
+
+def rebuild_all_related_articles(db: Session) -> int:
+    """Recompute the whole neighbour table. Returns number of articles indexed."""
+    if db.bind.dialect.name == "postgresql":
+        # One rebuild at a time across workers; plain reads are not blocked
+        db.execute(text("LOCK TABLE blog_related_articles IN EXCLUSIVE MODE"))
+    rows = _load_published(db)
+    vectors = _build_vectors(rows)
+
+    db.query(BlogRelatedArticle).delete(synchronize_session=False)
+    ids = list(vectors.keys())
+    for article_id in ids:
+        target = vectors[article_id]
+        candidates = [
+            (other_id, _cosine(target, vectors[other_id]))
+            for other_id in ids if other_id != article_id
+        ]
+        _replace_neighbours(db, article_id, _top_k(candidates))
+
+    db.commit()
+    return len(ids)
+
+
+def schedule_rebuild() -> Optional[str]:
+    """
+    Queue a full rebuild after an article write, unless one is already waiting
+    to start. Returns the job_id of a newly queued job.
+    """
+    global _rebuild_queued
+    with _rebuild_lock:
+        if _rebuild_queued:
+            return None
+        _rebuild_queued = True
+    try:
+        return job_runner.submit(REBUILD_JOB, {})
+    except Exception as e:
+        with _rebuild_lock:
+            _rebuild_queued = False
+        print(f"Related articles rebuild error: {e}")
+        return None
+
+
+@job_handler(REBUILD_JOB)
+def rebuild_related_articles_job(job: JobContext):
+    global _rebuild_queued
+    # Writes from here on need another rebuild - this one may already have read them
+    with _rebuild_lock:
+        _rebuild_queued = False
+    job.progress(10, "Computing related articles")
+    return {"indexed": rebuild_all_related_articles(job.db)}
@@ -0,0 +1,241 @@
+"""
+Garbage collection of orphaned objects in the uploads bucket.
+
+Replacing a doctor photo, a blog image or an onboarding document leaves the
+old object behind, and so does deleting the row. collect_garbage() finds
+objects nothing points at any more and deletes them:
+
+1. Build the set of referenced keys from every URL column (REFERENCE_COLUMNS),
+   JSON URL lists, and URLs embedded in blog content and site settings. Keys
+   are stored as 8-byte digests so the set stays small for large tables; a
+   digest collision can only keep an object, never delete one.
+2. Page through the bucket listing (only our upload folders and variants/).
+   An object is referenced if its key is, or - for variants/<stem>/... - if
+   the original it was rendered from is.
+3. Objects that are unreferenced and older than the grace period (presigned
+   uploads are only saved on a record after the browser finishes) are kept
+   if a deduplicated upload was handed them within the grace period too (the
+   object itself may be old - upload_blobs.last_used_at); the rest are
+   deleted with delete_objects, S3_GC_DELETE_BATCH keys per call, and their
+   image_assets / upload_blobs rows removed.
+
+With dry_run nothing is deleted and the report lists what would be.
+"""
+import hashlib
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import (
+    BlogArticle, ClinicOnboardingApplication, Doctor, DoctorOnboardingApplication,
+    DoctorReview, ImageAsset, Service, SiteSetting, Testimonial, TrainingModule, UploadBlob
+)
+from app.s3_service import s3_service
+from app.utils.image_variants import VARIANT_PREFIX
+from app.utils.jobs import JobContext, job_handler
+
+# Columns holding file URLs: (model, attribute, kind)
+#   "url"  - a single URL
+#   "json" - a JSON array of URLs
+#   "text" - free text that may embed URLs (markdown, HTML, setting values)
+REFERENCE_COLUMNS = [
+    (Doctor, "profile_image", "url"),
+    (DoctorReview, "patient_image", "url"),
+    (Service, "image", "url"),
+    (Testimonial, "image_url", "url"),
+    (TrainingModule, "video_url", "url"),
+    (BlogArticle, "image", "url"),
+    (BlogArticle, "content", "text"),
+    (BlogArticle, "content_html", "text"),
+    (SiteSetting, "value", "text"),
+    (DoctorOnboardingApplication, "profile_image", "url"),
+    (DoctorOnboardingApplication, "license_document_url", "url"),
+    (DoctorOnboardingApplication, "degree_certificate_url", "url"),
+    (DoctorOnboardingApplication, "additional_certifications", "json"),
+    (ClinicOnboardingApplication, "registration_certificate_url", "url"),
+    (ClinicOnboardingApplication, "gst_certificate_url", "url"),
+    (ClinicOnboardingApplication, "owner_id_proof_url", "url"),
+    (ClinicOnboardingApplication, "insurance_certificate_url", "url"),
+    (ClinicOnboardingApplication, "contract_document_url", "url"),
+    (ClinicOnboardingApplication, "facility_photos_urls", "json"),
+    (ClinicOnboardingApplication, "site_verification_photos", "json"),
+]
+
+URL_PATTERN = re.compile(r"""https?://[^\s"'<>()\[\]]+""")
+
+# Rows fetched per query while collecting references
+SCAN_BATCH = 1000
+
+# Orphaned keys included in the report
+REPORT_SAMPLE = 100
+
+
+def _digest(value: str) -> bytes:
+    return hashlib.blake2b(value.encode(), digest_size=8).digest()
+
+
+def _stem(key: str) -> str:
+    return key.rsplit(".", 1)[0]
+
+
+def _urls(value: Optional[str], kind: str) -> Iterator[str]:
+    if not value:
+        return
+    if kind == "url":
+        yield value
+    elif kind == "json":
+        try:
+            parsed = json.loads(value)
+        except (TypeError, ValueError):
+            return
+        if isinstance(parsed, list):
+            yield from (url for url in parsed if isinstance(url, str))
+    else:
+        yield from URL_PATTERN.findall(value)
+
+
+def referenced_keys(db: Session) -> Set[bytes]:
+    """Digests of every referenced key, plus "stem:"-digests of their variant directories"""
+    referenced = set()
+    for model, attribute, kind in REFERENCE_COLUMNS:
+        column = getattr(model, attribute)
+        last_id = 0
+        while True:
+            rows = db.query(model.id, column).filter(
+                model.id > last_id, column.isnot(None)
+            ).order_by(model.id).limit(SCAN_BATCH).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            for _, value in rows:
+                for url in _urls(value, kind):
+                    key = s3_service.get_key_from_url(url.split("?", 1)[0])
+                    if key:
+                        referenced.add(_digest(key))
+                        referenced.add(_digest("stem:" + _stem(key)))
+    return referenced
+
+
+def recently_reused_keys(db: Session, cutoff: datetime) -> Set[bytes]:
+    """Digests of content-addressed objects handed to an upload since cutoff"""
+    # last_used_at is naive UTC
+    since = cutoff.astimezone(timezone.utc).replace(tzinfo=None)
+    return {
+        _digest(key)
+        for (key,) in db.query(UploadBlob.key).filter(UploadBlob.last_used_at >= since).all()
+    }
+
+
+def _is_referenced(key: str, referenced: Set[bytes]) -> bool:
+    if key.startswith(VARIANT_PREFIX):
+        # variants/<original stem>/<width>w.<format>
+        stem = key[len(VARIANT_PREFIX):].rsplit("/", 1)[0]
+        return _digest("stem:" + stem) in referenced
+    return _digest(key) in referenced
+
+
+def _list_objects(prefixes: Iterable[str]) -> Iterator[Dict]:
+    paginator = s3_service.client.get_paginator("list_objects_v2")
+    for prefix in prefixes:
+        for page in paginator.paginate(Bucket=settings.S3_BUCKET_NAME, Prefix=prefix):
+            yield from page.get("Contents", [])
+
+
+def _delete_batch(db: Session, keys: List[str]) -> List[Dict]:
+    """Delete keys in one delete_objects call and drop their index rows. Returns S3's errors."""
+    response = s3_service.client.delete_objects(
+        Bucket=settings.S3_BUCKET_NAME,
+        Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True}
+    )
+    errors = response.get("Errors", [])
+    failed = {error.get("Key") for error in errors}
+    deleted = [key for key in keys if key not in failed]
+    if deleted:
+        db.query(ImageAsset).filter(ImageAsset.source_key.in_(deleted)).delete(synchronize_session=False)
+        db.query(UploadBlob).filter(UploadBlob.key.in_(deleted)).delete(synchronize_session=False)
+        db.commit()
+    return errors
+
+
+def collect_garbage(
+    db: Session,
+    dry_run: bool = True,
+    grace_hours: Optional[int] = None,
+    job: Optional[JobContext] = None
+) -> Dict:
+    """Delete (or with dry_run, report) unreferenced objects older than the grace period"""
+    if not s3_service.is_configured:
+        raise ValueError("AWS S3 is not configured")
+
+    grace_hours = settings.S3_GC_GRACE_HOURS if grace_hours is None else grace_hours
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    batch_size = max(1, min(1000, settings.S3_GC_DELETE_BATCH))
+
+    if job:
+        job.progress(5, "Collecting referenced files")
+    referenced = referenced_keys(db)
+    reused = recently_reused_keys(db, cutoff)
+
+    if job:
+        job.progress(30, "Scanning bucket")
+    prefixes = sorted(set(s3_service.FOLDERS.values())) + [VARIANT_PREFIX]
+    report = {
+        "dry_run": dry_run,
+        "grace_hours": grace_hours,
+        "scanned": 0,
+        "referenced": 0,
+        "too_recent": 0,
+        "orphaned": 0,
+        "orphaned_bytes": 0,
+        "deleted": 0,
+        "errors": [],
+        "sample": [],
+    }
+    pending: List[str] = []
+
+    def flush():
+        errors = _delete_batch(db, pending)
+        report["deleted"] += len(pending) - len(errors)
+        report["errors"].extend(
+            {"key": e.get("Key"), "code": e.get("Code"), "message": e.get("Message")}
+            for e in errors[:REPORT_SAMPLE - len(report["errors"])]
+        )
+        pending.clear()
+
+    for obj in _list_objects(prefixes):
+        report["scanned"] += 1
+        key = obj["Key"]
+        if _is_referenced(key, referenced):
+            report["referenced"] += 1
+            continue
+        if obj["LastModified"] > cutoff or _digest(key) in reused:
+            report["too_recent"] += 1
+            continue
+
+        report["orphaned"] += 1
+        report["orphaned_bytes"] += obj.get("Size", 0)
+        if len(report["sample"]) < REPORT_SAMPLE:
+            report["sample"].append({
+                "key": key,
+                "size": obj.get("Size", 0),
+                "last_modified": obj["LastModified"].isoformat(),
+            })
+        if not dry_run:
+            pending.append(key)
+            if len(pending) >= batch_size:
+                flush()
+                if job:
+                    job.progress(50, f"Deleted {report['deleted']} of {report['orphaned']} orphaned files so far")
+
+    if pending:
+        flush()
+    return report
+
+
+@job_handler("storage.gc")
+def storage_gc_job(job: JobContext, dry_run: bool = True, grace_hours: Optional[int] = None):
+    return collect_garbage(job.db, dry_run=dry_run, grace_hours=grace_hours, job=job)
@@ -0,0 +1,314 @@
+"""
+Local fast path for symptom analysis.
+
+A small TF-IDF classifier maps free-text symptoms to the clinic's services
+without an LLM round trip. Each active service becomes one weighted document
+built from:
+
+  * its name, description and conditions_treated
+  * blog tags of articles that are about the same conditions
+  * historic LLM analyses (ai_response_cache rows for "analyze_symptoms")
+    that recommended the service
+
+Only confident, unambiguous matches are answered locally. Inputs with red-flag
+symptoms, too few known terms, a weak best match or a close runner-up return
+None and the caller escalates to ai_service.analyze_symptoms.
+
+The model is built lazily and kept in the shared cache; it is dropped when
+services or blog tags change and rebuilt at least every MODEL_TTL seconds so
+new historic analyses are picked up.
+"""
+import json
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import AIResponseCache, BlogArticle, BlogArticleTag, BlogTag, Service
+from app.utils.cache import cache, depends_on_tables
+from app.utils.related_articles import STOPWORDS
+
+MODEL_CACHE_KEY = "symptom-triage:model"
+MODEL_TTL = 60 * 60
+depends_on_tables("symptom-triage:", "services", "blog_tags", "blog_article_tags")
+
+# Relative weight of each training source
+NAME_WEIGHT = 3
+CONDITION_WEIGHT = 4
+DESCRIPTION_WEIGHT = 1
+TAG_WEIGHT = 2
+HISTORY_WEIGHT = 2
+
+# Known (in-vocabulary) terms an input needs before it is answered locally
+MIN_MATCHED_TERMS = 2
+
+# Never answered locally - these always go to the LLM
+RED_FLAGS = (
+    "chest pain", "breath", "faint", "unconscious", "bladder", "bowel", "fever",
+    "slurred", "sudden weakness", "face numb", "vision", "bleeding", "fracture",
+    "accident", "fall", "worst headache", "weight loss", "suicid",
+)
+
+# Fallback specialist type when there is no historic analysis for a service
+SPECIALIST_KEYWORDS = [
+    ("Neurological", {"stroke", "neuro", "neurological", "paralysis", "parkinson", "nerve", "sclerosis", "palsy"}),
+    ("Sports", {"sports", "sport", "athlete", "ligament", "acl", "sprain", "strain", "tendon", "runner"}),
+    ("Pediatric", {"child", "children", "pediatric", "paediatric", "infant"}),
+    ("Geriatric", {"elderly", "geriatric", "balance", "osteoporosis"}),
+]
+DEFAULT_SPECIALIST = "Orthopedic"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+
+def _tokenize(text: str) -> List[str]:
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 2 and t not in STOPWORDS]
+
+
+def _json_list(value) -> List[str]:
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return [str(value)]
+    if isinstance(parsed, list):
+        return [str(item) for item in parsed if item]
+    return [str(parsed)]
+
+
+def _record(metric: str):
+    with _metrics_lock:
+        _metrics[metric] += 1
+
+
+class TriageModel:
+    """TF-IDF centroids per service plus the metadata needed to build an answer"""
+
+    def __init__(self, services: List[Dict], term_counts: Dict[int, Counter], history: Dict[int, Dict]):
+        self.services = {s["id"]: s for s in services}
+        self.history = history
+
+        doc_freq = Counter()
+        for counts in term_counts.values():
+            doc_freq.update(counts.keys())
+        n_docs = len(term_counts)
+        self.idf = {term: math.log((1 + n_docs) / (1 + df)) + 1 for term, df in doc_freq.items()}
+
+        self.vectors = {}
+        for service_id, counts in term_counts.items():
+            vector = {term: (1 + math.log(tf)) * self.idf[term] for term, tf in counts.items()}
+            norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+            self.vectors[service_id] = {term: w / norm for term, w in vector.items()}
+
+    def score(self, tokens: List[str]):
+        """[(service_id, cosine)] best first, and the number of known terms"""
+        counts = Counter(t for t in tokens if t in self.idf)
+        if not counts:
+            return [], 0
+        query = {term: (1 + math.log(tf)) * self.idf[term] for term, tf in counts.items()}
+        norm = math.sqrt(sum(w * w for w in query.values())) or 1.0
+        scores = []
+        for service_id, vector in self.vectors.items():
+            score = sum(w * vector.get(term, 0.0) for term, w in query.items()) / norm
+            if score > 0:
+                scores.append((service_id, score))
+        scores.sort(key=lambda s: s[1], reverse=True)
+        return scores, len(counts)
+
+
+def _service_for_name(name: str, services: List[Dict]) -> Optional[int]:
+    """Match a service name from an LLM answer to an actual service"""
+    wanted = set(_tokenize(name))
+    if not wanted:
+        return None
+    best_id, best_score = None, 0.0
+    for service in services:
+        tokens = service["name_tokens"]
+        if not tokens:
+            continue
+        score = len(wanted & tokens) / len(wanted | tokens)
+        if score > best_score:
+            best_id, best_score = service["id"], score
+    return best_id if best_score >= 0.5 else None
+
+
+def build_model(db) -> Optional[TriageModel]:
+    """Train the classifier from services, blog tags and historic analyses"""
+    services = []
+    term_counts: Dict[int, Counter] = {}
+    for row in db.query(
+        Service.id, Service.name, Service.slug, Service.description, Service.conditions_treated
+    ).filter(Service.is_active == True).all():
+        conditions = _json_list(row.conditions_treated)
+        counts = Counter()
+        for token in _tokenize(row.name):
+            counts[token] += NAME_WEIGHT
+        for condition in conditions:
+            for token in _tokenize(condition):
+                counts[token] += CONDITION_WEIGHT
+        for token in _tokenize(row.description):
+            counts[token] += DESCRIPTION_WEIGHT
+        services.append({
+            "id": row.id,
+            "name": row.name,
+            "slug": row.slug,
+            "conditions": conditions,
+            "name_tokens": set(_tokenize(row.name)),
+            "seed_tokens": set(counts),
+        })
+        term_counts[row.id] = counts
+
+    if not services:
+        return None
+
+    # Blog tags: an article tagged with a service's conditions lends all of its
+    # tags (e.g. "sciatica" next to "lower back pain") to that service
+    article_tags = defaultdict(list)
+    for article_id, tag_name in db.query(BlogArticleTag.article_id, BlogTag.name).join(
+        BlogTag, BlogTag.id == BlogArticleTag.tag_id
+    ).join(
+        BlogArticle, BlogArticle.id == BlogArticleTag.article_id
+    ).filter(BlogArticle.is_published == True).all():
+        article_tags[article_id].append(tag_name)
+
+    for tags in article_tags.values():
+        tag_tokens = [token for tag in tags for token in _tokenize(tag)]
+        token_set = set(tag_tokens)
+        for service in services:
+            if len(token_set & service["seed_tokens"]) >= 2:
+                for token in tag_tokens:
+                    term_counts[service["id"]][token] += TAG_WEIGHT
+
+    # Historic LLM analyses: the symptom text becomes training data for every
+    # service the LLM recommended
+    history = defaultdict(lambda: {"specialist_type": Counter(), "urgency": Counter()})
+    for normalized_input, response in db.query(
+        AIResponseCache.normalized_input, AIResponseCache.response
+    ).filter(
+        AIResponseCache.endpoint == "analyze_symptoms",
+        AIResponseCache.expires_at > datetime.utcnow()
+    ).all():
+        try:
+            result = json.loads(response)
+        except (TypeError, ValueError):
+            continue
+        if not isinstance(result, dict):
+            continue
+        symptom_tokens = _tokenize(normalized_input.replace("symptoms=", " "))
+        for name in result.get("recommended_services") or []:
+            service_id = _service_for_name(str(name), services)
+            if service_id is None:
+                continue
+            for token in symptom_tokens:
+                term_counts[service_id][token] += HISTORY_WEIGHT
+            if result.get("specialist_type"):
+                history[service_id]["specialist_type"][result["specialist_type"]] += 1
+            if result.get("urgency"):
+                history[service_id]["urgency"][result["urgency"]] += 1
+
+    return TriageModel(services, term_counts, dict(history))
+
+
+def _load_model() -> Optional[TriageModel]:
+    def build():
+        db = SessionLocal()
+        try:
+            return build_model(db)
+        finally:
+            db.close()
+    return cache.get_or_set(MODEL_CACHE_KEY, build, ttl=MODEL_TTL)
+
+
+def _specialist_type(model: TriageModel, service_id: int) -> str:
+    seen = model.history.get(service_id, {}).get("specialist_type")
+    if seen:
+        return seen.most_common(1)[0][0]
+    service = model.services[service_id]
+    tokens = service["name_tokens"] | service["seed_tokens"]
+    for specialist, keywords in SPECIALIST_KEYWORDS:
+        if tokens & keywords:
+            return specialist
+    return DEFAULT_SPECIALIST
+
+
+def _urgency(model: TriageModel, service_id: int) -> str:
+    seen = model.history.get(service_id, {}).get("urgency")
+    if seen:
+        return seen.most_common(1)[0][0]
+    return "medium"
+
+
+def _matching_conditions(service: Dict, tokens: set) -> List[str]:
+    ranked = sorted(
+        service["conditions"],
+        key=lambda condition: len(tokens & set(_tokenize(condition))),
+        reverse=True
+    )
+    return ranked[:3]
+
+
+def classify(symptoms: str, model: Optional[TriageModel] = None) -> Optional[Dict]:
+    """
+    Answer a symptom description locally, in the same shape as
+    ai_service.analyze_symptoms. Returns None when the input should be
+    escalated to the LLM.
+    """
+    text = (symptoms or "").lower()
+    if any(flag in text for flag in RED_FLAGS):
+        _record("red_flag_escalations")
+        return None
+
+    model = model or _load_model()
+    if model is None:
+        _record("escalations")
+        return None
+
+    tokens = _tokenize(text)
+    scores, matched_terms = model.score(tokens)
+    if matched_terms < MIN_MATCHED_TERMS or not scores:
+        _record("escalations")
+        return None
+
+    best_id, best_score = scores[0]
+    runner_up = scores[1][1] if len(scores) > 1 else 0.0
+    margin = (best_score - runner_up) / best_score
+    if best_score < settings.SYMPTOM_TRIAGE_MIN_SCORE or margin < settings.SYMPTOM_TRIAGE_MIN_MARGIN:
+        _record("escalations")
+        return None
+
+    best = model.services[best_id]
+
+    _record("local_answers")
+    return {
+        "summary": f"Your symptoms are commonly treated with {best['name']}. "
+                   f"A physiotherapist can confirm this after an assessment.",
+        "possible_conditions": _matching_conditions(best, set(tokens)),
+        # Only the confident match; anything close to it would have been escalated
+        "recommended_services": [best["name"]],
+        "urgency": _urgency(model, best_id),
+        "specialist_type": _specialist_type(model, best_id),
+        "confidence": round(best_score, 4),
+    }
+
+
+def get_stats() -> Dict:
+    """Local answer / escalation counts for this worker"""
+    with _metrics_lock:
+        counts = dict(_metrics)
+    total = sum(counts.values())
+    local = counts.get("local_answers", 0)
+    return {
+        **counts,
+        "total": total,
+        "escalation_rate": round((total - local) / total, 4) if total else 0.0,
+    }
@@ -0,0 +1,121 @@
+"""
+Write-behind view counters.
+
+Page views are counted in memory and flushed periodically as one batched
+UPDATE per table, instead of a row update on every request:
+
+    UPDATE blog_articles AS t SET view_count = t.view_count + v.n
+    FROM (VALUES (:id_0, :n_0), (:id_1, :n_1), ...) AS v(id, n)
+    WHERE t.id = v.id
+
+Counts that fail to flush are put back into the buffer, and the buffer is
+flushed one last time on shutdown.
+"""
+import threading
+from collections import Counter
+from typing import Dict
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+
+# Only these tables can be incremented (table names are interpolated into SQL)
+COUNTED_TABLES = ("blog_articles", "doctors")
+
+# Rows per UPDATE statement
+FLUSH_BATCH_SIZE = 500
+
+
+class ViewCounterBuffer:
+    """Thread-safe in-process buffer of pending view increments"""
+
+    def __init__(self, flush_interval: int = 10):
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Counter] = {table: Counter() for table in COUNTED_TABLES}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def increment(self, table: str, row_id: int, amount: int = 1):
+        if table not in self._pending:
+            raise ValueError(f"View counting is not enabled for table '{table}'")
+        with self._lock:
+            self._pending[table][row_id] += amount
+
+    def pending(self) -> Dict[str, int]:
+        with self._lock:
+            return {table: sum(counts.values()) for table, counts in self._pending.items()}
+
+    def _swap(self) -> Dict[str, Counter]:
+        with self._lock:
+            drained = self._pending
+            self._pending = {table: Counter() for table in COUNTED_TABLES}
+        return drained
+
+    def _restore(self, table: str, counts: Counter):
+        with self._lock:
+            self._pending[table].update(counts)
+
+    @staticmethod
+    def _flush_table(conn, table: str, items):
+        if conn.dialect.name == "postgresql":
+            values = ", ".join(f"(:id_{i}, :n_{i})" for i in range(len(items)))
+            params = {}
+            for i, (row_id, n) in enumerate(items):
+                params[f"id_{i}"] = row_id
+                params[f"n_{i}"] = n
+            conn.execute(text(
+                f"UPDATE {table} AS t SET view_count = COALESCE(t.view_count, 0) + v.n "
+                f"FROM (VALUES {values}) AS v(id, n) WHERE t.id = v.id"
+            ), params)
+        else:
+            # SQLite and others: a single executemany round trip
+            conn.execute(
+                text(f"UPDATE {table} SET view_count = COALESCE(view_count, 0) + :n WHERE id = :id"),
+                [{"id": row_id, "n": n} for row_id, n in items]
+            )
+
+    def flush(self) -> int:
+        """Write pending increments to the database. Returns rows updated."""
+        with self._flush_lock:
+            drained = self._swap()
+            flushed = 0
+            for table, counts in drained.items():
+                if not counts:
+                    continue
+                items = sorted(counts.items())  # stable lock order across workers
+                try:
+                    with engine.begin() as conn:
+                        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                            self._flush_table(conn, table, items[start:start + FLUSH_BATCH_SIZE])
+                    flushed += len(items)
+                except Exception as e:
+                    print(f"View counter flush failed for {table}: {e}")
+                    self._restore(table, counts)
+            return flushed
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def start(self):
+        """Start the periodic background flusher"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="view-counter-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write out whatever is still buffered"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval)
+            self._thread = None
+        self.flush()
+
+
+# Singleton instance
+view_counter = ViewCounterBuffer(flush_interval=settings.VIEW_COUNTER_FLUSH_SECONDS)
@@ -0,0 +1,104 @@
+"""
+Benchmark concurrent S3 presign and put_object throughput by client config.
+
+Starts a local S3 stand-in (moto's threaded HTTP server) so real connections
+are opened and pooled, then runs the same workload from a thread pool with
+  - default: botocore defaults (10 pooled connections, legacy retries)
+  - tuned:   the settings-driven client the app uses (S3_MAX_POOL_CONNECTIONS,
+             S3_RETRY_MODE, timeouts)
+reporting operations per second and latency percentiles from the client's
+per-operation metrics.
+
+Requires moto with its server extras (not an app dependency):
+    pip install "moto[server]"
+
+Run: python benchmark_s3_client.py [--threads 32] [--ops 2000] [--size-kb 64]
+"""
+import sys
+import os
+import argparse
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+PORT = _free_port()
+
+# Fake credentials, bucket and endpoint for the stand-in, set before settings are loaded
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+os.environ.setdefault("S3_BUCKET_NAME", "novacare-benchmark")
+os.environ["S3_ENDPOINT_URL"] = f"http://127.0.0.1:{PORT}"
+
+try:
+    from moto.server import ThreadedMotoServer
+except ImportError:
+    print("❌ moto server is not installed. Run: pip install \"moto[server]\"")
+    sys.exit(1)
+
+from app.config import settings
+from app.s3_service import s3_service
+
+CONFIGS = {
+    "default": {"max_pool_connections": 10, "retries": {"max_attempts": 5, "mode": "legacy"}},
+    "tuned": {},
+}
+
+
+def run(client, operation: str, threads: int, ops: int, body: bytes) -> float:
+    def presign(i):
+        s3_service._presign("get_object", {"Bucket": settings.S3_BUCKET_NAME, "Key": f"benchmark/{i}"}, 3600)
+
+    def put(i):
+        client.put_object(Bucket=settings.S3_BUCKET_NAME, Key=f"benchmark/{i}", Body=body)
+
+    work = presign if operation == "presign" else put
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(work, range(ops)))
+    return ops / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent S3 presign/put throughput by client config")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per run")
+    parser.add_argument("--size-kb", type=int, default=64, help="put_object body size")
+    args = parser.parse_args()
+    body = os.urandom(args.size_kb * 1024)
+
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=PORT, verbose=False)
+    server.start()
+    try:
+        s3_service.client.create_bucket(
+            Bucket=settings.S3_BUCKET_NAME,
+            CreateBucketConfiguration={"LocationConstraint": settings.AWS_REGION}
+        )
+
+        print(f"📦 S3 client benchmark (moto server), {args.threads} threads, {args.ops} ops, "
+              f"{args.size_kb}KB objects")
+        print(f"{'config':>8} {'operation':>10} {'ops/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'retries':>8}")
+        for name, overrides in CONFIGS.items():
+            client = s3_service.build_client(**overrides)
+            s3_service._client = client
+            for operation, metric in (("presign", "presign:get_object"), ("put", "PutObject")):
+                s3_service.metrics.reset()
+                throughput = run(client, operation, args.threads, args.ops, body)
+                stats = s3_service.metrics.snapshot()[metric]
+                print(f"{name:>8} {operation:>10} {throughput:>9.0f} {stats['p50_ms']:>6.1f}ms "
+                      f"{stats['p95_ms']:>6.1f}ms {stats['p99_ms']:>6.1f}ms {stats['retries']:>8}")
+    finally:
+        server.stop()
+
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark server-side uploads to S3: buffered vs streamed.
+
+Runs against an in-process S3 stand-in (moto), so no AWS account is needed.
+For each file size it compares
+  - buffered: read the whole upload into memory, then one put_object
+    (what POST /api/uploads/direct used to do)
+  - streamed: s3_service.upload_fileobj_streaming from the spool file
+reporting peak Python memory (tracemalloc) and throughput.
+
+Requires moto (not an app dependency): pip install "moto[s3]"
+
+Run: python benchmark_s3_uploads.py [--sizes 1,5,20,50] [--repeat 3]
+"""
+import sys
+import os
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Fake credentials and bucket for the stand-in, set before settings are loaded
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+os.environ.setdefault("S3_BUCKET_NAME", "novacare-benchmark")
+os.environ.setdefault("CLOUDFRONT_DOMAIN", "")
+
+try:
+    from moto import mock_aws
+except ImportError:
+    try:
+        from moto import mock_s3 as mock_aws  # moto < 5
+    except ImportError:
+        print("❌ moto is not installed. Run: pip install \"moto[s3]\"")
+        sys.exit(1)
+
+from app.config import settings
+from app.s3_service import s3_service
+
+MB = 1024 * 1024
+
+# Same spooling as Starlette's UploadFile: memory up to 1MB, then a temp file
+SPOOL_MAX_SIZE = 1 * MB
+
+
+def make_upload(size: int):
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    block = os.urandom(MB)
+    written = 0
+    while written < size:
+        n = min(MB, size - written)
+        spool.write(block[:n])
+        written += n
+    spool.seek(0)
+    return spool
+
+
+def buffered_upload(spool, size: int):
+    content = spool.read()
+    s3_service.client.put_object(
+        Bucket=settings.S3_BUCKET_NAME,
+        Key=f"benchmark/buffered-{size}",
+        Body=content,
+        ContentType="image/jpeg",
+    )
+
+
+def streamed_upload(spool, size: int):
+    s3_service.upload_fileobj_streaming(
+        spool,
+        original_filename=f"streamed-{size}.jpg",
+        content_type="image/jpeg",
+        folder="misc",
+        max_size=size
+    )
+
+
+def measure(upload, size: int, repeat: int):
+    timings, peaks = [], []
+    for _ in range(repeat):
+        spool = make_upload(size)
+        tracemalloc.start()
+        started = time.perf_counter()
+        upload(spool, size)
+        timings.append(time.perf_counter() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        spool.close()
+    seconds = statistics.median(timings)
+    return seconds, max(peaks), size / MB / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="1,5,20,50", help="Comma-separated file sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sizes = [int(float(s) * MB) for s in args.sizes.split(",")]
+
+    # The benchmark uploads files larger than the app allows
+    s3_service.ALLOWED_IMAGE_TYPES["image/jpeg"] = max(sizes)
+
+    with mock_aws():
+        s3_service._client = None
+        s3_service.client.create_bucket(
+            Bucket=settings.S3_BUCKET_NAME,
+            CreateBucketConfiguration={"LocationConstraint": settings.AWS_REGION}
+        )
+
+        print(f"📦 S3 upload benchmark (moto), part size {settings.S3_MULTIPART_CHUNK_BYTES / MB:g}MB, "
+              f"median of {args.repeat}")
+        print(f"{'size':>8} {'mode':>9} {'time':>9} {'peak mem':>10} {'MB/s':>8}")
+        for size in sizes:
+            for name, upload in (("buffered", buffered_upload), ("streamed", streamed_upload)):
+                seconds, peak, throughput = measure(upload, size, args.repeat)
+                print(f"{size / MB:>6g}MB {name:>9} {seconds * 1000:>7.0f}ms {peak / MB:>8.1f}MB {throughput:>8.1f}")
+
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
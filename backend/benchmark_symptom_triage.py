@@ -0,0 +1,126 @@
+"""
+Benchmark the local symptom triage classifier.
+
+Reports per-query latency, the escalation rate and - for historic analyses
+stored in ai_response_cache - how often the local answer agrees with the
+service the LLM recommended.
+
+Run: python benchmark_symptom_triage.py [--llm]
+  --llm  also time ai_service.analyze_symptoms for the escalated queries
+"""
+import sys
+import os
+import argparse
+import json
+import statistics
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models import AIResponseCache
+from app.utils import symptom_triage
+
+SAMPLE_SYMPTOMS = [
+    "Lower back pain radiating down my left leg when sitting for long",
+    "Stiff neck and shoulder pain after working on the laptop all day",
+    "Knee pain and swelling after running, hurts going down stairs",
+    "Twisted my ankle playing football, it is swollen and painful",
+    "Recovering from a stroke, weakness in right arm and trouble walking",
+    "Frozen shoulder, cannot lift my arm above my head",
+    "Tennis elbow pain when gripping objects",
+    "Pain in the heel in the morning, plantar fasciitis",
+    "Post knee replacement surgery rehabilitation",
+    "Headache and dizziness when turning my head",
+    "Chest pain and shortness of breath while walking",
+    "I feel tired",
+    "Muscle spasms in upper back and tightness between shoulder blades",
+    "Sciatica pain in buttock and leg with tingling",
+    "Hip pain when walking, arthritis",
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load_historic(db, limit=500):
+    """(symptoms, LLM recommended services) pairs from the AI response cache"""
+    rows = db.query(AIResponseCache.normalized_input, AIResponseCache.response).filter(
+        AIResponseCache.endpoint == "analyze_symptoms"
+    ).limit(limit).all()
+    historic = []
+    for normalized_input, response in rows:
+        try:
+            result = json.loads(response)
+        except (TypeError, ValueError):
+            continue
+        historic.append((
+            normalized_input.replace("symptoms=", "", 1),
+            [str(s).lower() for s in (result.get("recommended_services") or [])]
+        ))
+    return historic
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local symptom triage")
+    parser.add_argument("--llm", action="store_true", help="Also time the LLM on escalated queries")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        model = symptom_triage.build_model(db)
+        build_ms = (time.perf_counter() - start) * 1000
+        historic = load_historic(db)
+    finally:
+        db.close()
+
+    if model is None:
+        print("❌ No active services - nothing to train the classifier on")
+        return
+
+    print(f"🧠 Trained on {len(model.services)} services, {len(model.idf)} terms in {build_ms:.1f} ms")
+
+    queries = [(text, None) for text in SAMPLE_SYMPTOMS] + historic
+    latencies = []
+    escalated = []
+    agreed = compared = 0
+
+    for text, llm_services in queries:
+        start = time.perf_counter()
+        result = symptom_triage.classify(text, model=model)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        if result is None:
+            escalated.append(text)
+            continue
+        if llm_services:
+            compared += 1
+            if result["recommended_services"][0].lower() in llm_services:
+                agreed += 1
+
+    total = len(queries)
+    print(f"\n📊 {total} queries ({len(historic)} historic)")
+    print(f"   Local latency  p50={_percentile(latencies, 50):.3f} ms  "
+          f"p95={_percentile(latencies, 95):.3f} ms  max={max(latencies):.3f} ms")
+    print(f"   Answered locally: {total - len(escalated)}  Escalated: {len(escalated)} "
+          f"({len(escalated) / total:.1%})")
+    if compared:
+        # Historic inputs are part of the training data, so treat this as an upper bound
+        print(f"   Agreement with historic LLM answers: {agreed}/{compared} ({agreed / compared:.1%})")
+
+    if args.llm and escalated:
+        from app import ai_service
+        llm_latencies = []
+        for text in escalated:
+            start = time.perf_counter()
+            ai_service.analyze_symptoms(text, bypass_cache=True)
+            llm_latencies.append((time.perf_counter() - start) * 1000)
+        print(f"   LLM latency    p50={statistics.median(llm_latencies):.0f} ms  "
+              f"max={max(llm_latencies):.0f} ms ({len(llm_latencies)} calls)")
+
+
+if __name__ == "__main__":
+    main()
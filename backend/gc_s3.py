@@ -0,0 +1,48 @@
+"""
+Find (and optionally delete) S3 objects that no record references any more:
+replaced or deleted doctor photos, blog images, onboarding documents, and
+variants of them. Dry run unless --delete is given.
+Run: python gc_s3.py [--delete] [--grace-hours 72]
+"""
+import sys
+import os
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.utils.storage_gc import collect_garbage
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Garbage-collect orphaned S3 objects")
+    parser.add_argument("--delete", action="store_true", help="Delete orphans (default: report only)")
+    parser.add_argument("--grace-hours", type=int, default=None, help="Keep orphans younger than this")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = collect_garbage(db, dry_run=not args.delete, grace_hours=args.grace_hours)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"🔍 Scanned {report['scanned']} objects: {report['referenced']} referenced, "
+          f"{report['too_recent']} within the {report['grace_hours']}h grace period")
+    print(f"🗑️  {report['orphaned']} orphaned ({report['orphaned_bytes'] / (1024 * 1024):.1f}MB)")
+    for item in report["sample"]:
+        print(f"   {item['last_modified'][:10]}  {item['size']:>10}  {item['key']}")
+    if report["orphaned"] > len(report["sample"]):
+        print(f"   ... and {report['orphaned'] - len(report['sample'])} more")
+
+    if report["dry_run"]:
+        print("ℹ️  Dry run - nothing deleted. Re-run with --delete to remove them.")
+    else:
+        print(f"✅ Deleted {report['deleted']} objects")
+    for error in report["errors"]:
+        print(f"❌ {error['key']}: {error['code']} {error['message']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+"""
+Local OpenAI-compatible stand-in server for load and regression tests.
+
+Serves /v1/chat/completions (plain and streaming) with canned responses shaped
+like the JSON ai_service parses, so the chat, blog and onboarding flows can be
+exercised without an API key or network access. Latency is drawn from a
+configurable distribution and errors can be injected at given rates.
+
+Run: python openai_standin.py [--port 8100] [--latency lognormal:800:0.5]
+                              [--error-rate 0.02] [--rate-limit-rate 0.05]
+                              [--responses canned.json]
+
+Then start the backend with:
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=standin ./run.sh
+
+Latency specs (milliseconds): "0", "fixed:500", "uniform:200:1500",
+"normal:800:200", "lognormal:800:0.5" (median, sigma). Streams wait the
+sampled latency before the first token and --token-ms between tokens.
+
+Injected failures: --error-rate (HTTP 500), --rate-limit-rate (HTTP 429 with
+Retry-After), --timeout-rate (hangs for --hang-seconds), --malformed-rate
+(content that is not valid JSON) and --stream-drop-rate (stream cut off
+half way). Rates can be changed while running:
+    curl -X POST localhost:8100/_standin/config -d '{"error_rate": 0.2}'
+For deterministic tests, "rate_limit_next" / "error_next" answer exactly the
+next N requests with 429 / 500 before the rates apply.
+
+--responses points at a JSON file mapping endpoint names (the ones used for
+usage accounting, e.g. "generate_blog_article", "chat") to a fixed response:
+a string, or an object that is sent as JSON. GET /_standin/stats shows which
+endpoints were recognised, how many failures were injected and the most
+requests handled at once (max_in_flight; streams count until their first token).
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="OpenAI stand-in")
+
+# ============ Runtime configuration ============
+
+config = {
+    "latency": "lognormal:800:0.5",
+    "token_ms": 15.0,
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "timeout_rate": 0.0,
+    "malformed_rate": 0.0,
+    "stream_drop_rate": 0.0,
+    "hang_seconds": 120.0,
+    "seed": None,
+    "rate_limit_next": 0,
+    "error_next": 0,
+}
+overrides: Dict[str, object] = {}
+stats: Dict[str, Counter] = {"requests": Counter(), "injected": Counter(), "concurrency": Counter()}
+rng = random.Random()
+
+
+def parse_latency(spec: str):
+    """Validate a latency spec and return a sampler (milliseconds)"""
+    parts = spec.split(":")
+    kind, args = parts[0], [float(p) for p in parts[1:]]
+    if len(parts) == 1:
+        value = float(kind)
+        return lambda: value
+    if kind == "fixed" and len(args) == 1:
+        return lambda: args[0]
+    if kind == "uniform" and len(args) == 2:
+        return lambda: rng.uniform(args[0], args[1])
+    if kind == "normal" and len(args) == 2:
+        return lambda: max(0.0, rng.gauss(args[0], args[1]))
+    if kind == "lognormal" and len(args) == 2:
+        return lambda: args[0] * rng.lognormvariate(0, args[1])
+    raise ValueError(f"Unknown latency spec '{spec}'")
+
+
+_sample_latency = parse_latency(config["latency"])
+
+
+def _roll(rate_key: str) -> bool:
+    return config[rate_key] > 0 and rng.random() < config[rate_key]
+
+
+def _take(count_key: str) -> bool:
+    """Use up one of the next-N failures queued under count_key"""
+    if config[count_key] > 0:
+        config[count_key] -= 1
+        return True
+    return False
+
+
+# ============ Recognising the calling endpoint ============
+
+# Phrases from the prompts in app/ai_service.py; anything else is treated as chat
+FINGERPRINTS = [
+    ("generate_service_description", "content for this physiotherapy service"),
+    ("generate_doctor_bio", "content for this doctor profile"),
+    ("generate_ai_reply_to_inquiry", "reply to this customer inquiry"),
+    ("generate_testimonial_response", "to a patient testimonial"),
+    ("analyze_symptoms", "A patient describes these symptoms"),
+    ("chat_summary", "Update the summary to include the new messages"),
+    ("generate_blog_article", "Write a comprehensive blog article about"),
+    ("generate_blog_outline", "Create a detailed outline for a blog article"),
+    ("improve_blog_content", "Improve the following content"),
+    ("verify_doctor_credentials", "Analyze the following doctor application"),
+    ("generate_interview_questions", "Generate interview questions for this physiotherapist"),
+    ("generate_training_content", "Create training module content about"),
+    ("analyze_doctor_performance", "Analyze this doctor's performance metrics"),
+    ("generate_onboarding_email", "email for a doctor onboarding process"),
+]
+
+
+def identify_endpoint(messages: List[Dict]) -> str:
+    text = "\n".join(str(m.get("content", "")) for m in messages)
+    for endpoint, phrase in FINGERPRINTS:
+        if phrase in text:
+            return endpoint
+    return "chat"
+
+
+def _field(prompt: str, label: str, default: str = "") -> str:
+    """Value of a 'Label: value' line in a prompt"""
+    match = re.search(rf"{re.escape(label)}:\s*(.+)", prompt)
+    return match.group(1).strip() if match else default
+
+
+def _slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:80]
+
+
+# ============ Canned responses ============
+
+FILLER = [
+    "Physiotherapy helps {topic} by restoring movement and reducing pain over a few weeks.",
+    "Many patients with {topic} notice improvement after consistent guided exercise.",
+    "A short daily routine targeting {topic} works better than occasional long sessions.",
+    "Our therapists assess posture, strength and flexibility before planning care for {topic}.",
+    "Heat, gentle mobility work and rest breaks are simple ways to manage {topic} at home.",
+    "Ignoring early signs of {topic} often leads to longer recovery times later.",
+    "Manual therapy and targeted strengthening are common parts of a {topic} programme.",
+    "Progress with {topic} is tracked at every visit so the plan can be adjusted.",
+    "Sleep, hydration and ergonomics all influence how quickly {topic} settles.",
+    "Home visits and video consultations make it easier to stay consistent with {topic} care.",
+    "Stretching should feel like mild tension, never sharp pain, when working on {topic}.",
+    "Returning to sport after {topic} is staged so the body can adapt safely.",
+]
+
+
+def _paragraphs(topic: str, count: int, seed: str) -> List[str]:
+    local = random.Random(seed)
+    paragraphs = []
+    for _ in range(count):
+        sentences = local.sample(FILLER, 4)
+        paragraphs.append(" ".join(s.format(topic=topic) for s in sentences) + f" ({local.randint(1000, 9999)})")
+    return paragraphs
+
+
+def canned_response(endpoint: str, messages: List[Dict]):
+    """Response for `endpoint`: a dict (sent as JSON) or a string"""
+    if endpoint in overrides:
+        return overrides[endpoint]
+
+    prompt = str(messages[-1].get("content", "")) if messages else ""
+
+    if endpoint == "generate_service_description":
+        name = _field(prompt, "Service Name", "Physiotherapy")
+        return {
+            "detailed_description": "\n\n".join(_paragraphs(name, 2, name)),
+            "benefits": [f"{name} benefit {i}" for i in range(1, 7)],
+            "conditions_treated": ["Back pain", "Neck pain", "Sciatica", "Arthritis",
+                                   "Sports injuries", "Frozen shoulder", "Post-surgery stiffness", "Tendinitis"],
+            "treatment_process": [
+                {"step": i, "title": f"Step {i}", "description": f"{name} step {i} description."}
+                for i in range(1, 6)
+            ],
+            "faqs": [{"question": f"Question {i} about {name}?", "answer": f"Answer {i}."} for i in range(1, 4)],
+        }
+    if endpoint == "generate_doctor_bio":
+        name = _field(prompt, "Name", "Doctor")
+        specialization = _field(prompt, "Specialization", "Physiotherapy")
+        return {
+            "bio": f"{name} is a {specialization} physiotherapist focused on lasting recovery.",
+            "story": "\n\n".join(_paragraphs(specialization, 3, name)),
+            "expertise": [f"{specialization} area {i}" for i in range(1, 6)],
+        }
+    if endpoint == "analyze_symptoms":
+        symptoms = _field(prompt, "A patient describes these symptoms", "pain")
+        return {
+            "summary": f"The symptoms ({symptoms[:80]}) suggest a musculoskeletal problem.",
+            "possible_conditions": ["Muscle strain", "Joint dysfunction"],
+            "recommended_services": ["Manual Therapy", "Exercise Therapy"],
+            "urgency": "medium",
+            "specialist_type": "Orthopedic",
+        }
+    if endpoint == "generate_blog_article":
+        topic = _field(prompt, "Write a comprehensive blog article about", "physiotherapy")
+        sections = "".join(
+            f"<h2>{topic} - part {i}</h2><p>{paragraph}</p>"
+            for i, paragraph in enumerate(_paragraphs(topic, 5, topic + uuid.uuid4().hex), 1)
+        )
+        return {
+            "title": topic[:60],
+            "slug": _slugify(topic),
+            "excerpt": f"What you need to know about {topic}."[:160],
+            "content": f"<p>An introduction to {topic}.</p>{sections}<p>Book a session with NovaCare today.</p>",
+            "meta_description": f"Expert physiotherapy advice on {topic}."[:160],
+            "category": "Health Tips",
+            "tags": [word for word in _slugify(topic).split("-") if len(word) > 3][:5] or ["physiotherapy"],
+            "featured_image_alt": f"Illustration for {topic}",
+        }
+    if endpoint == "generate_blog_outline":
+        topic = _field(prompt, "Create a detailed outline for a blog article about", "physiotherapy")
+        return {
+            "suggested_title": topic[:60],
+            "target_audience": "Adults looking for physiotherapy advice",
+            "main_keyword": topic.lower(),
+            "secondary_keywords": ["physiotherapy", "pain relief", "exercise"],
+            "sections": [{"heading": f"Section {i}", "key_points": ["Point A", "Point B"]} for i in range(1, 5)],
+            "estimated_word_count": 1200,
+            "suggested_category": "Health Tips",
+        }
+    if endpoint == "verify_doctor_credentials":
+        return {
+            "score": 78,
+            "analysis": {
+                "license_format_valid": True,
+                "qualification_recognized": True,
+                "experience_reasonable": True,
+                "specialization_valid": True,
+            },
+            "flags": [],
+            "recommendations": ["Verify license with State Council"],
+            "verification_steps": ["Contact issuing authority", "Check degree certificate"],
+            "notes": "Stand-in analysis: application looks complete.",
+        }
+    if endpoint == "generate_interview_questions":
+        counts = {"clinical_knowledge": 3, "patient_handling": 2, "ethics_compliance": 2,
+                  "platform_fit": 2, "scenario_based": 1}
+        return {
+            category: [
+                {
+                    "question": f"{category.replace('_', ' ').title()} question {i}?",
+                    "category": category,
+                    "expected_points": ["Point A", "Point B"],
+                    "difficulty": "intermediate",
+                }
+                for i in range(1, count + 1)
+            ]
+            for category, count in counts.items()
+        }
+    if endpoint == "generate_training_content":
+        topic = _field(prompt, "Create training module content about", "Clinic procedures")
+        return {
+            "title": topic[:80],
+            "description": f"Training module on {topic}.",
+            "content": "".join(f"<h2>Section {i}</h2><p>{p}</p>" for i, p in enumerate(_paragraphs(topic, 3, topic), 1)),
+            "duration_minutes": 20,
+            "quiz_questions": [
+                {"question": f"Question {i}?", "options": ["A", "B", "C", "D"], "correct_answer": 0, "explanation": "A is correct."}
+                for i in range(1, 6)
+            ],
+            "key_takeaways": ["Takeaway 1", "Takeaway 2", "Takeaway 3"],
+        }
+    if endpoint == "analyze_doctor_performance":
+        return {
+            "overall_score": 82,
+            "rating": "good",
+            "strengths": ["High completion rate", "Good patient ratings"],
+            "areas_for_improvement": ["Faster response times"],
+            "flags": [],
+            "recommendations": ["Keep availability up to date"],
+            "summary": "Stand-in analysis: solid performance overall.",
+        }
+    if endpoint == "generate_onboarding_email":
+        name = _field(prompt, "Recipient", "Doctor")
+        return {
+            "subject": "Update on your NovaCare application",
+            "body_html": f"<p>Dear {name},</p><p>Here is an update on your application.</p><p>NovaCare 24/7 Team</p>",
+            "body_text": f"Dear {name},\n\nHere is an update on your application.\n\nNovaCare 24/7 Team",
+        }
+    if endpoint == "improve_blog_content":
+        original = prompt.split("Original content:", 1)[-1].split("Provide the improved content", 1)[0].strip()
+        return original or "<p>Improved content.</p>"
+    if endpoint == "generate_ai_reply_to_inquiry":
+        name = _field(prompt, "Customer Name", "there")
+        return f"Dear {name},\n\nThank you for contacting us. Our team will call you shortly to help.\n\nNovaCare 24/7 Team"
+    if endpoint == "generate_testimonial_response":
+        return "Thank you for sharing your experience. Your recovery matters to us - wishing you continued health!"
+    if endpoint == "chat_summary":
+        return "The patient asked about physiotherapy options and booking; no decisions made yet."
+
+    # Chat: acknowledge the message and quote the first retrieved fact, if any
+    question = str(messages[-1].get("content", "")) if messages else ""
+    reply = f"Thanks for your question about \"{question[:120]}\". "
+    facts = [m["content"] for m in messages if m.get("role") == "system" and "Relevant NovaCare information" in m.get("content", "")]
+    if facts:
+        first = facts[0].split("\n- ", 1)[-1].split("\n", 1)[0]
+        reply += f"Here is something that may help: {first} "
+    return reply + "You can book a clinic visit, home visit or video consultation any time."
+
+
+# ============ OpenAI wire format ============
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _usage(messages: List[Dict], content: str) -> Dict[str, int]:
+    prompt_tokens = sum(_estimate_tokens(str(m.get("content", ""))) for m in messages)
+    completion_tokens = _estimate_tokens(content)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _error(status: int, message: str, error_type: str, headers: Optional[Dict] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": None}},
+        headers=headers
+    )
+
+
+def _chunk(completion_id: str, model: str, delta: Dict, finish_reason: Optional[str] = None) -> str:
+    body = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(body)}\n\n"
+
+
+async def _stream(completion_id: str, model: str, content: str, usage: Optional[Dict], drop: bool):
+    yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+    tokens = re.findall(r"\S+\s*", content)
+    cut_at = len(tokens) // 2 if drop else None
+    for i, token in enumerate(tokens):
+        if cut_at is not None and i == cut_at:
+            # Simulate the upstream connection dying mid-response
+            raise ConnectionResetError("stand-in dropped the stream")
+        await asyncio.sleep(config["token_ms"] / 1000)
+        yield _chunk(completion_id, model, {"content": token})
+    yield _chunk(completion_id, model, {}, finish_reason="stop")
+    if usage:
+        body = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [],
+            "usage": usage,
+        }
+        yield f"data: {json.dumps(body)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages") or []
+    model = body.get("model", "gpt-4o")
+    stream = bool(body.get("stream"))
+    endpoint = identify_endpoint(messages)
+    stats["requests"][endpoint] += 1
+
+    concurrency = stats["concurrency"]
+    concurrency["in_flight"] += 1
+    concurrency["max_in_flight"] = max(concurrency["max_in_flight"], concurrency["in_flight"])
+    try:
+        return await _complete(body, messages, model, stream, endpoint)
+    finally:
+        concurrency["in_flight"] -= 1
+
+
+async def _complete(body: Dict, messages: List[Dict], model: str, stream: bool, endpoint: str):
+    if _take("rate_limit_next") or _roll("rate_limit_rate"):
+        stats["injected"]["rate_limit"] += 1
+        return _error(429, "Rate limit reached (stand-in)", "rate_limit_error", {"retry-after": "1"})
+    if _take("error_next") or _roll("error_rate"):
+        stats["injected"]["server_error"] += 1
+        return _error(500, "Internal server error (stand-in)", "server_error")
+    if _roll("timeout_rate"):
+        stats["injected"]["timeout"] += 1
+        await asyncio.sleep(config["hang_seconds"])
+
+    response = canned_response(endpoint, messages)
+    content = json.dumps(response) if isinstance(response, (dict, list)) else str(response)
+    if _roll("malformed_rate"):
+        stats["injected"]["malformed"] += 1
+        content = content[:len(content) // 2]
+
+    await asyncio.sleep(_sample_latency() / 1000)
+    completion_id = f"chatcmpl-standin-{uuid.uuid4().hex[:24]}"
+    usage = _usage(messages, content)
+
+    if stream:
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        drop = _roll("stream_drop_rate")
+        if drop:
+            stats["injected"]["stream_drop"] += 1
+        return StreamingResponse(
+            _stream(completion_id, model, content, usage if include_usage else None, drop),
+            media_type="text/event-stream"
+        )
+
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": usage,
+    }
+
+
+@app.get("/v1/models")
+def list_models():
+    return {"object": "list", "data": [{"id": "gpt-4o", "object": "model", "created": 0, "owned_by": "standin"}]}
+
+
+# ============ Control endpoints ============
+
+@app.get("/_standin/stats")
+def get_stats():
+    return {
+        "requests": dict(stats["requests"]),
+        "injected": dict(stats["injected"]),
+        "in_flight": stats["concurrency"]["in_flight"],
+        "max_in_flight": stats["concurrency"]["max_in_flight"],
+        "config": config,
+        "overrides": sorted(overrides),
+    }
+
+
+@app.post("/_standin/config")
+async def update_config(request: Request):
+    global _sample_latency
+    changes = await request.json()
+    unknown = set(changes) - set(config)
+    if unknown:
+        return _error(400, f"Unknown settings: {', '.join(sorted(unknown))}", "invalid_request_error")
+    if "latency" in changes:
+        try:
+            _sample_latency = parse_latency(changes["latency"])
+        except ValueError as e:
+            return _error(400, str(e), "invalid_request_error")
+    config.update(changes)
+    return config
+
+
+@app.post("/_standin/reset")
+def reset_stats():
+    stats["requests"].clear()
+    stats["injected"].clear()
+    stats["concurrency"]["max_in_flight"] = stats["concurrency"]["in_flight"]
+    return {"reset": True}
+
+
+def main():
+    global _sample_latency
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default=config["latency"], help="Latency spec in ms, e.g. uniform:200:1500")
+    parser.add_argument("--token-ms", type=float, default=config["token_ms"], help="Delay between streamed tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction answered with HTTP 429")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction that hang for --hang-seconds")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction with truncated (invalid JSON) content")
+    parser.add_argument("--stream-drop-rate", type=float, default=0.0, help="Fraction of streams cut off half way")
+    parser.add_argument("--hang-seconds", type=float, default=config["hang_seconds"])
+    parser.add_argument("--responses", help="JSON file of endpoint -> fixed response")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible latencies and failures")
+    args = parser.parse_args()
+
+    try:
+        _sample_latency = parse_latency(args.latency)
+    except ValueError as e:
+        parser.error(str(e))
+
+    config.update({
+        "latency": args.latency,
+        "token_ms": args.token_ms,
+        "error_rate": args.error_rate,
+        "rate_limit_rate": args.rate_limit_rate,
+        "timeout_rate": args.timeout_rate,
+        "malformed_rate": args.malformed_rate,
+        "stream_drop_rate": args.stream_drop_rate,
+        "hang_seconds": args.hang_seconds,
+        "seed": args.seed,
+    })
+    if args.seed is not None:
+        rng.seed(args.seed)
+    if args.responses:
+        with open(args.responses) as f:
+            overrides.update(json.load(f))
+        print(f"📄 Loaded canned responses for: {', '.join(sorted(overrides))}")
+
+    print(f"🤖 OpenAI stand-in on http://{args.host}:{args.port}/v1 (latency {args.latency})")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
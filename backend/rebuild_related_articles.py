@@ -0,0 +1,27 @@
+"""
+Backfill / rebuild the precomputed related-articles table.
+Run: python rebuild_related_articles.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine, Base
+from app.models import BlogRelatedArticle
+from app.utils.related_articles import rebuild_all_related_articles
+
+
+def main():
+    # Make sure the neighbour table exists
+    Base.metadata.create_all(bind=engine, tables=[BlogRelatedArticle.__table__])
+    
+    db = SessionLocal()
+    try:
+        indexed = rebuild_all_related_articles(db)
+        print(f"✅ Computed related articles for {indexed} published articles")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Bulk (re-)render blog article markdown into the stored HTML/TOC columns.
+Run: python render_blog_content.py          # only articles never rendered
+     python render_blog_content.py --all    # re-render every article
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models import BlogArticle
+from app.utils.markdown_render import apply_rendered_content
+
+BATCH_SIZE = 100
+
+
+def render_articles(render_all: bool = False):
+    db = SessionLocal()
+    rendered = 0
+    last_id = 0
+    try:
+        while True:
+            query = db.query(BlogArticle).filter(BlogArticle.id > last_id)
+            if not render_all:
+                query = query.filter(BlogArticle.content_html == None)
+            batch = query.order_by(BlogArticle.id).limit(BATCH_SIZE).all()
+            if not batch:
+                break
+            
+            for article in batch:
+                apply_rendered_content(article)
+                last_id = article.id
+            db.commit()
+            rendered += len(batch)
+            print(f"   rendered {rendered} articles...")
+            # Keep the identity map small between batches
+            db.expunge_all()
+        
+        print(f"✅ Rendered {rendered} blog articles")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    render_articles(render_all="--all" in sys.argv)
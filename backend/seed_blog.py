@@ -8,6 +8,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal
 from app.models import BlogArticle
+from app.utils.related_articles import rebuild_all_related_articles
+from app.utils.markdown_render import apply_rendered_content
+from app.utils.blog_tags import sync_article_tags
 import json
 
 def seed_blog_articles():
@@ -750,10 +753,16 @@ Range of motion, rotator cuff strengthening
             is_featured=article_data["is_featured"],
             is_published=True
         )
+        apply_rendered_content(article, keep_read_time=True)
         db.add(article)
+        db.flush()
+        sync_article_tags(db, article.id, article_data["tags"])
     
     db.commit()
     print(f"Successfully seeded {len(articles)} blog articles!")
+    
+    indexed = rebuild_all_related_articles(db)
+    print(f"Computed related articles for {indexed} articles")
     db.close()
 
 
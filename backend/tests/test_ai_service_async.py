@@ -0,0 +1,168 @@
+"""
+Async OpenAI path (agenerate_chat_response) against the local stand-in server.
+
+openai_standin.py is served by uvicorn on a free port in a background thread
+and the app is pointed at it, so real HTTP requests go through the openai
+client. Covers the per-call timeout, retries on 429 and 5xx, and the
+OPENAI_MAX_CONCURRENCY semaphore.
+
+Requires pytest (not an app dependency):
+    pip install pytest
+
+Run (from backend/): python -m pytest -q tests
+"""
+import sys
+import os
+import asyncio
+import socket
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+PORT = _free_port()
+TIMEOUT_SECONDS = 0.5
+MAX_RETRIES = 2
+MAX_CONCURRENCY = 3
+
+# Point the app at the stand-in before settings are loaded; no database writes
+os.environ["OPENAI_API_KEY"] = "standin"
+os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{PORT}/v1"
+os.environ["OPENAI_TIMEOUT_SECONDS"] = str(TIMEOUT_SECONDS)
+os.environ["OPENAI_MAX_RETRIES"] = str(MAX_RETRIES)
+os.environ["OPENAI_MAX_CONCURRENCY"] = str(MAX_CONCURRENCY)
+os.environ["AI_TOKEN_BUDGETS"] = ""
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import httpx
+import uvicorn
+
+import openai_standin
+from app import ai_service
+
+MESSAGES = [{"role": "user", "content": "What are your clinic hours?"}]
+
+DEFAULT_CONFIG = {
+    "latency": "0",
+    "token_ms": 0.0,
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "timeout_rate": 0.0,
+    "malformed_rate": 0.0,
+    "stream_drop_rate": 0.0,
+    "rate_limit_next": 0,
+    "error_next": 0,
+}
+
+
+@pytest.fixture(scope="module")
+def standin():
+    server = uvicorn.Server(uvicorn.Config(openai_standin.app, host="127.0.0.1", port=PORT, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("OpenAI stand-in did not start")
+        time.sleep(0.05)
+
+    with httpx.Client(base_url=f"http://127.0.0.1:{PORT}") as control:
+        yield control
+
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest.fixture(autouse=True)
+def fresh_client(standin, monkeypatch):
+    """Reset the stand-in, and drop the loop-bound client and semaphore between tests"""
+    standin.post("/_standin/config", json=DEFAULT_CONFIG).raise_for_status()
+    # Requests abandoned by an earlier test (timeouts) keep running on the server
+    deadline = time.monotonic() + 5
+    while stats(standin)["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    standin.post("/_standin/reset").raise_for_status()
+    monkeypatch.setattr(ai_service, "async_client", None)
+    monkeypatch.setattr(ai_service, "_async_semaphore", None)
+    # No backoff between attempts (the stand-in's 429s ask for 1s)
+    monkeypatch.setattr(ai_service, "_retry_delay", lambda error, attempt: 0)
+
+
+def configure(standin, **changes):
+    standin.post("/_standin/config", json=changes).raise_for_status()
+
+
+def stats(standin) -> dict:
+    return standin.get("/_standin/stats").json()
+
+
+def generate():
+    return asyncio.run(ai_service.agenerate_chat_response(MESSAGES, endpoint="chat"))
+
+
+def test_returns_completion(standin):
+    assert generate()
+    assert stats(standin)["requests"] == {"chat": 1}
+
+
+def test_per_call_timeout(standin):
+    configure(standin, latency="fixed:1500")
+
+    started = time.perf_counter()
+    assert generate() is None
+    elapsed = time.perf_counter() - started
+
+    # Every attempt is cut off at the timeout instead of waiting for the slow response
+    assert stats(standin)["requests"] == {"chat": MAX_RETRIES + 1}
+    assert elapsed < (MAX_RETRIES + 1) * TIMEOUT_SECONDS + 2
+
+
+@pytest.mark.parametrize("failure, injected", [
+    ("rate_limit_next", "rate_limit"),
+    ("error_next", "server_error"),
+])
+def test_retries_then_succeeds(standin, failure, injected):
+    configure(standin, **{failure: MAX_RETRIES})
+
+    assert generate()
+    result = stats(standin)
+    assert result["injected"] == {injected: MAX_RETRIES}
+    assert result["requests"] == {"chat": MAX_RETRIES + 1}
+
+
+@pytest.mark.parametrize("failure, injected", [
+    ("rate_limit_next", "rate_limit"),
+    ("error_next", "server_error"),
+])
+def test_gives_up_after_max_retries(standin, failure, injected):
+    configure(standin, **{failure: MAX_RETRIES + 5})
+
+    assert generate() is None
+    result = stats(standin)
+    assert result["injected"] == {injected: MAX_RETRIES + 1}
+    assert result["requests"] == {"chat": MAX_RETRIES + 1}
+
+
+def test_concurrency_limited_by_semaphore(standin):
+    configure(standin, latency="fixed:200")
+    calls = MAX_CONCURRENCY * 4
+
+    async def run_all():
+        return await asyncio.gather(*(
+            ai_service.agenerate_chat_response(MESSAGES, endpoint="chat") for _ in range(calls)
+        ))
+
+    results = asyncio.run(run_all())
+
+    assert all(results)
+    result = stats(standin)
+    assert result["requests"] == {"chat": calls}
+    assert result["max_in_flight"] == MAX_CONCURRENCY
@@ -166,6 +166,12 @@ export const statsAPI = {
   delete: (id) => api.delete(`/site-stats/${id}/`),
 };
 
+// Homepage bootstrap: settings, stats, milestones, testimonials, services,
+// featured articles and branches in one request
+export const bootstrapAPI = {
+  get: () => api.get('/bootstrap'),
+};
+
 // Settings APIs (for admin settings page)
 export const settingsAPI = {
   getAll: () => api.get('/site-settings/'),
@@ -288,7 +294,73 @@ export const uploadAPI = {
     
     // 3. Return the final file URL
     return presignedRes.data.file_url;
-  }
+  },
+
+  // Resumable multipart upload for large documents (public, documents folder).
+  // Parts go up in parallel and each one is retried on its own; pass the
+  // returned { uploadId, key } back as `resume` to continue an interrupted upload.
+  uploadLargeFileToS3Public: async (file, { concurrency = 3, retries = 3, onProgress, resume } = {}) => {
+    let upload = resume;
+    if (!upload) {
+      const res = await api.post('/uploads/multipart/initiate', {
+        filename: file.name,
+        content_type: file.type,
+        folder: 'documents',
+        file_size: file.size
+      });
+      upload = { uploadId: res.data.upload_id, key: res.data.key };
+    }
+
+    const statusRes = await api.get('/uploads/multipart/status', {
+      params: { upload_id: upload.uploadId, key: upload.key }
+    });
+    const { part_size: partSize, missing_parts: missing, part_count: partCount } = statusRes.data;
+    let done = partCount - missing.length;
+    onProgress?.(done / partCount, upload);
+
+    const uploadPart = async (partNumber) => {
+      for (let attempt = 0; ; attempt++) {
+        try {
+          // Presign per attempt so a retry never uses an expired URL
+          const presignRes = await api.post('/uploads/multipart/presign-parts', {
+            upload_id: upload.uploadId,
+            key: upload.key,
+            part_numbers: [partNumber]
+          });
+          const start = (partNumber - 1) * partSize;
+          const res = await fetch(presignRes.data.parts[0].url, {
+            method: 'PUT',
+            body: file.slice(start, start + partSize)
+          });
+          if (!res.ok) throw new Error(`Part ${partNumber} failed with ${res.status}`);
+          done += 1;
+          onProgress?.(done / partCount, upload);
+          return;
+        } catch (err) {
+          if (attempt >= retries) throw err;
+          await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** attempt));
+        }
+      }
+    };
+
+    const queue = [...missing];
+    const workers = Array.from({ length: Math.min(concurrency, queue.length) }, async () => {
+      while (queue.length) {
+        await uploadPart(queue.shift());
+      }
+    });
+    await Promise.all(workers);
+
+    const completeRes = await api.post('/uploads/multipart/complete', {
+      upload_id: upload.uploadId,
+      key: upload.key
+    });
+    return completeRes.data.file_url;
+  },
+
+  // Abandon a multipart upload started with uploadLargeFileToS3Public
+  abortLargeFileUpload: ({ uploadId, key }) =>
+    api.delete('/uploads/multipart', { data: { upload_id: uploadId, key } })
 };
 
 // Doctor Onboarding APIs